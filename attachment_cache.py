@@ -0,0 +1,88 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+from mail_stream import iter_base64_file
+
+# Byte budget for encoded parts kept in memory. Override with
+# ATTACHMENT_CACHE_BYTES in .env (0 disables caching).
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class AttachmentCache:
+    """LRU cache of base64-encoded attachment bodies under a byte budget.
+
+    Entries are stored by content hash, so the same file reached through
+    different paths is encoded once. A (path, size, mtime) index avoids
+    re-hashing unchanged files; a changed file is re-hashed and, if its
+    content really changed, re-encoded.
+    """
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = int(max_bytes if max_bytes is not None
+                             else os.getenv('ATTACHMENT_CACHE_BYTES', DEFAULT_CACHE_BYTES))
+        self._index = {}
+        self._parts = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'rehashes': 0}
+
+    def _digest(self, path):
+        st = os.stat(path)
+        key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            digest = self._index.get(key)
+        if digest is None:
+            digest = file_digest(path)
+            with self._lock:
+                self._index[key] = digest
+                self.stats['rehashes'] += 1
+        return digest, st.st_size
+
+    def get(self, path, chunk_bytes=None):
+        """Return the encoded body of ``path`` (CRLF base64 lines), or None
+        if it does not fit in the budget and should be streamed instead."""
+        digest, size = self._digest(path)
+        with self._lock:
+            encoded = self._parts.get(digest)
+            if encoded is not None:
+                self._parts.move_to_end(digest)
+                self.stats['hits'] += 1
+                return encoded
+            self.stats['misses'] += 1
+
+        # base64 grows the payload by 4/3 plus CRLF every 76 characters
+        if size * 4 // 3 + size // 28 > self.max_bytes:
+            return None
+        args = (path, chunk_bytes) if chunk_bytes else (path,)
+        encoded = b''.join(iter_base64_file(*args))
+
+        with self._lock:
+            if digest not in self._parts:
+                self._parts[digest] = encoded
+                self._size += len(encoded)
+                while self._size > self.max_bytes and self._parts:
+                    _, evicted = self._parts.popitem(last=False)
+                    self._size -= len(evicted)
+                    self.stats['evictions'] += 1
+        return encoded
+
+    @property
+    def size(self):
+        return self._size
+
+    def clear(self):
+        with self._lock:
+            self._index.clear()
+            self._parts.clear()
+            self._size = 0
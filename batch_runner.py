@@ -0,0 +1,356 @@
+import os
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import util as mp_util
+from dotenv import load_dotenv
+
+from data_source import iter_rows
+from driver_pool import DriverPool
+from form_automation import RECORD_FIELDS, run_submission
+from screenshots import ScreenshotStore, new_run_id
+from instrumentation import Recorder, percentile, summarize_events, print_histogram
+from record_validation import RejectLog, validate_stream
+from submission_journal import SubmissionJournal, record_key, journal_hook
+from rate_control import AIMDController, set_share
+from http_submit import NeedsBrowser, submit_record
+
+
+# ----------------------------
+# RECORD LOADING
+# ----------------------------
+def load_records(path):
+    """Yield submission records from a CSV or JSONL file.
+
+    Column names are matched case-insensitively against RECORD_FIELDS, so the
+    .env style names (FULL_NAME, ...) work as CSV headers too. A missing
+    form_url falls back to FORM_URL from the environment.
+    """
+    default_url = os.getenv('FORM_URL')
+    for row in iter_rows(path):
+        record = {key: row.get(key) for key in RECORD_FIELDS}
+        record['form_url'] = record['form_url'] or default_url
+        yield record
+
+
+# ----------------------------
+# WORKERS
+# ----------------------------
+# Browsers come from a DriverPool so each one is started once and reused
+# across records. Thread workers share one pool sized to the worker count;
+# each process worker lazily builds its own single-driver pool. Screenshot
+# stores and the submission journal follow the same pattern; screenshots
+# all go into one run directory and every process appends to one journal.
+_pool = None
+_pool_lock = threading.Lock()
+_screenshots = None
+_journal = None
+# Form URLs the HTTP engine could not handle; their records go straight to
+# the browser
+_browser_only = set()
+
+
+def _worker_pool(profile, headless, max_jobs):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool(size=1, max_jobs=max_jobs, profile=profile, headless=headless)
+            # Process pool workers exit through multiprocessing, which skips
+            # atexit but runs registered finalizers.
+            mp_util.Finalize(None, _pool.close, exitpriority=10)
+        return _pool
+
+
+def _worker_screenshots(screenshot_dir, run_id):
+    global _screenshots
+    if not screenshot_dir:
+        return None
+    with _pool_lock:
+        if _screenshots is None:
+            _screenshots = ScreenshotStore(base_dir=screenshot_dir, run_id=run_id)
+            mp_util.Finalize(None, _screenshots.close, exitpriority=20)
+        return _screenshots
+
+
+def _worker_journal(journal_path):
+    global _journal
+    if not journal_path:
+        return None
+    with _pool_lock:
+        if _journal is None:
+            _journal = SubmissionJournal(journal_path)
+            # Closed after the screenshot store, whose writes report 'screenshotted'
+            mp_util.Finalize(None, _journal.close, exitpriority=5)
+        return _journal
+
+
+def _submit_record(index, record, fill_mode, profile, headless, max_jobs, screenshot_dir, run_id,
+                   journal_path=None):
+    screenshots = _worker_screenshots(screenshot_dir, run_id)
+    journal = _worker_journal(journal_path)
+    on_stage = journal_hook(journal, record_key(record), run=run_id, index=index) if journal else None
+    if fill_mode == 'http':
+        if record['form_url'] not in _browser_only:
+            try:
+                result = submit_record(record, recorder=Recorder(run=run_id, index=index), on_stage=on_stage)
+                result['index'] = index
+                result['worker'] = f"{os.getpid()}:{threading.get_ident()}"
+                return result
+            except NeedsBrowser as e:
+                print(f"ℹ {record['form_url']} needs the browser ({e}); using fast fill")
+                _browser_only.add(record['form_url'])
+        fill_mode = 'fast'
+    pool = _worker_pool(profile, headless, max_jobs)
+    with pool.session() as driver:
+        recorder = Recorder(driver, run=run_id, index=index)
+        result = run_submission(driver, record, fill_mode=fill_mode, screenshots=screenshots,
+                                screenshot_name=f"record_{index:06d}_confirmation", recorder=recorder,
+                                on_stage=on_stage)
+    result['index'] = index
+    result['worker'] = f"{os.getpid()}:{threading.get_ident()}"
+    return result
+
+
+# ----------------------------
+# RUNNER
+# ----------------------------
+def run_batch(records, workers=4, mode='thread', fill_mode='fast', headless=True,
+              screenshot_dir=None, max_pending=None, max_jobs=None, profile=None,
+              validate=True, on_reject=None, journal_path=None, retry_uncertain=False, adaptive=False):
+    """Fan records out over ``workers`` browser workers.
+
+    At most ``max_pending`` records (default 2 x workers) are in flight at
+    once, so a huge input file is never materialised as futures up front.
+    With ``validate`` records are normalized and checked in batches ahead
+    of submission; rejected ones go to ``on_reject`` and never reach a
+    browser.
+
+    With ``journal_path`` every record's progress is journaled and records
+    the journal shows as submitted are skipped, so an interrupted batch can
+    simply be run again. Records that crashed mid-submit ('submitting') may
+    already be on the form and are skipped too unless ``retry_uncertain``.
+
+    With ``adaptive`` the number of records in flight is set by an AIMD
+    controller (between 1 and ``workers``) from observed latency and
+    failures instead of ``max_pending``. FORM_RATE caps page loads and
+    submissions per second across all workers.
+    """
+    max_pending = max_pending or workers * 2
+    run_id = new_run_id()
+    rejected = []
+    # Records travel as (input position, record) so results, screenshots and
+    # the journal name them the way the reject messages do
+    if validate:
+        def reject(index, record, errors):
+            rejected.append(index)
+            if on_reject:
+                on_reject(index, record, errors)
+            else:
+                print(f"✗ record {index} rejected: {'; '.join(errors)}")
+        records = validate_stream(records, on_reject=reject, indexed=True)
+    else:
+        records = enumerate(records)
+
+    skipped, uncertain = [], []
+    journal = SubmissionJournal(journal_path) if journal_path else None
+    if journal is not None:
+        records = _unfinished(records, journal, retry_uncertain, skipped, uncertain)
+
+    controller = AIMDController(max_limit=workers, initial=max(1, workers // 2)) if adaptive else None
+    executor_kwargs = {'max_workers': workers}
+
+    global _pool, _screenshots, _journal
+    if mode == 'thread':
+        _pool = DriverPool(size=workers, max_jobs=max_jobs, profile=profile, headless=headless)
+        if screenshot_dir:
+            _screenshots = ScreenshotStore(base_dir=screenshot_dir, run_id=run_id)
+        _journal = journal
+        executor_cls = ThreadPoolExecutor
+    else:
+        executor_cls = ProcessPoolExecutor
+        # Each process gets its slice of the rate limits
+        executor_kwargs.update(initializer=set_share, initargs=(1.0 / workers,))
+    results = []
+    pending = {}
+    start = time.perf_counter()
+
+    try:
+        with executor_cls(**executor_kwargs) as executor:
+            for index, record in records:
+                while len(pending) >= (controller.limit if controller else max_pending):
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    results.extend(_collect(done, pending, controller))
+                future = executor.submit(
+                    _submit_record, index, record, fill_mode, profile, headless, max_jobs, screenshot_dir, run_id,
+                    journal_path
+                )
+                pending[future] = (index, record, time.perf_counter())
+            done, _ = wait(pending)
+            results.extend(_collect(done, pending, controller))
+    finally:
+        try:
+            if mode == 'thread':
+                _close_thread_workers()
+        finally:
+            if journal is not None:
+                journal.close()
+
+    summary = summarize(results, time.perf_counter() - start)
+    summary['rejected'] = len(rejected)
+    summary['skipped'] = len(skipped)
+    summary['uncertain'] = uncertain
+    if controller is not None:
+        summary['concurrency'] = controller.history
+    return summary
+
+
+def _unfinished(records, journal, retry_uncertain, skipped, uncertain):
+    """Drop (index, record) pairs the journal already has as submitted (or in doubt)."""
+    for index, record in records:
+        key = record_key(record)
+        if journal.is_done(key):
+            skipped.append(index)
+        elif journal.is_uncertain(key) and not retry_uncertain:
+            uncertain.append(record.get('email_id'))
+            print(f"⚠ {record.get('email_id')} crashed mid-submit in an earlier run; skipped"
+                  " (check the form, or rerun with --retry-uncertain)")
+        else:
+            yield index, record
+
+
+def _close_thread_workers():
+    """Close the thread mode driver pool and screenshot store, even if one fails."""
+    global _pool, _screenshots, _journal
+    pool, screenshots = _pool, _screenshots
+    _pool = _screenshots = _journal = None
+    try:
+        if pool is not None:
+            pool.close()
+    finally:
+        if screenshots is not None:
+            screenshots.close()
+
+
+def _collect(futures, pending, controller=None):
+    """Results of the finished ``futures``, removed from ``pending``.
+
+    A worker that raised (a browser that would not start, a journal write
+    that failed) becomes a failed result for its record instead of ending
+    the batch.
+    """
+    collected = []
+    for future in futures:
+        index, record, submitted = pending.pop(future)
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {'index': index, 'email_id': record.get('email_id'), 'ok': False,
+                      'error': f"{type(e).__name__}: {e}", 'seconds': time.perf_counter() - submitted,
+                      'worker': None}
+        if controller is not None:
+            controller.record(result['seconds'], result['ok'])
+        status = "✓" if result['ok'] else "✗"
+        print(f"{status} record {result['index']} ({result['email_id']}) in {result['seconds']:.2f}s"
+              + (f" - {result['error']}" if result['error'] else ""))
+        collected.append(result)
+    return collected
+
+
+def summarize(results, wall_seconds):
+    latencies = sorted(r['seconds'] for r in results)
+    succeeded = sum(1 for r in results if r['ok'])
+    return {
+        'records': len(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'wall_seconds': wall_seconds,
+        'throughput_per_min': len(results) / wall_seconds * 60 if wall_seconds else 0.0,
+        'latency_p50': percentile(latencies, 50),
+        'latency_p95': percentile(latencies, 95),
+        'latency_p99': percentile(latencies, 99),
+        'latency_max': latencies[-1] if latencies else 0.0,
+        'workers': len({r['worker'] for r in results if r['worker']}),
+        'stages': summarize_events([event for r in results for event in r.get('stages', [])]),
+    }
+
+
+def print_summary(summary):
+    print("\n" + "=" * 70)
+    print(" " * 25 + "BATCH SUMMARY")
+    print("=" * 70)
+    print(f"  Records:     {summary['records']} ({summary['succeeded']} ok, {summary['failed']} failed)")
+    if summary.get('rejected'):
+        print(f"  Rejected:    {summary['rejected']} (invalid input, not submitted)")
+    if summary.get('skipped'):
+        print(f"  Skipped:     {summary['skipped']} (already submitted per journal)")
+    if summary.get('uncertain'):
+        print(f"  Uncertain:   {len(summary['uncertain'])} (crashed mid-submit earlier, not retried)")
+    print(f"  Workers:     {summary['workers']}")
+    if summary.get('concurrency'):
+        limits = [limit for _, limit in summary['concurrency']]
+        print(f"  Concurrency: adaptive {min(limits)}-{max(limits)}, ended at {limits[-1]}")
+    print(f"  Wall time:   {summary['wall_seconds']:.1f}s")
+    print(f"  Throughput:  {summary['throughput_per_min']:.1f} submissions/min")
+    print(f"  Latency:     p50 {summary['latency_p50']:.2f}s | p95 {summary['latency_p95']:.2f}s"
+          f" | p99 {summary['latency_p99']:.2f}s"
+          f" | max {summary['latency_max']:.2f}s")
+    print("=" * 70)
+    print_histogram(summary['stages'])
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Submit many form records in parallel")
+    parser.add_argument('records', help="CSV or JSONL file of records")
+    parser.add_argument('--workers', type=int, default=4, help="number of browser workers")
+    parser.add_argument('--mode', choices=['thread', 'process'], default='thread')
+    parser.add_argument('--fill-mode', choices=['fast', 'keys', 'http'], default='fast',
+                        help="'http' posts answers without a browser, falling back to 'fast' for forms that need one")
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help="records in flight at once (default: 2 x workers)")
+    parser.add_argument('--screenshot-dir', default=None,
+                        help="save confirmation screenshots under a per-run folder here")
+    parser.add_argument('--max-jobs', type=int, default=None,
+                        help="recycle each browser after this many records (default: DRIVER_MAX_JOBS or 50)")
+    parser.add_argument('--profile', default=None,
+                        help="browser profile preset, e.g. 'production' (default: BROWSER_PROFILE)")
+    parser.add_argument('--headed', action='store_true', help="show the browser windows")
+    parser.add_argument('--rejects', default=None, help="write records that fail validation here (JSONL)")
+    parser.add_argument('--no-validate', action='store_true', help="skip input validation/normalization")
+    parser.add_argument('--journal', default=os.getenv('SUBMISSION_JOURNAL', 'submission_journal.jsonl'),
+                        help="resume journal; records it shows as submitted are skipped")
+    parser.add_argument('--no-journal', action='store_true', help="submit every record, without journaling")
+    parser.add_argument('--adaptive', action='store_true',
+                        help="adjust records in flight (up to --workers) from latency and failures")
+    parser.add_argument('--form-rate', type=float, default=None,
+                        help="max page loads + submissions per second to the form host (default: FORM_RATE)")
+    parser.add_argument('--retry-uncertain', action='store_true',
+                        help="resubmit records an earlier run crashed while submitting")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    args = parse_args()
+    if args.form_rate is not None:
+        os.environ['FORM_RATE'] = str(args.form_rate)
+    reject_log = RejectLog(args.rejects) if args.rejects else None
+    summary = run_batch(
+        load_records(args.records),
+        workers=args.workers,
+        mode=args.mode,
+        fill_mode=args.fill_mode,
+        headless=not args.headed,
+        screenshot_dir=args.screenshot_dir,
+        max_pending=args.max_pending,
+        max_jobs=args.max_jobs,
+        profile=args.profile,
+        validate=not args.no_validate,
+        on_reject=reject_log,
+        journal_path=None if args.no_journal else args.journal,
+        retry_uncertain=args.retry_uncertain,
+        adaptive=args.adaptive,
+    )
+    if reject_log:
+        reject_log.close()
+    print_summary(summary)
@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import argparse
+import tempfile
+import threading
+from dotenv import load_dotenv
+
+from standin_server import start_server
+from instrumentation import load_events, summarize_events, field_key, print_histogram
+
+# Fill strategies the benchmark knows how to run ('http' starts no browser)
+STRATEGIES = ['keys', 'fast', 'http']
+
+
+def synthetic_records(form_url, count, gender='Male'):
+    for i in range(count):
+        yield {
+            'form_url': form_url,
+            'full_name': f"Bench User {i}",
+            'contact_number': f"98765{i:05d}",
+            'email_id': f"bench{i}@example.com",
+            'full_address': f"{i} Benchmark Street, Test City",
+            'pin_code': f"{110000 + i % 1000}",
+            'date_of_birth': "1995-06-15",
+            'gender': gender,
+        }
+
+
+# ----------------------------
+# MEMORY PER BROWSER WORKER
+# ----------------------------
+def _children(pid):
+    """Direct child pids of ``pid`` from /proc (Linux only)."""
+    children = []
+    for task in os.listdir(f'/proc/{pid}/task'):
+        try:
+            with open(f'/proc/{pid}/task/{task}/children') as f:
+                children.extend(int(child) for child in f.read().split())
+        except OSError:
+            pass
+    return children
+
+
+def _rss_mb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def descendant_rss_mb(pid=None):
+    """Summed RSS of every process started below ``pid`` (chromedriver, Chrome
+    and its renderers), or None where /proc is not available."""
+    pid = pid or os.getpid()
+    if not os.path.exists(f'/proc/{pid}/task'):
+        return None
+    total, stack = 0.0, _children(pid)
+    while stack:
+        child = stack.pop()
+        total += _rss_mb(child)
+        try:
+            stack.extend(_children(child))
+        except OSError:
+            pass
+    return total
+
+
+class MemorySampler:
+    """Samples descendant RSS in the background and keeps the peak."""
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='memory-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = descendant_rss_mb()
+            if rss is not None:
+                self.peak_mb = max(self.peak_mb or 0.0, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+# ----------------------------
+# BENCHMARK
+# ----------------------------
+def bench_strategy(strategy, form_url, records, workers, metrics_file):
+    from batch_runner import run_batch
+
+    run_start = time.time()
+    with MemorySampler() as memory:
+        summary = run_batch(synthetic_records(form_url, records), workers=workers, fill_mode=strategy)
+    events = load_events(metrics_file) if os.path.exists(metrics_file) else []
+    events = [e for e in events if e.get('ts', 0) >= run_start]
+    wall = summary['wall_seconds']
+    return {
+        'strategy': strategy,
+        'records': summary['records'],
+        'failed': summary['failed'],
+        'submissions_per_sec': summary['records'] / wall if wall else 0.0,
+        'latency_p50': summary['latency_p50'],
+        'latency_p95': summary['latency_p95'],
+        'latency_p99': summary['latency_p99'],
+        'peak_rss_mb': memory.peak_mb,
+        'rss_per_worker_mb': memory.peak_mb / workers if memory.peak_mb else None,
+        'stages': summarize_events(events, field_key),
+    }
+
+
+def print_results(results):
+    print("\n" + "=" * 70)
+    print(" " * 27 + "BENCHMARK")
+    print("=" * 70)
+    print(f"  {'strategy':<10}{'ok':>6}{'sub/s':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'MB/worker':>11}")
+    for r in results:
+        memory = f"{r['rss_per_worker_mb']:.0f}" if r['rss_per_worker_mb'] else '-'
+        print(f"  {r['strategy']:<10}{r['records'] - r['failed']:>6}{r['submissions_per_sec']:>8.2f}"
+              f"{r['latency_p50']:>8.2f}{r['latency_p95']:>8.2f}{r['latency_p99']:>8.2f}{memory:>11}")
+    print("=" * 70)
+    for r in results:
+        print(f"\nPer-field latency ({r['strategy']}):")
+        print_histogram(r['stages'])
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline throughput benchmark against the stand-in form")
+    parser.add_argument('--records', type=int, default=20, help="submissions per strategy")
+    parser.add_argument('--workers', type=int, default=2, help="browser workers")
+    parser.add_argument('--strategies', default=','.join(STRATEGIES),
+                        help=f"comma separated, from: {', '.join(STRATEGIES)}")
+    parser.add_argument('--latency', type=float, default=0.0, help="stand-in latency per request (s)")
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--gender', choices=['radio', 'listbox', 'text'], default='radio')
+    parser.add_argument('--output', default=None, help="write results as JSON here")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    args = parse_args()
+    strategies = [s.strip() for s in args.strategies.split(',') if s.strip()]
+    unknown = set(strategies) - set(STRATEGIES)
+    if unknown:
+        raise SystemExit(f"Unknown strategies: {', '.join(sorted(unknown))}")
+
+    # Benchmark runs must not touch the real schema cache or metrics log
+    scratch = tempfile.mkdtemp(prefix='form-bench-')
+    os.environ['FORM_SCHEMA_CACHE'] = os.path.join(scratch, 'schemas.json')
+    os.environ['METRICS_FILE'] = os.path.join(scratch, 'metrics.jsonl')
+    os.environ.setdefault('SCREENSHOT_DIR', os.path.join(scratch, 'screenshots'))
+
+    server, form_url = start_server(latency=args.latency, jitter=args.jitter, gender_widget=args.gender)
+    print(f"Stand-in form at {form_url}")
+    try:
+        results = [bench_strategy(s, form_url, args.records, args.workers, os.environ['METRICS_FILE'])
+                   for s in strategies]
+    finally:
+        server.shutdown()
+    print_results(results)
+    print(f"\nStand-in accepted {len(server.state.submissions)} submissions, rejected {server.state.rejected}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
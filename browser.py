@@ -0,0 +1,246 @@
+import os
+import re
+import sys
+import json
+import shutil
+import subprocess
+import threading
+from dataclasses import dataclass, replace
+from typing import Optional
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import SessionNotCreatedException, WebDriverException
+
+# Where the resolved chromedriver path is remembered between runs.
+# Override with DRIVER_CACHE_FILE in .env
+DEFAULT_DRIVER_CACHE = os.path.join(os.path.expanduser('~'), '.cache', 'medius-assignment', 'chromedriver.json')
+
+CHROME_BINARIES = [
+    'google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome',
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+]
+
+_resolved = {}
+_resolve_lock = threading.Lock()
+
+
+# ----------------------------
+# CHROMEDRIVER RESOLUTION
+# ----------------------------
+def detect_chrome_version():
+    """Return the local Chrome version without touching the network."""
+    if sys.platform.startswith('win'):
+        try:
+            import winreg
+            key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r'Software\Google\Chrome\BLBeacon')
+            return winreg.QueryValueEx(key, 'version')[0]
+        except OSError:
+            return None
+
+    candidates = [os.getenv('CHROME_BINARY')] + CHROME_BINARIES
+    for binary in filter(None, candidates):
+        path = binary if os.path.isabs(binary) else shutil.which(binary)
+        if not path or not os.path.exists(path):
+            continue
+        try:
+            output = subprocess.run([path, '--version'], capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = re.search(r'(\d+\.\d+\.\d+\.\d+)', output)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _cache_file():
+    return os.getenv('DRIVER_CACHE_FILE', DEFAULT_DRIVER_CACHE)
+
+
+def _read_cache():
+    try:
+        with open(_cache_file(), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(cache):
+    path = _cache_file()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠ Could not write driver cache {path}: {e}")
+
+
+def resolve_driver_path():
+    """Return a chromedriver path for the installed Chrome, or None.
+
+    The result is memoised for the process and persisted on disk keyed by
+    the Chrome version, so webdriver-manager only runs again after Chrome
+    is updated. When the version cannot be detected nothing is persisted,
+    since a later Chrome update could not invalidate the entry. Returns
+    None when nothing is cached and resolution fails (e.g. offline);
+    Selenium Manager then takes over.
+    """
+    with _resolve_lock:
+        if 'path' in _resolved:
+            return _resolved['path']
+
+        version = detect_chrome_version()
+        cache = _read_cache()
+        path = cache.get(version) if version else None
+
+        if not path or not os.path.exists(path):
+            try:
+                from webdriver_manager.chrome import ChromeDriverManager
+                path = ChromeDriverManager().install()
+                if version:
+                    cache[version] = path
+                    _write_cache(cache)
+            except Exception as e:
+                print(f"⚠ ChromeDriver resolution failed ({e}); using Selenium Manager")
+                path = None
+
+        _resolved.update(path=path, version=version)
+        return path
+
+
+def forget_driver_path():
+    """Evict the resolved chromedriver from the disk cache.
+
+    Called when Chrome refuses the cached driver (a version mismatch): the
+    next run resolves it again instead of failing the same way, and this
+    process leaves later drivers to Selenium Manager.
+    """
+    with _resolve_lock:
+        version = _resolved.pop('version', None)
+        _resolved['path'] = None
+        if version:
+            cache = _read_cache()
+            if cache.pop(version, None) is not None:
+                _write_cache(cache)
+
+
+# ----------------------------
+# BROWSER PROFILES
+# ----------------------------
+FONT_URL_PATTERNS = ['*.woff', '*.woff2', '*.ttf', '*.otf', '*fonts.gstatic.com*', '*fonts.googleapis.com*']
+
+# Named starting points for BROWSER_PROFILE. Individual BROWSER_* variables
+# and keyword overrides are applied on top.
+PROFILE_PRESETS = {
+    'default': {},
+    'production': {
+        'headless': True,
+        'block_images': True,
+        'block_fonts': True,
+        'disable_extensions': True,
+        'disable_gpu': True,
+        'window_size': '1366,900',
+        'page_load_strategy': 'eager',
+    },
+}
+
+
+def _env_flag(name):
+    value = os.getenv(name)
+    if value is None or value == '':
+        return None
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+@dataclass
+class BrowserProfile:
+    headless: bool = False
+    block_images: bool = False
+    block_fonts: bool = False
+    disable_extensions: bool = False
+    disable_gpu: bool = False
+    window_size: Optional[str] = None  # "width,height"; None keeps --start-maximized
+    page_load_strategy: str = 'normal'  # normal | eager | none
+
+    @classmethod
+    def from_env(cls, preset=None, **overrides):
+        """Build a profile from a preset, BROWSER_* variables and overrides.
+
+        Overrides set to None are ignored so callers can pass optional
+        command-line values straight through.
+        """
+        preset = preset or os.getenv('BROWSER_PROFILE', 'default')
+        if preset not in PROFILE_PRESETS:
+            raise ValueError(f"Unknown browser profile '{preset}' (choose from {', '.join(PROFILE_PRESETS)})")
+        settings = dict(PROFILE_PRESETS[preset])
+
+        for flag in ('headless', 'block_images', 'block_fonts', 'disable_extensions', 'disable_gpu'):
+            value = _env_flag(f'BROWSER_{flag.upper()}')
+            if value is not None:
+                settings[flag] = value
+        if os.getenv('BROWSER_WINDOW_SIZE'):
+            settings['window_size'] = os.getenv('BROWSER_WINDOW_SIZE')
+        if os.getenv('BROWSER_PAGE_LOAD_STRATEGY'):
+            settings['page_load_strategy'] = os.getenv('BROWSER_PAGE_LOAD_STRATEGY').lower()
+
+        settings.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(**settings)
+
+    def chrome_options(self):
+        chrome_options = Options()
+        if self.window_size:
+            chrome_options.add_argument(f'--window-size={self.window_size}')
+        else:
+            chrome_options.add_argument('--start-maximized')
+        if self.headless:
+            chrome_options.add_argument('--headless=new')
+        if self.disable_extensions:
+            chrome_options.add_argument('--disable-extensions')
+        if self.disable_gpu:
+            chrome_options.add_argument('--disable-gpu')
+        if self.block_images:
+            chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+        chrome_options.page_load_strategy = self.page_load_strategy
+        return chrome_options
+
+    def apply(self, driver):
+        """Settings that need a running browser (CDP request blocking)."""
+        if self.block_fonts:
+            try:
+                driver.execute_cdp_cmd('Network.enable', {})
+                driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': FONT_URL_PATTERNS})
+            except WebDriverException as e:
+                print(f"⚠ Font blocking unavailable: {e.msg}")
+        return driver
+
+
+# ----------------------------
+# DRIVER FACTORY
+# ----------------------------
+def create_driver(profile=None, **overrides):
+    """Start Chrome with ``profile`` (default: BrowserProfile.from_env()).
+
+    Keyword overrides such as ``headless=True`` adjust the profile for this
+    driver only.
+    """
+    if profile is None or isinstance(profile, str):
+        profile = BrowserProfile.from_env(profile, **overrides)
+    elif overrides:
+        profile = replace(profile, **{key: value for key, value in overrides.items() if value is not None})
+    chrome_options = profile.chrome_options()
+
+    driver = None
+    driver_path = resolve_driver_path()
+    if driver_path:
+        try:
+            driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+        except SessionNotCreatedException as e:
+            print(f"⚠ Cached ChromeDriver does not fit this Chrome ({e.msg}); using Selenium Manager")
+            forget_driver_path()
+        except WebDriverException as e:
+            print(f"⚠ Cached ChromeDriver failed to start ({e.msg}); using Selenium Manager")
+    if driver is None:
+        driver = webdriver.Chrome(options=chrome_options)
+    return profile.apply(driver)
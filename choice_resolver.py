@@ -0,0 +1,177 @@
+import re
+import difflib
+
+# Fuzzy matches below this difflib ratio are not accepted
+FUZZY_CUTOFF = 0.8
+
+# Choice widgets in the order they are tried. 'text' (a free text answer)
+# is what is left when none of them has options.
+STRATEGIES = ['radio', 'checkbox', 'listbox', 'select']
+
+# Collects a choice question's options in one execute_script round trip.
+#
+# arguments[0] is the question (its group, listbox or input) or null for the
+# whole page; arguments[1] the strategy to try first, e.g. the one cached in
+# the form schema. Returns {strategy, control, labels, elements}: control is
+# the element to open (listbox) or type into (text), labels/elements the
+# options in page order.
+OPTIONS_SCRIPT = """
+const scope = arguments[0] || document;
+const hint = arguments[1];
+const OPTION_SELECTORS = {
+    radio: '[role="radio"], input[type="radio"]',
+    checkbox: '[role="checkbox"], input[type="checkbox"]',
+    listbox: '[role="listbox"] [role="option"]',
+    select: 'select option'
+};
+const CONTROL_SELECTORS = {listbox: '[role="listbox"]', select: 'select', text: 'input[type="text"], textarea'};
+
+function optionLabel(el) {
+    return el.getAttribute('aria-label') || el.getAttribute('data-value') || el.value || el.textContent.trim();
+}
+
+function control(strategy) {
+    const selector = CONTROL_SELECTORS[strategy];
+    if (!selector || scope === document && strategy === 'text') return null;
+    if (scope !== document && scope.matches(selector)) return scope;
+    return scope.querySelector(selector);
+}
+
+const order = Object.keys(OPTION_SELECTORS).filter(s => s !== hint);
+if (hint in OPTION_SELECTORS) order.unshift(hint);
+for (const strategy of order) {
+    const options = Array.from(scope.querySelectorAll(OPTION_SELECTORS[strategy]));
+    if (options.length) {
+        return {strategy: strategy, control: control(strategy), labels: options.map(optionLabel), elements: options};
+    }
+}
+return {strategy: 'text', control: control('text'), labels: [], elements: []};
+"""
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def normalize_label(text):
+    """Lower case, punctuation and runs of whitespace folded to one space."""
+    return _NON_WORD.sub(' ', (text or '').lower()).strip()
+
+
+# ----------------------------
+# OPTION INDEX
+# ----------------------------
+class OptionIndex:
+    """Normalized option label -> position, built once per question.
+
+    ``aliases`` maps lower-case spellings to a canonical value (e.g.
+    record_validation.GENDER_ALIASES) so 'M' on the form matches 'Male' in
+    the record and the other way round.
+    """
+
+    def __init__(self, labels, aliases=None):
+        self.labels = list(labels)
+        self.aliases = {normalize_label(k): normalize_label(v) for k, v in (aliases or {}).items()}
+        self._positions = {}
+        for position, label in enumerate(self.labels):
+            key = normalize_label(label)
+            self._positions.setdefault(key, position)
+            self._positions.setdefault(self.aliases.get(key, key), position)
+
+    def match(self, value):
+        """Return (position, how) for ``value``, or (None, None).
+
+        ``how`` is 'exact', 'prefix' (a label with trailing text such as
+        "Male, option 1 of 3") or 'fuzzy'. A value is never matched inside
+        another word, so 'Male' does not select 'Female' nor the other way
+        round. Values the aliases know (genders) match exactly, by alias or
+        by prefix only; typo matching is left to free-form values.
+        """
+        wanted = normalize_label(value)
+        wanted = self.aliases.get(wanted, wanted)
+        if not wanted:
+            return None, None
+        if wanted in self._positions:
+            return self._positions[wanted], 'exact'
+
+        prefixed = {position for key, position in self._positions.items() if key.startswith(wanted + ' ')}
+        if len(prefixed) == 1:
+            return prefixed.pop(), 'prefix'
+
+        if wanted in self.aliases.values():
+            return None, None
+        candidates = [key for key in self._positions if not (key.endswith(wanted) or wanted.endswith(key))]
+        close = difflib.get_close_matches(wanted, candidates, n=1, cutoff=FUZZY_CUTOFF)
+        if close:
+            return self._positions[close[0]], 'fuzzy'
+        return None, None
+
+
+def labels_match(expected, actual, aliases=None):
+    """True if ``actual`` (a selected option's label) is the ``expected`` value.
+
+    Strict: the labels must be equal once normalized and mapped through
+    ``aliases``. No prefix or fuzzy matching, so read-back checks never
+    pass a near miss.
+    """
+    if actual is None:
+        return False
+    aliases = {normalize_label(k): normalize_label(v) for k, v in (aliases or {}).items()}
+    expected, actual = normalize_label(expected), normalize_label(actual)
+    return bool(expected) and aliases.get(expected, expected) == aliases.get(actual, actual)
+
+
+# ----------------------------
+# RESOLVING
+# ----------------------------
+class ChoiceQuestion:
+    """One choice question's options as found on the page."""
+
+    def __init__(self, strategy, control, labels, elements, aliases=None):
+        self.strategy = strategy
+        self.control = control
+        self.labels = labels
+        self.elements = elements
+        self.index = OptionIndex(labels, aliases)
+        self.match = None  # how the last select_option() matched
+
+    def option_for(self, value):
+        position, self.match = self.index.match(value)
+        if position is None:
+            return None, None
+        return self.labels[position], self.elements[position]
+
+
+def load_options(driver, scope=None, strategy=None, aliases=None):
+    """Find the question's widget and index its options (one round trip).
+
+    ``strategy`` is tried first (falling back to detection if it finds no
+    options), so a strategy cached in the form schema skips detection.
+    """
+    found = driver.execute_script(OPTIONS_SCRIPT, scope, strategy)
+    return ChoiceQuestion(found['strategy'], found['control'], found['labels'], found['elements'], aliases)
+
+
+def select_option(driver, waits, question, value, name="Choice"):
+    """Pick ``value`` on a radio, checkbox, listbox or select question.
+
+    Returns the chosen option's label, or None if no option matches. Text
+    questions have no options; callers type into ``question.control``.
+    """
+    label, option = question.option_for(value)
+    if option is None:
+        return None
+    if question.strategy == 'listbox':
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", question.control)
+        question.control.click()
+        waits.clickable(option, f"{name} option")
+        option.click()
+        waits.selected(option, name)
+    elif question.strategy == 'select':
+        option.click()
+        waits.selected(option, name)
+    else:
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", option)
+        waits.clickable(option, name)
+        if not (question.strategy == 'checkbox' and option.get_attribute('aria-checked') == 'true'):
+            option.click()
+        waits.checked(option, name)
+    return label
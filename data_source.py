@@ -0,0 +1,21 @@
+import csv
+import json
+
+
+def iter_rows(path):
+    """Yield one dict per row of a CSV or JSONL file, streaming.
+
+    Keys are stripped and lower-cased so .env style headers (FULL_NAME)
+    and record keys (full_name) are interchangeable; string values are
+    stripped.
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.lower().endswith('.jsonl'):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for row in rows:
+            yield {
+                k.strip().lower(): (v.strip() if isinstance(v, str) else v)
+                for k, v in row.items() if k is not None
+            }
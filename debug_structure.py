@@ -1,49 +1,70 @@
 import os
-import time
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
+import sys
+import argparse
 from dotenv import load_dotenv
+from browser import create_driver
+from waits import WaitEngine
+from form_schema import discover_schema
+from dom_snapshot import take_snapshot, snapshot_to_json, items_where
+
+parser = argparse.ArgumentParser(description="Inspect the structure of FORM_URL")
+parser.add_argument('--json', nargs='?', const='-', metavar='PATH',
+                    help="write the DOM snapshot as JSON to PATH (or stdout) and exit")
+args = parser.parse_args()
 
 load_dotenv()
 
-chrome_options = Options()
-chrome_options.add_argument('--start-maximized')
+driver = create_driver()
 
-try:
-    from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.chrome.service import Service
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-except:
-    driver = webdriver.Chrome(options=chrome_options)
+waits = WaitEngine(driver)
 
 driver.get(os.getenv('FORM_URL'))
-time.sleep(5)
+waits.form_rendered()
+
+# One round trip for every input, textarea, radio, listbox and option
+snapshot = take_snapshot(driver)
+
+if args.json:
+    output = snapshot_to_json(snapshot)
+    if args.json == '-':
+        print(output)
+    else:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"Snapshot of {len(snapshot['items'])} elements saved: {args.json}", file=sys.stderr)
+    driver.quit()
+    sys.exit(0)
 
 print("="*70)
 print("DEBUGGING FORM STRUCTURE")
 print("="*70)
 
 print("\n1. TEXT INPUTS:")
-text_inputs = driver.find_elements(By.CSS_SELECTOR, 'input[type="text"]')
-for i, inp in enumerate(text_inputs):
-    aria_label = inp.get_attribute('aria-label') or 'No label'
-    print(f"   [{i}] {aria_label}")
+for i, (item, _) in enumerate(items_where(snapshot, tag='input', type='text')):
+    print(f"   [{i}] {item['label'] or 'No label'}")
 
 print("\n2. TEXTAREAS:")
-textareas = driver.find_elements(By.TAG_NAME, 'textarea')
-for i, ta in enumerate(textareas):
-    aria_label = ta.get_attribute('aria-label') or 'No label'
-    print(f"   [{i}] {aria_label}")
+for i, (item, _) in enumerate(items_where(snapshot, tag='textarea')):
+    print(f"   [{i}] {item['label'] or 'No label'}")
 
 print("\n3. ALL INPUTS (any type):")
-all_inputs = driver.find_elements(By.TAG_NAME, 'input')
-for i, inp in enumerate(all_inputs):
-    input_type = inp.get_attribute('type')
-    aria_label = inp.get_attribute('aria-label') or 'No label'
-    print(f"   [{i}] type={input_type}, label={aria_label}")
+for i, (item, _) in enumerate(items_where(snapshot, tag='input')):
+    print(f"   [{i}] type={item['type']}, label={item['label'] or 'No label'}")
+
+print("\n4. CHOICES (radio / listbox / option):")
+for item in snapshot['items']:
+    if item['role'] in ('radio', 'checkbox', 'listbox', 'option'):
+        value = item['attributes'].get('data-value') or item['text']
+        hidden = "" if item['visible'] else " (hidden)"
+        print(f"   [{item['index']}] role={item['role']}, label={item['label'] or value or 'No label'}{hidden}")
+
+print("\n5. DISCOVERED SCHEMA:")
+questions, _, digest = discover_schema(driver)
+for i, q in enumerate(questions):
+    options = f", options={q['options']}" if q['options'] else ""
+    print(f"   [{i}] {q['type']}: {q['label'] or 'No label'} -> {q['field'] or '-'}{options}")
+print(f"   structure hash: {digest[:16]}")
 
 print("="*70)
 input("\nPress ENTER to close...")
-driver.quit()
\ No newline at end of file
+driver.quit()
@@ -0,0 +1,53 @@
+import json
+
+# A debugging aid for debug_structure.py: dumps every interactive element of
+# the form in one round trip. Filling does not use it; choice questions are
+# discovered by choice_resolver.OPTIONS_SCRIPT, which returns only what the
+# fill needs.
+DEFAULT_SELECTOR = 'input, textarea, [role="radio"], [role="checkbox"], [role="listbox"], [role="option"]'
+
+# Collects every matching element with its attributes, current value,
+# visibility and bounding box in a single execute_script round trip.
+# The raw WebElements are returned alongside so callers can act on a match
+# without looking it up again.
+SNAPSHOT_SCRIPT = """
+const nodes = Array.from(document.querySelectorAll(arguments[0]));
+const items = nodes.map((el, index) => {
+    const rect = el.getBoundingClientRect();
+    const style = window.getComputedStyle(el);
+    const attributes = {};
+    for (const attr of el.attributes) {
+        attributes[attr.name] = attr.value;
+    }
+    return {
+        index: index,
+        tag: el.tagName.toLowerCase(),
+        type: el.type || el.getAttribute('type'),
+        role: el.getAttribute('role'),
+        label: el.getAttribute('aria-label'),
+        value: 'value' in el ? el.value : null,
+        text: (el.textContent || '').trim().slice(0, 200),
+        attributes: attributes,
+        visible: rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden' && style.display !== 'none',
+        rect: {x: rect.x, y: rect.y, width: rect.width, height: rect.height}
+    };
+});
+return {url: location.href, title: document.title, items: items, elements: nodes};
+"""
+
+
+def take_snapshot(driver, selector=DEFAULT_SELECTOR):
+    """Return {'url', 'title', 'items', 'elements'} for every match of ``selector``."""
+    return driver.execute_script(SNAPSHOT_SCRIPT, selector)
+
+
+def snapshot_to_json(snapshot, indent=2):
+    data = {key: value for key, value in snapshot.items() if key != 'elements'}
+    return json.dumps(data, indent=indent, ensure_ascii=False)
+
+
+def items_where(snapshot, **conditions):
+    """Yield (item, element) pairs whose fields equal all ``conditions``."""
+    for item, element in zip(snapshot['items'], snapshot['elements']):
+        if all(item.get(key) == value for key, value in conditions.items()):
+            yield item, element
@@ -0,0 +1,176 @@
+import os
+import time
+import queue
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from browser import create_driver
+
+# Recycle a browser after this many jobs. Override with DRIVER_MAX_JOBS in .env
+DEFAULT_MAX_JOBS = 50
+
+RESET_STORAGE_SCRIPT = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+
+class DriverPool:
+    """Keeps up to ``size`` warm Chrome instances and hands them out per job.
+
+    Drivers are started lazily, reset between jobs (cookies, storage,
+    about:blank) and health-checked before reuse. A driver is quit and
+    replaced after ``max_jobs`` jobs or as soon as a job crashes it.
+    ``acquire()`` waits until a driver is idle or a slot is free to start
+    one, so a discarded driver's slot goes to the next waiter.
+    """
+
+    def __init__(self, size=1, max_jobs=None, factory=create_driver, **driver_kwargs):
+        if max_jobs is None:
+            max_jobs = int(os.getenv('DRIVER_MAX_JOBS', DEFAULT_MAX_JOBS))
+        self.size = size
+        self.max_jobs = max_jobs
+        self.factory = factory
+        self.driver_kwargs = driver_kwargs
+        self._idle = []  # most recently used last
+        self._jobs = {}
+        self._created = 0
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._closed = False
+        self.stats = {'started': 0, 'recycled': 0, 'crashed': 0, 'jobs': 0}
+
+    # ----------------------------
+    # CHECKOUT / CHECKIN
+    # ----------------------------
+    def acquire(self, timeout=None):
+        """Check out a driver; raises queue.Empty after ``timeout`` seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            driver = self._checkout(deadline) or self._start()
+            if self.is_healthy(driver):
+                return driver
+            self._discard(driver, crashed=True)
+
+    def _checkout(self, deadline):
+        """An idle driver, or None once a slot for a new one is reserved."""
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("DriverPool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                self._available.wait(remaining)
+
+    def release(self, driver, failed=False):
+        with self._lock:
+            self._jobs[id(driver)] = self._jobs.get(id(driver), 0) + 1
+            self.stats['jobs'] += 1
+
+        if failed:
+            self._discard(driver, crashed=True)
+        elif self._closed or self._jobs[id(driver)] >= self.max_jobs:
+            self._discard(driver)
+        elif not self.reset(driver):
+            self._discard(driver, crashed=True)
+        else:
+            with self._available:
+                self._idle.append(driver)
+                self._available.notify()
+
+    @contextmanager
+    def session(self, timeout=None):
+        driver = self.acquire(timeout)
+        failed = False
+        try:
+            yield driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.release(driver, failed=failed)
+
+    # ----------------------------
+    # DRIVER LIFECYCLE
+    # ----------------------------
+    def _start(self):
+        """Start a driver in a slot already reserved by _checkout."""
+        try:
+            driver = self.factory(**self.driver_kwargs)
+        except Exception:
+            with self._available:
+                self._created -= 1
+                self._available.notify()
+            raise
+        with self._lock:
+            self._jobs[id(driver)] = 0
+            self.stats['started'] += 1
+        return driver
+
+    def _discard(self, driver, crashed=False):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._available:
+            self._jobs.pop(id(driver), None)
+            self.stats['crashed' if crashed else 'recycled'] += 1
+            self._created -= 1
+            # The freed slot lets a waiting acquire() start a replacement
+            self._available.notify()
+
+    def reset(self, driver):
+        """Clear cookies and storage and park the driver on about:blank.
+
+        On Chrome the DevTools protocol clears cookies for every origin and
+        all storage (local, session, IndexedDB, service workers) of the page
+        the job ended on; other drivers only get the current origin's.
+        """
+        try:
+            origin = _origin(driver.current_url)
+            if hasattr(driver, 'execute_cdp_cmd'):
+                driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+                if origin:
+                    driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+            else:
+                driver.delete_all_cookies()
+                driver.execute_script(RESET_STORAGE_SCRIPT)
+            driver.get('about:blank')
+            return True
+        except Exception:
+            return False
+
+    def is_healthy(self, driver):
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def close(self):
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._available.notify_all()
+        for driver in idle:
+            self._discard(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _origin(url):
+    """scheme://host[:port] of an http(s) ``url``, else None (about:blank, data:)."""
+    parts = urlsplit(url or '')
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
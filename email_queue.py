@@ -0,0 +1,219 @@
+import os
+import json
+import time
+import uuid
+import queue
+import random
+import smtplib
+import threading
+
+from mail_transport import SMTPPool, envelope
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF = 2.0  # seconds before the first retry, doubled each time
+MAX_BACKOFF = 60.0
+DEFAULT_DEAD_LETTER = 'email_dead_letter.jsonl'
+
+_STOP = object()
+
+
+def is_transient(error):
+    """True for SMTP failures worth retrying (dropped sessions, 4xx replies).
+
+    A drop after the message was sent (mail_transport.DeliveryUncertain)
+    is not: retrying could deliver it twice.
+    """
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError,
+                          ConnectionError, TimeoutError)):
+        return True
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return False
+
+
+def dead_letter_message(msg):
+    """What the dead-letter file keeps of ``msg``.
+
+    A StreamingMessage is stored as its headers, text body and attachment
+    paths: encoding the attachments again could fail the same way the send
+    did (a missing file, say). Other messages are in memory already and are
+    stored whole.
+    """
+    if hasattr(msg, 'iter_chunks'):
+        return {
+            'headers': msg.header_bytes().decode('utf-8', errors='replace'),
+            'body': msg.body,
+            'attachments': list(msg.attachments),
+        }
+    return {'message': msg.as_string()}
+
+
+class EmailJob:
+    def __init__(self, msg):
+        self.id = uuid.uuid4().hex
+        self.msg = msg
+        self.status = 'queued'  # queued | sending | retrying | sent | failed
+        self.attempts = 0
+        self.error = None
+        self.enqueued_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def _finish(self, status, error=None):
+        self.status = status
+        self.error = str(error) if error else None
+        self.finished_at = time.time()
+        self._done.set()
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'attempts': self.attempts,
+            'error': self.error,
+            'to': self.msg['To'],
+            'subject': self.msg['Subject'],
+            'enqueued_at': self.enqueued_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class EmailQueue:
+    """Queue-backed sender: callers enqueue and return immediately.
+
+    ``workers`` threads drain the queue through a shared SMTPPool. Transient
+    SMTP errors are retried with exponential backoff and jitter; permanent
+    failures (and transient ones that exhaust ``max_retries``) are appended
+    to a dead-letter JSONL file (see dead_letter_message). Every job ends
+    'sent' or 'failed', whatever goes wrong.
+    """
+
+    def __init__(self, transport=None, workers=None, max_retries=None, backoff=None,
+                 dead_letter_path=None, maxsize=0):
+        self.workers = int(workers or os.getenv('EMAIL_WORKERS', DEFAULT_WORKERS))
+        self.transport = transport or SMTPPool(size=self.workers)
+        self.max_retries = int(max_retries if max_retries is not None
+                               else os.getenv('EMAIL_MAX_RETRIES', DEFAULT_MAX_RETRIES))
+        self.backoff = float(backoff if backoff is not None else os.getenv('EMAIL_BACKOFF', DEFAULT_BACKOFF))
+        self.dead_letter_path = dead_letter_path or os.getenv('EMAIL_DEAD_LETTER', DEFAULT_DEAD_LETTER)
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._threads = []
+        self._dead_letter_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {'enqueued': 0, 'sent': 0, 'retried': 0, 'failed': 0}
+
+    # ----------------------------
+    # LIFECYCLE
+    # ----------------------------
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"email-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def enqueue(self, msg, block=True, timeout=None):
+        """Queue ``msg`` for delivery and return its EmailJob."""
+        job = EmailJob(msg)
+        self._queue.put(job, block=block, timeout=timeout)
+        self._count('enqueued')
+        return job
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def join(self):
+        """Block until every queued message is sent or dead-lettered."""
+        self._queue.join()
+
+    def close(self, wait=True):
+        if wait:
+            self.join()
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.transport.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ----------------------------
+    # WORKERS
+    # ----------------------------
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is _STOP:
+                    return
+                self._deliver(job)
+            except Exception as e:
+                # Never let one job take the worker down or stay 'sending'
+                if not job._done.is_set():
+                    self._count('failed')
+                    job._finish('failed', e)
+                print(f"✗ Email worker error on job {job.id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, job):
+        job.started_at = time.time()
+        while True:
+            job.attempts += 1
+            job.status = 'sending'
+            try:
+                refused = self.transport.send(job.msg)
+                self._count('sent')
+                # Delivered to the others; a refused recipient is not retried
+                job._finish('sent', f"refused: {', '.join(refused)}" if refused else None)
+                return
+            except Exception as e:
+                if is_transient(e) and job.attempts <= self.max_retries:
+                    self._count('retried')
+                    job.status = 'retrying'
+                    delay = min(MAX_BACKOFF, self.backoff * 2 ** (job.attempts - 1))
+                    time.sleep(delay * random.uniform(0.5, 1.0))
+                    continue
+                self._count('failed')
+                try:
+                    self._dead_letter(job, e)
+                finally:
+                    job._finish('failed', e)
+                return
+
+    def _dead_letter(self, job, error):
+        from_addr, to_addrs = envelope(job.msg)
+        entry = {
+            'id': job.id,
+            'failed_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'attempts': job.attempts,
+            'error': f"{type(error).__name__}: {error}",
+            'from': from_addr,
+            'to': to_addrs,
+            'subject': job.msg['Subject'],
+        }
+        entry.update(dead_letter_message(job.msg))
+        try:
+            with self._dead_letter_lock:
+                with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry) + '\n')
+        except OSError as e:
+            print(f"✗ Could not write dead-letter entry for job {job.id}: {e}")
+        print(f"✗ Email to {', '.join(to_addrs)} dead-lettered after {job.attempts} attempt(s): {error}")
@@ -1,24 +1,31 @@
 import os
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
 from dotenv import load_dotenv
+from mail_transport import SMTPPool
+from mail_stream import StreamingMessage, peak_rss_mb
+from attachment_cache import AttachmentCache
+from email_templates import EmailTemplate
+from screenshots import latest_screenshot
 
 load_dotenv()
 
+ATTACHMENTS = ['form_confirmation.png', 'resume.pdf', 'Technical Documentation.docx']
 
-def send_assignment_email():
-    sender_email = os.getenv('SENDER_EMAIL')
-    sender_password = os.getenv('SENDER_PASSWORD')
-    candidate_name = os.getenv('FULL_NAME')
+# Encoded attachments shared by every message built in this process
+attachment_cache = AttachmentCache()
 
-    to_email = 'tech@themedius.ai'
-    cc_email = 'hr@themedius.ai'
-    subject = f"Python (Selenium) Assignment - {candidate_name}"
 
-    body = f"""Dear Hiring Team,
+def attachment_paths(confirmation=None):
+    """ATTACHMENTS with the confirmation screenshot taken from ``confirmation``
+    or the newest run directory (see screenshots.py), falling back to the
+    legacy CWD file."""
+    confirmation = confirmation or latest_screenshot('form_confirmation')
+    return [confirmation if path == 'form_confirmation.png' and confirmation else path
+            for path in ATTACHMENTS]
+
+
+ASSIGNMENT_TEMPLATE = EmailTemplate(
+    subject="Python (Selenium) Assignment - ${candidate_name}",
+    body="""Dear Hiring Team,
 
 I am submitting my assignment for the Python (Selenium) position. Please find the attached materials:
 
@@ -43,48 +50,66 @@ Technical Approach Summary:
 I am excited about the opportunity to contribute to your team and look forward to discussing my application further.
 
 Best regards,
-{candidate_name}
-"""
-
-    msg = MIMEMultipart()
-    msg['From'] = sender_email
-    msg['To'] = to_email
-    msg['Cc'] = cc_email
-    msg['Subject'] = subject
-
-    msg.attach(MIMEText(body, 'plain'))
-
-    attachments = ['form_confirmation.png', 'resume.pdf', 'Technical Documentation.docx']
-
-    for file_path in attachments:
+${candidate_name}
+""",
+    headers={'To': 'tech@themedius.ai', 'Cc': 'hr@themedius.ai'},
+)
+
+
+def assignment_details():
+    headers, subject, body = ASSIGNMENT_TEMPLATE.render({'candidate_name': os.getenv('FULL_NAME')})
+    headers = dict(headers)
+
+    return {
+        'from': os.getenv('SENDER_EMAIL'),
+        'to': headers['To'],
+        'cc': headers['Cc'],
+        'subject': subject,
+        'body': body,
+    }
+
+
+def build_streaming_assignment_email(confirmation=None):
+    """The assignment email; attachments are base64 encoded from chunked
+    file reads during the SMTP DATA phase instead of being loaded into
+    memory up front."""
+    details = assignment_details()
+    msg = StreamingMessage(
+        [('From', details['from']), ('To', details['to']), ('Cc', details['cc']), ('Subject', details['subject'])],
+        details['body'],
+        attachment_cache=attachment_cache,
+    )
+
+    for file_path in attachment_paths(confirmation):
         if os.path.exists(file_path):
             try:
-                with open(file_path, 'rb') as attachment:
-                    part = MIMEBase('application', 'octet-stream')
-                    part.set_payload(attachment.read())
-                    encoders.encode_base64(part)
-                    filename = os.path.basename(file_path)
-                    part.add_header('Content-Disposition', f'attachment; filename= {filename}')
-                    msg.attach(part)
+                msg.add_attachment(file_path)
                 print(f"Attached: {file_path}")
             except Exception as e:
                 print(f"Error attaching {file_path}: {str(e)}")
         else:
             print(f"Warning: {file_path} not found")
 
-    try:
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()
-        server.login(sender_email, sender_password)
+    return msg
 
-        recipients = [to_email, cc_email]
-        server.send_message(msg)
-        server.quit()
+
+def send_assignment_email(transport=None, confirmation=None):
+    msg = build_streaming_assignment_email(confirmation)
+    own_transport = transport is None
+    transport = transport or SMTPPool(size=1)
+
+    try:
+        transport.send(msg)
 
         print("\nEmail sent successfully!")
-        print(f"To: {to_email}")
-        print(f"Cc: {cc_email}")
-        print(f"Subject: {subject}")
+        print(f"To: {msg['To']}")
+        print(f"Cc: {msg['Cc']}")
+        print(f"Subject: {msg['Subject']}")
+        rss = peak_rss_mb()
+        print(f"Streamed {msg.stats['bytes_streamed'] / 1024:.1f} KB "
+              f"(peak buffer {msg.stats['peak_buffer_bytes'] / 1024:.1f} KB"
+              + (f", peak RSS {rss:.1f} MB)" if rss is not None else ")"))
+        return True
 
     except Exception as e:
         print(f"\nError sending email: {str(e)}")
@@ -93,6 +118,18 @@ Best regards,
         print("2. Enable 2-Factor Authentication in your Google Account")
         print("3. Generate an App Password from Google Account Settings")
         print("4. Check your internet connection")
+        return False
+
+    finally:
+        if own_transport:
+            transport.close()
+
+
+def queue_assignment_email(email_queue):
+    """Hand the assignment email to an EmailQueue and return its job."""
+    job = email_queue.enqueue(build_streaming_assignment_email())
+    print(f"Queued email {job.id} ({email_queue.depth()} waiting)")
+    return job
 
 
 if __name__ == "__main__":
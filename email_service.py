@@ -0,0 +1,157 @@
+import os
+import queue
+import threading
+import argparse
+from collections import OrderedDict
+from dotenv import load_dotenv
+from flask import Flask, jsonify, request, url_for
+
+from email_queue import EmailQueue
+from email_sender import build_streaming_assignment_email
+from screenshots import DEFAULT_SCREENSHOT_DIR
+from instrumentation import percentile, PERCENTILES
+
+# Override with EMAIL_SERVICE_HOST / EMAIL_SERVICE_PORT in .env
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 5000
+# Jobs waiting beyond this are refused with 503 rather than queued.
+# Override with EMAIL_QUEUE_MAX in .env
+DEFAULT_QUEUE_MAX = 100
+# Finished jobs kept for /jobs/<id> and the latency figures in /metrics
+DEFAULT_JOB_HISTORY = 1000
+
+
+class JobRegistry:
+    """Jobs by id; the oldest finished ones are dropped past ``history``."""
+
+    def __init__(self, history=DEFAULT_JOB_HISTORY):
+        self.history = history
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, job):
+        with self._lock:
+            self._jobs[job.id] = job
+            if len(self._jobs) > self.history:
+                for job_id in [i for i, j in self._jobs.items() if j.finished_at][:len(self._jobs) - self.history]:
+                    del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+
+def screenshot_path(path):
+    """``path`` resolved, if it is a file under SCREENSHOT_DIR; else None.
+
+    Requests name the file to attach, so anything outside the screenshot
+    folder (.env, say) is refused.
+    """
+    root = os.path.realpath(os.getenv('SCREENSHOT_DIR', DEFAULT_SCREENSHOT_DIR))
+    resolved = os.path.realpath(path)
+    if os.path.commonpath([root, resolved]) != root or not os.path.isfile(resolved):
+        return None
+    return resolved
+
+
+def latency_summary(values):
+    values = sorted(values)
+    summary = {f'p{pct}': round(percentile(values, pct), 3) for pct in PERCENTILES}
+    summary['max'] = round(values[-1], 3) if values else 0.0
+    summary['count'] = len(values)
+    return summary
+
+
+def metrics(email_queue, registry):
+    jobs = registry.jobs()
+    finished = [j for j in jobs if j.finished_at]
+    started = [j for j in jobs if j.started_at]
+    return {
+        'queue_depth': email_queue.depth(),
+        'in_flight': sum(1 for j in jobs if j.status in ('sending', 'retrying')),
+        'workers': email_queue.workers,
+        'stats': dict(email_queue.stats),
+        'smtp': dict(email_queue.transport.stats),
+        # enqueue -> first attempt, first attempt -> done, enqueue -> done
+        'queue_wait_seconds': latency_summary([j.started_at - j.enqueued_at for j in started]),
+        'send_seconds': latency_summary([j.finished_at - j.started_at for j in finished if j.started_at]),
+        'latency_seconds': latency_summary([j.finished_at - j.enqueued_at for j in finished]),
+    }
+
+
+def create_app(email_queue=None, registry=None):
+    """Flask app that queues assignment emails instead of sending inline.
+
+    ``/send-assignment`` returns a job id straight away; the message goes
+    out on the EmailQueue's worker threads over its shared SMTPPool
+    (EMAIL_WORKERS sessions). SMTP credentials come from .env, never from
+    the request.
+    """
+    app = Flask(__name__)
+    if email_queue is None:
+        email_queue = EmailQueue(maxsize=int(os.getenv('EMAIL_QUEUE_MAX', DEFAULT_QUEUE_MAX))).start()
+    registry = registry or JobRegistry()
+    app.config['EMAIL_QUEUE'] = email_queue
+    app.config['JOB_REGISTRY'] = registry
+
+    @app.post('/send-assignment')
+    def send_assignment():
+        payload = request.get_json(silent=True) or {}
+        confirmation = payload.get('confirmation') or payload.get('screenshot_path')
+        if confirmation:
+            resolved = screenshot_path(confirmation) if isinstance(confirmation, str) else None
+            if resolved is None:
+                return jsonify({'error': f"not a screenshot under SCREENSHOT_DIR: {confirmation}"}), 400
+            confirmation = resolved
+        msg = build_streaming_assignment_email(confirmation)
+        try:
+            job = email_queue.enqueue(msg, block=False)
+        except queue.Full:
+            response = jsonify({'error': "email queue is full, retry later", 'queue_depth': email_queue.depth()})
+            response.headers['Retry-After'] = '5'
+            return response, 503
+        registry.add(job)
+        body = dict(job.to_dict(), status_url=url_for('job_status', job_id=job.id))
+        return jsonify(body), 202, {'Location': body['status_url']}
+
+    @app.get('/jobs/<job_id>')
+    def job_status(job_id):
+        job = registry.get(job_id)
+        if job is None:
+            return jsonify({'error': "unknown job"}), 404
+        return jsonify(job.to_dict())
+
+    @app.get('/metrics')
+    def get_metrics():
+        return jsonify(metrics(email_queue, registry))
+
+    return app
+
+
+def serve(host=None, port=None):
+    """Run the service until Ctrl+C; queued emails are finished on the way out."""
+    load_dotenv()
+    host = host or os.getenv('EMAIL_SERVICE_HOST', DEFAULT_HOST)
+    port = int(port or os.getenv('EMAIL_SERVICE_PORT', DEFAULT_PORT))
+    app = create_app()
+    print(f"Email service on http://{host}:{port} (Ctrl+C to stop)")
+    print(f"  curl -X POST http://{host}:{port}/send-assignment")
+    try:
+        app.run(host=host, port=port, threaded=True)
+    finally:
+        email_queue = app.config['EMAIL_QUEUE']
+        if email_queue.depth():
+            print(f"Sending {email_queue.depth()} queued email(s) before exiting...")
+        email_queue.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP API that queues the assignment email")
+    parser.add_argument('--host', default=None)
+    parser.add_argument('--port', type=int, default=None)
+    args = parser.parse_args()
+    serve(args.host, args.port)
@@ -0,0 +1,232 @@
+import os
+import re
+import argparse
+from email.utils import formataddr
+from string import Template
+from dotenv import load_dotenv
+
+from data_source import iter_rows
+from mail_stream import StreamingMessage
+from attachment_cache import AttachmentCache
+
+# Headers holding a mailbox; their templates are rendered through formataddr
+ADDRESS_HEADERS = {'from', 'to', 'cc', 'bcc', 'reply-to', 'sender'}
+
+_MAILBOX = re.compile(r'^(?P<name>.*?)\s*<(?P<address>[^<>]*)>$')
+
+
+class CompiledTemplate:
+    """A string.Template parsed once into literal / placeholder segments.
+
+    Rendering is a single join over the pre-split segments instead of a
+    regex scan of the whole text per recipient.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.segments = []  # (literal, placeholder name or None)
+        self.names = set()
+        position = 0
+        for match in Template.pattern.finditer(text):
+            literal = text[position:match.start()]
+            name = match.group('named') or match.group('braced')
+            if match.group('escaped') is not None:
+                self.segments.append((literal + Template.delimiter, None))
+            elif name is not None:
+                self.segments.append((literal, name))
+                self.names.add(name)
+            else:
+                raise ValueError(f"Invalid placeholder in template at offset {match.start()}")
+            position = match.end()
+        self.segments.append((text[position:], None))
+
+    def render(self, values):
+        parts = []
+        for literal, name in self.segments:
+            parts.append(literal)
+            if name is not None:
+                parts.append(str(values[name]))
+        return ''.join(parts)
+
+
+class AddressTemplate:
+    """A ``${name} <${address}>`` header template.
+
+    The display name and address are rendered separately and joined with
+    email.utils.formataddr, so a name such as "Doe, John" is quoted instead
+    of becoming a second recipient.
+    """
+
+    def __init__(self, text):
+        match = _MAILBOX.match(text.strip())
+        name, address = (match.group('name'), match.group('address')) if match else ('', text)
+        self.name = CompiledTemplate(name.strip().strip('"'))
+        self.address = CompiledTemplate(address.strip())
+        self.names = self.name.names | self.address.names
+
+    def render(self, values):
+        return formataddr((self.name.render(values), self.address.render(values)))
+
+
+def header_template(name, value):
+    if name.lower() in ADDRESS_HEADERS:
+        return AddressTemplate(value)
+    return CompiledTemplate(value)
+
+
+def check_header(name, value):
+    """Reject a rendered header value that would start a new header line."""
+    if '\r' in value or '\n' in value:
+        raise ValueError(f"line break in the {name} header")
+    return value
+
+
+class EmailTemplate:
+    """Subject, body and header templates compiled once, rendered per row."""
+
+    def __init__(self, subject, body, headers=None, subtype='plain'):
+        self.subject = CompiledTemplate(subject)
+        self.body = CompiledTemplate(body)
+        self.headers = [(name, header_template(name, value)) for name, value in (headers or {}).items()]
+        self.subtype = subtype
+
+    @property
+    def placeholders(self):
+        names = set(self.subject.names) | self.body.names
+        for _, template in self.headers:
+            names |= template.names
+        return names
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a template file: RFC 822 style headers, a blank line, the body.
+
+        Every header is itself a template, e.g. ``To: ${full_name} <${email_id}>``.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        head, _, body = text.partition('\n\n')
+        headers = {}
+        for line in head.splitlines():
+            name, _, value = line.partition(':')
+            headers[name.strip()] = value.strip()
+        subject = headers.pop('Subject', '')
+        return cls(subject, body, headers)
+
+    def render(self, values):
+        """Return (headers, subject, body) for one recipient.
+
+        Raises ValueError if a value puts a CR or LF into a header.
+        """
+        headers = [(name, check_header(name, template.render(values))) for name, template in self.headers]
+        subject = check_header('Subject', self.subject.render(values))
+        return headers, subject, self.body.render(values)
+
+
+class MessageSkeleton:
+    """The parts shared by every message of a bulk send.
+
+    Attachments are size-checked once and their encoded parts come from a
+    shared AttachmentCache, so per recipient only the headers and body are
+    rendered.
+    """
+
+    def __init__(self, template, attachments=(), sender=None, attachment_cache=None):
+        self.template = template
+        self.sender = sender
+        self.attachment_cache = attachment_cache or AttachmentCache()
+        # Validate once through a throwaway message; the list is then shared
+        self.attachments = StreamingMessage([], '', attachments).attachments
+
+    def build(self, values):
+        headers, subject, body = self.template.render(values)
+        if self.sender and not any(name.lower() == 'from' for name, _ in headers):
+            headers.insert(0, ('From', self.sender))
+        headers.append(('Subject', subject))
+        msg = StreamingMessage(headers, body, subtype=self.template.subtype,
+                               attachment_cache=self.attachment_cache)
+        msg.attachments = self.attachments
+        return msg
+
+    def render_rows(self, rows, on_error=None):
+        """Lazily yield one message per row.
+
+        Rows missing a placeholder or with a line break in a header value
+        are skipped.
+        """
+        for index, row in enumerate(rows):
+            try:
+                yield self.build(row)
+            except (KeyError, ValueError) as e:
+                if on_error:
+                    on_error(index, row, e)
+                elif isinstance(e, KeyError):
+                    print(f"⚠ Row {index}: missing value for {e}, skipped")
+                else:
+                    print(f"⚠ Row {index}: {e}, skipped")
+
+
+def send_bulk(skeleton, rows, transport=None, email_queue=None, batch_size=100):
+    """Stream rendered messages into an EmailQueue or straight over a transport.
+
+    With a transport, messages go out ``batch_size`` at a time over a single
+    session each, so only one batch of rendered messages exists at once.
+    With a queue, rendering blocks while the queue is full, so a bounded
+    EmailQueue limits how far rendering runs ahead of delivery. 'refused'
+    counts recipients refused on messages the others did receive.
+    """
+    sent = failed = refused = 0
+    messages = skeleton.render_rows(rows)
+    if email_queue is not None:
+        for msg in messages:
+            email_queue.enqueue(msg, block=True)
+            sent += 1
+        return {'queued': sent}
+
+    batch = []
+    for msg in messages:
+        batch.append(msg)
+        if len(batch) >= batch_size:
+            results = transport.send_many(batch)
+            failed += sum(1 for r in results if isinstance(r, Exception))
+            sent += sum(1 for r in results if not isinstance(r, Exception))
+            refused += sum(len(r) for r in results if isinstance(r, dict))
+            batch = []
+    if batch:
+        results = transport.send_many(batch)
+        failed += sum(1 for r in results if isinstance(r, Exception))
+        sent += sum(1 for r in results if not isinstance(r, Exception))
+        refused += sum(len(r) for r in results if isinstance(r, dict))
+    return {'sent': sent, 'failed': failed, 'refused': refused}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Render a template per row of a CSV/JSONL file and send it")
+    parser.add_argument('template', help="template file (headers, blank line, body)")
+    parser.add_argument('rows', help="CSV or JSONL data source; columns become placeholders")
+    parser.add_argument('--attach', action='append', default=[], help="attachment shared by every message")
+    parser.add_argument('--queue', action='store_true', help="send through an EmailQueue (retries, dead-letter)")
+    parser.add_argument('--batch-size', type=int, default=100, help="messages per SMTP session")
+    parser.add_argument('--queue-size', type=int, default=int(os.getenv('EMAIL_QUEUE_MAX', 100)),
+                        help="with --queue, rendered messages waiting at most (default: EMAIL_QUEUE_MAX or 100)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    args = parse_args()
+
+    from mail_transport import SMTPPool
+    from email_queue import EmailQueue
+
+    skeleton = MessageSkeleton(EmailTemplate.from_file(args.template), args.attach,
+                               sender=os.getenv('SENDER_EMAIL'))
+    if args.queue:
+        with EmailQueue(maxsize=max(1, args.queue_size)) as email_queue:
+            result = send_bulk(skeleton, iter_rows(args.rows), email_queue=email_queue)
+        print(f"Queued {result['queued']} messages: {email_queue.stats}")
+    else:
+        with SMTPPool(size=1) as transport:
+            result = send_bulk(skeleton, iter_rows(args.rows), transport=transport, batch_size=args.batch_size)
+        print(f"Sent {result['sent']} messages, {result['failed']} failed, "
+              f"{result['refused']} recipients refused")
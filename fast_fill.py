@@ -0,0 +1,94 @@
+# Fills every field in a single execute_script round trip.
+#
+# arguments[0] is a list of {name, kind, value, element} specs:
+#   kind 'text'       - input/textarea, value set through the native setter
+#   kind 'date'       - input[type=date], value must be YYYY-MM-DD
+#   kind 'choice'     - radio matched on its normalized aria-label / data-value,
+#                       within element (the question) if given
+#   kind 'last-empty' - last empty text input once the other fields are set
+#
+# Google Forms tracks values through its own input/change listeners, so the
+# native value setter is used (bypassing framework overrides) and both events
+# are dispatched. Returns one {name, ok, value, error} entry per spec.
+FAST_FILL_SCRIPT = """
+const specs = arguments[0];
+const report = [];
+
+function setValue(el, value) {
+    const proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    const setter = Object.getOwnPropertyDescriptor(proto, 'value').set;
+    el.focus();
+    setter.call(el, value);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    el.blur();
+    return el.value;
+}
+
+function normalize(text) {
+    return (text || '').toLowerCase().replace(/[^\\p{L}\\p{N}]+/gu, ' ').trim();
+}
+
+function fill(spec) {
+    if (spec.kind === 'choice') {
+        // Same normalization as choice_resolver.normalize_label. An exact
+        // label wins, then one with trailing text ("Male, option 1 of 3");
+        // never a substring, so 'male' does not pick 'Female'.
+        const wanted = normalize(spec.value);
+        const radios = Array.from((spec.element || document).querySelectorAll('[role="radio"], input[type="radio"]'));
+        const labels = radio => [radio.getAttribute('aria-label'), radio.getAttribute('data-value'), radio.value]
+            .filter(Boolean).map(normalize);
+        const radio = radios.find(r => labels(r).includes(wanted))
+            || radios.find(r => labels(r).some(label => label.startsWith(wanted + ' ')));
+        if (radio) {
+            radio.click();
+            const checked = radio.getAttribute('aria-checked') === 'true' || radio.checked === true;
+            return {ok: checked, value: radio.getAttribute('aria-label') || radio.getAttribute('data-value')};
+        }
+        return {ok: false, error: radios.length ? 'no matching option' : 'no radio options'};
+    }
+    let el = spec.element;
+    if (spec.kind === 'last-empty') {
+        const empty = Array.from(document.querySelectorAll('input[type="text"]')).filter(i => i.value === '');
+        el = empty.length ? empty[empty.length - 1] : null;
+    }
+    if (!el) {
+        return {ok: false, error: 'element not found'};
+    }
+    const value = setValue(el, spec.value);
+    return {ok: value === spec.value, value: value};
+}
+
+for (const spec of specs) {
+    let result;
+    try {
+        result = fill(spec);
+    } catch (e) {
+        result = {ok: false, error: String(e)};
+    }
+    result.name = spec.name;
+    report.push(result);
+}
+return report;
+"""
+
+
+def field_spec(name, value, element=None, kind='text'):
+    return {'name': name, 'kind': kind, 'value': value, 'element': element}
+
+
+def fast_fill(driver, specs):
+    """Fill all ``specs`` in one round trip and return the per-field report."""
+    return driver.execute_script(FAST_FILL_SCRIPT, specs)
+
+
+def failed_fields(report):
+    return [entry['name'] for entry in report if not entry.get('ok')]
+
+
+def print_report(report):
+    for entry in report:
+        if entry.get('ok'):
+            print(f"✓ {entry['name']}: {str(entry.get('value', ''))[:50]}")
+        else:
+            print(f"✗ {entry['name']}: {entry.get('error') or 'value rejected'} (falling back)")
@@ -1,244 +1,613 @@
 import os
 import time
-from selenium import webdriver
+import argparse
+from dataclasses import dataclass, field
+from typing import Optional
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.keys import Keys
 from dotenv import load_dotenv
 from datetime import datetime
+from browser import BrowserProfile, create_driver
+from waits import WaitEngine
+from form_schema import REQUIRED_FIELDS, load_schema, schema_elements, remember_strategy
+from choice_resolver import STRATEGIES, OptionIndex, load_options, select_option
+from fast_fill import fast_fill, field_spec, failed_fields, print_report as print_fill_report
+from record_validation import GENDER_ALIASES, validate_record
+from form_verify import expected_spec, read_back, mismatches, print_report as print_verify_report
+from screenshots import ScreenshotStore, latest_screenshot
+from submission_journal import SubmissionJournal, record_key, journal_hook
+from rate_control import bucket_for
+from instrumentation import Recorder, recording, stage, summarize_events, print_histogram
+
+VERIFICATION_CODE = "GNFPYC"
+
+# Keys of a submission record. The .env file uses the same names in upper case.
+RECORD_FIELDS = [
+    'form_url', 'full_name', 'contact_number', 'email_id',
+    'full_address', 'pin_code', 'date_of_birth', 'gender'
+]
+
+# Browser fill modes: 'keys' types into each field, 'fast' sets them all in
+# one round trip. batch_runner's 'http' mode has no browser to fill.
+FILL_MODES = ('keys', 'fast')
+
+
+def load_record_from_env():
+    load_dotenv()
+    return {key: os.getenv(key.upper()) for key in RECORD_FIELDS}
+
+
+@dataclass
+class RunConfig:
+    """Settings shared by every stage of one run (form, screenshots, email)."""
+    record: dict = field(default_factory=load_record_from_env)
+    fill_mode: str = 'keys'
+    pipeline: bool = False
+    send_email: bool = True
+    profile: Optional[BrowserProfile] = None
+
+    @classmethod
+    def from_env(cls, **overrides):
+        """FILL_MODE, PIPELINE_MODE and the browser profile from .env.
+
+        Overrides set to None are ignored. Pipeline runs default to headless.
+        """
+        load_dotenv()
+        settings = {
+            'fill_mode': os.getenv('FILL_MODE', 'keys').lower(),
+            'pipeline': os.getenv('PIPELINE_MODE') == '1',
+        }
+        settings.update({key: value for key, value in overrides.items() if value is not None})
+        config = cls(**settings)
+        if config.profile is None:
+            config.profile = BrowserProfile.from_env(headless=True if config.pipeline else None)
+        return config
+
+    def validate(self):
+        """Normalize the record in place; returns the list of problems.
+
+        Run before a browser is started so bad .env values fail fast.
+        """
+        self.record, errors = validate_record(self.record)
+        if self.fill_mode not in FILL_MODES:
+            hint = " (HTTP submission is batch_runner.py --fill-mode http)" if self.fill_mode == 'http' else ""
+            errors.append(f"FILL_MODE must be one of {', '.join(FILL_MODES)}, not '{self.fill_mode}'{hint}")
+        for error in errors:
+            print(f"✗ {error}")
+        return errors
+
 
 # ----------------------------
-# LOAD ENVIRONMENT VARIABLES
+# OPEN FORM
 # ----------------------------
-load_dotenv()
-print("DEBUG: GENDER =", os.getenv('GENDER'))  # Debug check
+def throttle_form(url):
+    """Wait for the form host's token bucket (FORM_RATE); no-op when unlimited."""
+    bucket = bucket_for('form', url)
+    if bucket is not None:
+        with stage('rate_limit'):
+            bucket.acquire()
 
-chrome_options = Options()
-chrome_options.add_argument('--start-maximized')
 
-try:
-    from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.chrome.service import Service
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-except:
-    driver = webdriver.Chrome(options=chrome_options)
+def open_form(driver, waits, form_url, use_schema=None):
+    """Load the form and locate its fields.
 
-# ----------------------------
-# READ VALUES FROM .ENV
-# ----------------------------
-form_url = os.getenv('FORM_URL')
-full_name = os.getenv('FULL_NAME')
-contact_number = os.getenv('CONTACT_NUMBER')
-email_id = os.getenv('EMAIL_ID')
-full_address = os.getenv('FULL_ADDRESS')
-pin_code = os.getenv('PIN_CODE')
-date_of_birth = os.getenv('DATE_OF_BIRTH')
-gender = os.getenv('GENDER')
-
-print("=" * 70)
-print(" " * 20 + "GOOGLE FORM AUTOMATION")
-print("=" * 70)
+    Fields come from the cached form schema when it covers every required
+    field (FORM_SCHEMA=0 disables this), otherwise from positional lookup.
+    """
+    if use_schema is None:
+        use_schema = os.getenv('FORM_SCHEMA', '1') != '0'
 
-# ----------------------------
-# OPEN FORM
-# ----------------------------
-driver.get(form_url)
-print("\n[1/9] Opening form...")
-time.sleep(5)
-
-text_inputs = driver.find_elements(By.CSS_SELECTOR, 'input[type="text"]')
-textarea = driver.find_elements(By.TAG_NAME, 'textarea')[0]
-date_field = driver.find_element(By.CSS_SELECTOR, 'input[type="date"]')
-
-print(f"Found {len(text_inputs)} text fields, 1 textarea, 1 date field\n")
-
-
-def fill_field(field, value, name):
-    try:
-        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", field)
-        time.sleep(0.8)
-        field.click()
-        time.sleep(0.3)
-        field.clear()
-        time.sleep(0.2)
-        field.send_keys(value)
-        time.sleep(0.5)
-        print(f"✓ {name}: {value[:50]}")
-        return True
-    except Exception as e:
-        print(f"✗ {name}: ERROR - {str(e)}")
-        return False
+    throttle_form(form_url)
+    with stage('page_load'):
+        driver.get(form_url)
+        waits.form_rendered()
 
+    with stage('locate_fields') as event:
+        return _locate_fields(driver, form_url, use_schema, event)
 
-# ----------------------------
-# FILL TEXT FIELDS
-# ----------------------------
-print("[2/9] Filling Full Name...")
-fill_field(text_inputs[0], full_name, "Full Name")
 
-print("[3/9] Filling Contact Number...")
-fill_field(text_inputs[1], contact_number, "Contact Number")
+def _locate_fields(driver, form_url, use_schema, event):
+    if use_schema:
+        try:
+            questions, located = load_schema(driver, form_url)
+            elements = schema_elements(questions, located)
+            if all(field in elements for field in REQUIRED_FIELDS):
+                text_inputs = [el for q, el in zip(questions, located) if q['type'] == 'text' and el is not None]
+                event['strategy'] = 'schema'
+                return {'elements': elements, 'text_inputs': text_inputs, 'schema': questions, 'form_url': form_url}
+            print("⚠ Form schema does not cover every field, using positional lookup")
+        except Exception as e:
+            print(f"⚠ Form schema unavailable ({str(e)}), using positional lookup")
+
+    event['strategy'] = 'positional'
+    text_inputs = driver.find_elements(By.CSS_SELECTOR, 'input[type="text"]')
+    textarea = driver.find_elements(By.TAG_NAME, 'textarea')[0]
+    date_field = driver.find_element(By.CSS_SELECTOR, 'input[type="date"]')
+    return {
+        'elements': {
+            'full_name': text_inputs[0],
+            'contact_number': text_inputs[1],
+            'email_id': text_inputs[2],
+            'full_address': textarea,
+            'pin_code': text_inputs[3],
+            'date_of_birth': date_field,
+        },
+        'text_inputs': text_inputs,
+        'schema': None,
+        'form_url': form_url,
+    }
 
-print("[4/9] Filling Email ID...")
-fill_field(text_inputs[2], email_id, "Email ID")
 
-print("[5/9] Filling Full Address (TEXTAREA)...")
-fill_field(textarea, full_address, "Full Address")
+# ----------------------------
+# FIELD HELPERS
+# ----------------------------
+def fill_field(driver, waits, field, value, name):
+    with stage('fill_field', field=name) as event:
+        try:
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", field)
+            waits.clickable(field, name)
+            field.click()
+            field.clear()
+            field.send_keys(value)
+            waits.value_accepted(field, value, name)
+            print(f"✓ {name}: {value[:50]}")
+            return True
+        except Exception as e:
+            event['ok'] = False
+            print(f"✗ {name}: ERROR - {str(e)}")
+            return False
+
+
+def fill_date_of_birth(driver, waits, date_field, date_of_birth):
+    with stage('date_injection') as event:
+        try:
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", date_field)
+            waits.clickable(date_field, "Date of Birth")
+
+            date_obj = datetime.strptime(date_of_birth, '%Y-%m-%d')
+
+            date_field.click()
+
+            driver.execute_script("arguments[0].value = '';", date_field)
+
+            year = str(date_obj.year)
+            month = str(date_obj.month).zfill(2)
+            day = str(date_obj.day).zfill(2)
+            formatted_date = f"{year}-{month}-{day}"
+
+            driver.execute_script(f"arguments[0].value = '{formatted_date}';", date_field)
+            waits.value_accepted(date_field, formatted_date, "Date of Birth")
+            date_field.send_keys(Keys.TAB)
+
+            print(f"✓ Date of Birth: {day}/{month}/{year}")
+            return True
+        except Exception as e:
+            event['ok'] = False
+            print(f"✗ Date of Birth: ERROR - {str(e)}")
+            return False
+
+
+def schema_question(fields, field_name):
+    """The cached schema question for a record field, or None."""
+    for question in fields['schema'] or []:
+        if question.get('field') == field_name:
+            return question
+    return None
+
+
+def select_gender(driver, waits, fields, gender):
+    """Pick the gender option with the choice resolver.
+
+    The question's options are indexed in one round trip (radio, checkbox,
+    listbox or select, whichever it is) and matched on the normalized
+    label. With a form schema the strategy that worked is cached, so later
+    runs go straight to it.
+    """
+    with stage('gender') as event:
+        question = schema_question(fields, 'gender')
+        scope = fields['elements'].get('gender')
+        hint = None
+        if question is not None:
+            hint = question.get('strategy') or (question['type'] if question['type'] in STRATEGIES else None)
+        try:
+            choice = load_options(driver, scope, hint, aliases=GENDER_ALIASES)
+            event['strategy'] = choice.strategy
+            if choice.strategy != 'text':
+                print(f"   Found {len(choice.labels)} {choice.strategy} options")
+                label = select_option(driver, waits, choice, gender, "Gender")
+                event['match'] = choice.match
+                if label is None:
+                    print(f"✗ Gender: no option matches {gender} (options: {', '.join(choice.labels)})")
+                    event['ok'] = False
+                    return False
+                print(f"✓ Gender: {label} selected ({choice.strategy}, {choice.match} match)")
+            else:
+                print("⚠ No radio/dropdown found — filling as text input...")
+                text_inputs = fields['text_inputs']
+                gender_input = choice.control
+                if gender_input is None and len(text_inputs) > 4:
+                    gender_input = text_inputs[4]
+                if gender_input is None:
+                    print("✗ No gender input field available")
+                    event['ok'] = False
+                    return False
+                event['ok'] = fill_field(driver, waits, gender_input, gender, "Gender")
+                if not event['ok']:
+                    return False
+            if question is not None:
+                remember_strategy(fields['form_url'], question, choice.strategy)
+            return True
+        except Exception as e:
+            event['ok'] = False
+            print(f"✗ Gender selection error: {str(e)}")
+            return False
+
+
+def fill_verification_code(driver, waits, fields, code=VERIFICATION_CODE):
+    if 'verification_code' in fields['elements']:
+        return fill_field(driver, waits, fields['elements']['verification_code'], code, "Verification Code")
+
+    text_inputs = fields['text_inputs']
+    code_fields = []
+    for inp in text_inputs:
+        try:
+            inp_value = inp.get_attribute('value') or ''
+            if inp_value == '':
+                code_fields.append(inp)
+        except Exception:
+            pass
+
+    if len(code_fields) > 0:
+        return fill_field(driver, waits, code_fields[-1], code, "Verification Code")
+    return fill_field(driver, waits, text_inputs[-1], code, "Verification Code")
 
-print("[6/9] Filling Pin Code...")
-fill_field(text_inputs[3], pin_code, "Pin Code")
 
 # ----------------------------
-# FILL DATE FIELD
+# FILL WHOLE FORM
 # ----------------------------
-print("[7/9] Filling Date of Birth...")
-try:
-    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", date_field)
-    time.sleep(0.8)
+TEXT_FIELDS = [
+    ("Full Name", 'full_name'),
+    ("Contact Number", 'contact_number'),
+    ("Email ID", 'email_id'),
+    ("Full Address", 'full_address'),
+    ("Pin Code", 'pin_code'),
+]
+
+
+def text_field_plan(fields, record):
+    elements = fields['elements']
+    return [(name, elements[key], record[key]) for name, key in TEXT_FIELDS]
+
+
+def gender_label(fields, gender):
+    """The form's own label for ``gender`` when the schema has its options
+    (so 'M' on the form gets picked for 'Male'), else ``gender`` itself."""
+    question = schema_question(fields, 'gender')
+    if question is None or not question.get('options'):
+        return gender
+    position, _ = OptionIndex(question['options'], GENDER_ALIASES).match(gender)
+    return gender if position is None else question['options'][position]
+
+
+def fast_fill_form(driver, waits, fields, record):
+    """Fill every field in one round trip, keystroke-filling only the rejects."""
+    plan = text_field_plan(fields, record)
+    specs = [field_spec(name, value, element) for name, element, value in plan]
+    specs += [
+        field_spec("Date of Birth", record['date_of_birth'], fields['elements']['date_of_birth'], kind='date'),
+        field_spec("Gender", gender_label(fields, record['gender']), fields['elements'].get('gender'), kind='choice'),
+    ]
+    code_element = fields['elements'].get('verification_code')
+    if code_element is not None:
+        specs.append(field_spec("Verification Code", VERIFICATION_CODE, code_element))
+    else:
+        specs.append(field_spec("Verification Code", VERIFICATION_CODE, kind='last-empty'))
+    with stage('fast_fill') as event:
+        report = fast_fill(driver, specs)
+        event['ok'] = not failed_fields(report)
+    print_fill_report(report)
 
-    date_obj = datetime.strptime(date_of_birth, '%Y-%m-%d')
+    fallbacks = {
+        name: (lambda element=element, value=value, name=name: fill_field(driver, waits, element, value, name))
+        for name, element, value in plan
+    }
+    fallbacks["Date of Birth"] = lambda: fill_date_of_birth(
+        driver, waits, fields['elements']['date_of_birth'], record['date_of_birth']
+    )
+    fallbacks["Gender"] = lambda: select_gender(driver, waits, fields, record['gender'])
+    fallbacks["Verification Code"] = lambda: fill_verification_code(driver, waits, fields)
 
-    date_field.click()
-    time.sleep(0.5)
+    return all([fallbacks[name]() for name in failed_fields(report)])
 
-    driver.execute_script("arguments[0].value = '';", date_field)
-    time.sleep(0.3)
 
-    year = str(date_obj.year)
-    month = str(date_obj.month).zfill(2)
-    day = str(date_obj.day).zfill(2)
-    formatted_date = f"{year}-{month}-{day}"
+def keystroke_fill_form(driver, waits, fields, record):
+    results = []
+    steps = text_field_plan(fields, record)
+    for step, (name, element, value) in enumerate(steps, start=2):
+        suffix = " (TEXTAREA)" if name == "Full Address" else ""
+        print(f"[{step}/9] Filling {name}{suffix}...")
+        results.append(fill_field(driver, waits, element, value, name))
 
-    driver.execute_script(f"arguments[0].value = '{formatted_date}';", date_field)
-    time.sleep(0.5)
-    date_field.send_keys(Keys.TAB)
-    time.sleep(1)
+    print("[7/9] Filling Date of Birth...")
+    results.append(fill_date_of_birth(driver, waits, fields['elements']['date_of_birth'], record['date_of_birth']))
 
-    print(f"✓ Date of Birth: {day}/{month}/{year}")
-except Exception as e:
-    print(f"✗ Date of Birth: ERROR - {str(e)}")
+    print("[8/9] Selecting Gender (Auto-Detect)...")
+    results.append(select_gender(driver, waits, fields, record['gender']))
 
-# ----------------------------
-# FILL GENDER FIELD (AUTO-DETECT)
-# ----------------------------
-print("[8/9] Selecting Gender (Auto-Detect)...")
-time.sleep(1.5)
-
-try:
-    # Case 1: Radio buttons
-    radio_buttons = driver.find_elements(By.CSS_SELECTOR, 'div[role="radio"]')
-    if radio_buttons:
-        print(f"   Found {len(radio_buttons)} radio options")
-        gender_found = False
-        for radio in radio_buttons:
-            aria_label = radio.get_attribute('aria-label') or ''
-            data_value = radio.get_attribute('data-value') or ''
-            if gender.lower() in aria_label.lower() or gender.lower() == data_value.lower():
-                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", radio)
-                time.sleep(0.5)
-                radio.click()
-                print(f"✓ Gender: {gender} selected (radio)")
-                gender_found = True
-                break
-        if not gender_found:
-            print("⚠ Gender radio option not found, trying other methods...")
-
-    # Case 2: Dropdown
-    if not radio_buttons:
-        try:
-            gender_dropdown = driver.find_element(By.CSS_SELECTOR, 'div[role="listbox"]')
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", gender_dropdown)
-            gender_dropdown.click()
-            time.sleep(1)
-            option = driver.find_element(By.XPATH, f"//div[@role='option' and text()='{gender}']")
-            option.click()
-            print(f"✓ Gender: {gender} selected (dropdown)")
-        except Exception:
-            # Case 3: Text input (fallback)
-            print("⚠ No radio/dropdown found — filling as text input...")
-            if len(text_inputs) > 4:
-                fill_field(text_inputs[4], gender, "Gender")
-            else:
-                print("✗ No gender input field available")
-except Exception as e:
-    print(f"✗ Gender selection error: {str(e)}")
+    print(f"[9/9] Filling Verification Code ({VERIFICATION_CODE})...")
+    results.append(fill_verification_code(driver, waits, fields))
+    return all(results)
+
+
+def fill_form(driver, waits, fields, record, fill_mode='keys'):
+    if fill_mode not in FILL_MODES:
+        raise ValueError(f"unknown fill mode '{fill_mode}'; expected one of {', '.join(FILL_MODES)}")
+    if fill_mode == 'fast':
+        print("[2/9] Fast fill: sending all fields in one round trip...")
+        return fast_fill_form(driver, waits, fields, record)
+    return keystroke_fill_form(driver, waits, fields, record)
 
-# ----------------------------
-# FILL VERIFICATION CODE
-# ----------------------------
-print("[9/9] Filling Verification Code (GNFPYC)...")
-time.sleep(1)
-
-code_fields = []
-for inp in text_inputs:
-    try:
-        inp_value = inp.get_attribute('value') or ''
-        if inp_value == '':
-            code_fields.append(inp)
-    except:
-        pass
-
-if len(code_fields) > 0:
-    last_empty_field = code_fields[-1]
-    fill_field(last_empty_field, "GNFPYC", "Verification Code")
-else:
-    fill_field(text_inputs[-1], "GNFPYC", "Verification Code")
 
 # ----------------------------
-# FINAL CONFIRMATIONS
+# VALIDATE (replaces the manual check before submit)
 # ----------------------------
-print("\n" + "=" * 70)
-print(" " * 15 + "🎯 ALL FIELDS FILLED! 🎯")
-print("=" * 70)
-
-time.sleep(2)
-driver.save_screenshot('form_filled_before_submit.png')
-print("✓ Screenshot saved: form_filled_before_submit.png")
-
-print("\n" + "=" * 70)
-print("VERIFY in browser window:")
-print("  ✓ Full Name: " + full_name)
-print("  ✓ Contact: " + contact_number)
-print("  ✓ Email: " + email_id)
-print("  ✓ Address: " + full_address)
-print("  ✓ Pin: " + pin_code)
-print("  ✓ DOB: " + date_of_birth)
-print("  ✓ Gender: " + gender + " (CHECK IN FORM!)")
-print("  ✓ Code: GNFPYC")
-input("\nPress ENTER to SUBMIT (Ctrl+C to cancel)...")
-print("=" * 70)
+def expected_values(fields, record):
+    elements = fields['elements']
+    specs = [expected_spec(name, record[key], elements[key]) for name, key in TEXT_FIELDS]
+    specs.append(expected_spec("Date of Birth", record['date_of_birth'], elements['date_of_birth']))
+    specs.append(expected_spec("Gender", record['gender'], elements.get('gender'), kind='choice',
+                               aliases=GENDER_ALIASES))
+    code_element = elements.get('verification_code')
+    specs.append(expected_spec("Verification Code", VERIFICATION_CODE, code_element,
+                               kind='text' if code_element is not None else 'any'))
+    return specs
+
+
+def verify_form(driver, fields, record):
+    """Read every field back in one call; returns the per-field report."""
+    with stage('validate') as event:
+        report = read_back(driver, expected_values(fields, record))
+        event['ok'] = not mismatches(report)
+    print_verify_report(report)
+    return report
+
 
 # ----------------------------
 # SUBMIT FORM
 # ----------------------------
-try:
-    print("\nSubmitting form...")
-    submit_buttons = driver.find_elements(By.CSS_SELECTOR, '[type="submit"]')
-    if submit_buttons:
+def submit_form(driver, waits):
+    with stage('submit') as event:
+        submit_buttons = driver.find_elements(By.CSS_SELECTOR, '[type="submit"]')
+        if not submit_buttons:
+            print("✗ Submit button not found")
+            event['ok'] = False
+            return False
+
         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", submit_buttons[0])
-        time.sleep(1)
+        waits.clickable(submit_buttons[0], "Submit")
+        old_url = driver.current_url
+        throttle_form(old_url)
         submit_buttons[0].click()
         print("✓ Clicked Submit")
-        time.sleep(6)
-        driver.save_screenshot('form_confirmation.png')
-        print("✓ Confirmation screenshot saved")
-
-        print("\n" + "=" * 70)
-        print(" " * 10 + "FORM SUBMITTED SUCCESSFULLY!")
-        print("=" * 70)
-        print("\n Files created:")
-        print("   • form_filled_before_submit.png")
-        print("   • form_confirmation.png")
-        print("\n Next: Run 'python send_email_simple.py'")
-        print("=" * 70)
-    else:
-        print("✗ Submit button not found")
-except Exception as e:
-    print(f"\n✗ Error: {str(e)}")
-    driver.save_screenshot('error_screenshot.png')
-
-print("\nClosing in 3 seconds...")
-time.sleep(3)
-driver.quit()
-print("Done!")
+        if not waits.confirmation_loaded(submit_buttons[0], old_url):
+            print("✗ No confirmation page after submitting; the form did not accept the response")
+            event['ok'] = False
+            return False
+        return True
+
+
+def run_submission(driver, record, fill_mode='keys', screenshots=None, screenshot_name='form_confirmation',
+                   waits=None, recorder=None, on_stage=None):
+    """Open, fill and submit one record on an existing driver (no prompts).
+
+    The record is submitted only if every field was filled and reads back
+    as expected (the unattended stand-in for the manual check). With a
+    ScreenshotStore the confirmation page is captured as ``screenshot_name``;
+    encoding and writing finish in the background.
+    Stage events go to ``recorder`` (a new one by default) and are returned
+    under 'stages'. ``on_stage(name)`` is called as the record reaches each
+    journal stage (see submission_journal.STAGES). Returns a result dict so
+    batch callers can aggregate outcomes.
+    """
+    waits = waits or WaitEngine(driver)
+    recorder = recorder or Recorder(driver, email_id=record.get('email_id'))
+    on_stage = on_stage or (lambda name: None)
+    start = time.perf_counter()
+    result = {'email_id': record.get('email_id'), 'ok': False, 'error': None}
+    with recording(recorder):
+        try:
+            fields = open_form(driver, waits, record['form_url'])
+            result['filled'] = fill_form(driver, waits, fields, record, fill_mode)
+            if not result['filled']:
+                result['error'] = "not every field could be filled; form NOT submitted"
+                return _finish_result(result, start, waits, recorder)
+            on_stage('filled')
+            bad = mismatches(verify_form(driver, fields, record))
+            if bad:
+                result['error'] = "validation failed: " + ", ".join(e['name'] for e in bad)
+                return _finish_result(result, start, waits, recorder)
+            on_stage('validated')
+            on_stage('submitting')
+            result['ok'] = submit_form(driver, waits)
+            if result['ok']:
+                on_stage('submitted')
+            if result['ok'] and screenshots is not None:
+                _journal_screenshot(screenshots.capture(driver, screenshot_name, dedupe=True), on_stage)
+        except Exception as e:
+            result['error'] = str(e)
+    return _finish_result(result, start, waits, recorder)
+
+
+def _finish_result(result, start, waits, recorder):
+    result['seconds'] = time.perf_counter() - start
+    result['waited'] = waits.total()
+    result['stages'] = recorder.events
+    return result
+
+
+def _journal_screenshot(future, on_stage):
+    """Report 'screenshotted' once the capture is actually on disk."""
+    def done(f):
+        if f.exception() is None:
+            on_stage('screenshotted')
+    future.add_done_callback(done)
+    return future
+
+
+def print_verification_summary(record):
+    print("\n" + "=" * 70)
+    print("VERIFY in browser window:")
+    print("  ✓ Full Name: " + record['full_name'])
+    print("  ✓ Contact: " + record['contact_number'])
+    print("  ✓ Email: " + record['email_id'])
+    print("  ✓ Address: " + record['full_address'])
+    print("  ✓ Pin: " + record['pin_code'])
+    print("  ✓ DOB: " + record['date_of_birth'])
+    print("  ✓ Gender: " + record['gender'] + " (CHECK IN FORM!)")
+    print("  ✓ Code: " + VERIFICATION_CODE)
+
+
+def automate_form(driver, config, screenshots, waits=None, on_stage=None):
+    """The form stage of a run: fill, check and submit ``config.record``.
+
+    Interactive runs stop for a human before submitting. In pipeline mode
+    the read-back validation replaces that prompt and the form is submitted
+    only if every field matches. Returns {'ok', 'confirmation', 'error',
+    'stages'}, where confirmation is the confirmation screenshot's path and
+    stages the instrumentation events of the run. ``on_stage`` is called
+    as in run_submission.
+    """
+    record = config.record
+    waits = waits or WaitEngine(driver)
+    recorder = Recorder(driver, run=screenshots.run_id)
+    on_stage = on_stage or (lambda name: None)
+    result = {'ok': False, 'confirmation': None, 'error': None, 'stages': recorder.events}
+    print("DEBUG: GENDER =", record['gender'])  # Debug check
+
+    print("=" * 70)
+    print(" " * 20 + "GOOGLE FORM AUTOMATION")
+    print("=" * 70)
+
+    with recording(recorder):
+        try:
+            print("\n[1/9] Opening form...")
+            fields = open_form(driver, waits, record['form_url'])
+            if fields['schema']:
+                print(f"Loaded form schema: {len(fields['schema'])} questions\n")
+            else:
+                print(f"Found {len(fields['text_inputs'])} text fields, 1 textarea, 1 date field\n")
+
+            # fill_mode 'fast' sets every field in one execute_script call; default is keystrokes
+            fill_form(driver, waits, fields, record, config.fill_mode)
+            on_stage('filled')
+
+            # ----------------------------
+            # FINAL CONFIRMATIONS
+            # ----------------------------
+            print("\n" + "=" * 70)
+            print(" " * 15 + "🎯 ALL FIELDS FILLED! 🎯")
+            print("=" * 70)
+
+            before_submit = screenshots.capture(driver, 'form_filled_before_submit')
+            print(f"✓ Screenshot captured: {screenshots.run_dir}")
+
+            report = verify_form(driver, fields, record)
+            if config.pipeline:
+                if mismatches(report):
+                    print("\n✗ Validation failed, form NOT submitted")
+                    result['error'] = "validation failed: " + ", ".join(e['name'] for e in mismatches(report))
+                    screenshots.capture(driver, 'error_screenshot', selector='')
+                    return result
+            else:
+                print_verification_summary(record)
+                input("\nPress ENTER to SUBMIT (Ctrl+C to cancel)...")
+            on_stage('validated')
+            print("=" * 70)
+
+            print("\nSubmitting form...")
+            on_stage('submitting')
+            if submit_form(driver, waits):
+                on_stage('submitted')
+                _journal_screenshot(screenshots.capture(driver, 'form_confirmation', dedupe=True), on_stage)
+                result['confirmation'] = screenshots.result('form_confirmation')
+                result['ok'] = True
+                print("\n" + "=" * 70)
+                print(" " * 10 + "FORM SUBMITTED SUCCESSFULLY!")
+                print("=" * 70)
+                print("\n Files created:")
+                print(f"   • {before_submit.result()}")
+                print(f"   • {result['confirmation']}")
+                print("=" * 70)
+        except Exception as e:
+            print(f"\n✗ Error: {str(e)}")
+            result['error'] = str(e)
+            screenshots.capture(driver, 'error_screenshot', selector='')
+        finally:
+            waits.print_report()
+            print_histogram(summarize_events(recorder.events))
+    return result
+
+
+def main(pipeline=None, send_email=True):
+    """Run the form stage (and in pipeline mode the email) on its own browser.
+
+    Progress is journaled per record, so running again after a crash or a
+    failed email does not submit the same record twice. Returns a process
+    exit code.
+    """
+    config = RunConfig.from_env(pipeline=pipeline, send_email=send_email)
+    if config.validate():
+        print("Fix the values above in .env and run again")
+        return 1
+    with SubmissionJournal() as journal:
+        key = record_key(config.record)
+        on_stage = journal_hook(journal, key, email_id=config.record.get('email_id'))
+        emailing = config.pipeline and config.send_email
+        if journal.is_done(key, 'emailed') or (journal.is_done(key) and not emailing):
+            print(f"✓ Already submitted ({journal.stage(key)}, see {journal.path}); nothing to do")
+            return 0
+        if journal.is_uncertain(key):
+            print("⚠ A previous run crashed while submitting this record; check the form's responses.")
+            print(f"  Delete its entries from {journal.path} to submit it again.")
+            return 1
+        if journal.is_done(key):
+            print("✓ Already submitted; only sending the email")
+            confirmation = latest_screenshot('form_confirmation')
+            return 0 if _send_email(confirmation, on_stage) else 1
+
+        driver = create_driver(profile=config.profile)
+        screenshots = ScreenshotStore()
+        try:
+            result = automate_form(driver, config, screenshots, on_stage=on_stage)
+            if not result['ok']:
+                return 1
+            if emailing:
+                return 0 if _send_email(result['confirmation'], on_stage) else 1
+            print("\n Next: Run 'python email_sender.py'")
+            return 0
+        finally:
+            print("\nClosing browser...")
+            driver.quit()
+            screenshots.close()
+            print("Done!")
+
+
+def _send_email(confirmation, on_stage):
+    from email_sender import send_assignment_email
+    sent = send_assignment_email(confirmation=confirmation)
+    if sent:
+        on_stage('emailed')
+    return sent
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fill and submit the Google Form from .env")
+    parser.add_argument('--pipeline', action='store_true', default=None,
+                        help="unattended: headless, validate instead of prompting, auto-submit and email")
+    parser.add_argument('--no-email', action='store_true', help="in pipeline mode, stop after submitting")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    raise SystemExit(main(pipeline=args.pipeline, send_email=not args.no_email))
@@ -0,0 +1,227 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+# On-disk schema cache, keyed by form URL. Override with FORM_SCHEMA_CACHE in .env
+DEFAULT_SCHEMA_CACHE = os.path.join('.cache', 'form_schemas.json')
+
+# Record field -> label keywords, checked in this order. pin_code comes before
+# verification_code so "Pin Code" is not mistaken for the verification code.
+FIELD_KEYWORDS = [
+    ('email_id', ['email', 'e-mail']),
+    ('contact_number', ['contact', 'phone', 'mobile']),
+    ('full_address', ['address']),
+    ('pin_code', ['pin', 'postal', 'zip']),
+    ('date_of_birth', ['birth', 'dob']),
+    ('gender', ['gender', 'sex']),
+    ('verification_code', ['verification', 'captcha', 'code']),
+    ('full_name', ['name']),
+]
+
+# Fields that must be located for the schema to replace positional lookup.
+REQUIRED_FIELDS = ['full_name', 'contact_number', 'email_id', 'full_address', 'pin_code', 'date_of_birth']
+
+# Shared helpers: the structural signature used for the cache hash and the
+# list of form controls. Prepended to both scripts below.
+_COMMON_JS = """
+const CONTROL_SELECTOR = 'input:not([type="hidden"]):not([type="submit"]):not([type="button"]),'
+    + ' textarea, [role="radio"], [role="checkbox"], [role="listbox"]';
+
+function controls() {
+    return Array.from(document.querySelectorAll(CONTROL_SELECTOR));
+}
+
+function signature() {
+    const parts = controls().map(el => [el.tagName, el.getAttribute('type') || '', el.getAttribute('role') || ''].join('/'));
+    document.querySelectorAll('[role="heading"]').forEach(h => parts.push('H:' + h.textContent.trim()));
+    return parts.join('\\n');
+}
+"""
+
+DISCOVER_SCRIPT = _COMMON_JS + """
+function cssPath(el) {
+    const parts = [];
+    while (el && el.nodeType === 1 && el !== document.body) {
+        if (el.id) {
+            parts.unshift('#' + CSS.escape(el.id));
+            return parts.join(' > ');
+        }
+        let index = 1;
+        for (let sib = el.previousElementSibling; sib; sib = sib.previousElementSibling) {
+            if (sib.tagName === el.tagName) index++;
+        }
+        parts.unshift(el.tagName.toLowerCase() + ':nth-of-type(' + index + ')');
+        el = el.parentElement;
+    }
+    parts.unshift('body');
+    return parts.join(' > ');
+}
+
+function textOfIds(ids) {
+    return (ids || '').split(/\\s+/).map(id => {
+        const node = id && document.getElementById(id);
+        return node ? node.textContent.trim() : '';
+    }).filter(Boolean).join(' ');
+}
+
+function questionLabel(el) {
+    const item = el.closest('[role="listitem"]');
+    const heading = item && item.querySelector('[role="heading"]');
+    return el.getAttribute('aria-label') || el.getAttribute('title')
+        || textOfIds(el.getAttribute('aria-labelledby'))
+        || (heading ? heading.textContent.trim() : '')
+        || el.getAttribute('name') || '';
+}
+
+function optionLabel(el) {
+    return el.getAttribute('aria-label') || el.getAttribute('data-value') || el.value || el.textContent.trim();
+}
+
+const questions = [];
+const elements = [];
+const seenGroups = new Set();
+
+for (const el of controls()) {
+    const role = el.getAttribute('role');
+    const inputType = el.tagName === 'TEXTAREA' ? 'textarea' : (el.getAttribute('type') || 'text').toLowerCase();
+    const choice = role === 'radio' || role === 'checkbox' ? role
+        : (inputType === 'radio' || inputType === 'checkbox' ? inputType : null);
+
+    if (choice) {
+        const group = el.closest('[role="radiogroup"], [role="group"], [role="listitem"], fieldset') || el.parentElement;
+        if (seenGroups.has(group)) continue;
+        seenGroups.add(group);
+        const options = Array.from(group.querySelectorAll('[role="' + choice + '"], input[type="' + choice + '"]'));
+        questions.push({label: questionLabel(group), type: choice, locator: cssPath(group), options: options.map(optionLabel)});
+        elements.push(group);
+    } else if (role === 'listbox') {
+        const options = Array.from(el.querySelectorAll('[role="option"]')).map(optionLabel).filter(Boolean);
+        questions.push({label: questionLabel(el), type: 'listbox', locator: cssPath(el), options: options});
+        elements.push(el);
+    } else {
+        questions.push({label: questionLabel(el), type: inputType, locator: cssPath(el), options: []});
+        elements.push(el);
+    }
+}
+return {signature: signature(), questions: questions, elements: elements};
+"""
+
+LOCATE_SCRIPT = _COMMON_JS + """
+return {signature: signature(), elements: arguments[0].map(sel => document.querySelector(sel))};
+"""
+
+_memory_cache = {}
+_cache_lock = threading.Lock()
+
+
+# ----------------------------
+# CACHE
+# ----------------------------
+def _cache_file():
+    return os.getenv('FORM_SCHEMA_CACHE', DEFAULT_SCHEMA_CACHE)
+
+
+def _read_cache():
+    path = _cache_file()
+    if path not in _memory_cache:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                _memory_cache[path] = json.load(f)
+        except (OSError, ValueError):
+            _memory_cache[path] = {}
+    return _memory_cache[path]
+
+
+def _write_cache(cache):
+    path = _cache_file()
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠ Could not write schema cache {path}: {e}")
+
+
+def structure_hash(signature):
+    return hashlib.sha256(signature.encode('utf-8')).hexdigest()
+
+
+# ----------------------------
+# DISCOVERY
+# ----------------------------
+def match_field(label):
+    label = label.lower()
+    for field, keywords in FIELD_KEYWORDS:
+        if any(keyword in label for keyword in keywords):
+            return field
+    return None
+
+
+def assign_fields(questions):
+    """Tag each question with the record field it collects (first match wins)."""
+    taken = set()
+    for question in questions:
+        field = match_field(question['label'])
+        question['field'] = field if field and field not in taken else None
+        if question['field']:
+            taken.add(field)
+    return questions
+
+
+def discover_schema(driver):
+    result = driver.execute_script(DISCOVER_SCRIPT)
+    return assign_fields(result['questions']), result['elements'], structure_hash(result['signature'])
+
+
+def load_schema(driver, form_url):
+    """Return (questions, elements) for the rendered form.
+
+    A cached schema for ``form_url`` is reused, and its elements located in
+    one round trip, as long as the page's structure hash still matches.
+    Otherwise the form is re-discovered and the cache updated.
+    """
+    with _cache_lock:
+        entry = _read_cache().get(form_url)
+
+    if entry:
+        located = driver.execute_script(LOCATE_SCRIPT, [q['locator'] for q in entry['questions']])
+        if structure_hash(located['signature']) == entry['hash']:
+            return entry['questions'], located['elements']
+        print("ℹ Form structure changed, re-discovering schema...")
+
+    questions, elements, digest = discover_schema(driver)
+    with _cache_lock:
+        cache = _read_cache()
+        cache[form_url] = {'hash': digest, 'discovered_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'questions': questions}
+        _write_cache(cache)
+    return questions, elements
+
+
+def remember_strategy(form_url, question, strategy):
+    """Cache the choice strategy that worked for ``question`` so later runs
+    resolve it without detection (see choice_resolver.load_options)."""
+    if question.get('strategy') == strategy:
+        return
+    question['strategy'] = strategy
+    with _cache_lock:
+        cache = _read_cache()
+        entry = cache.get(form_url)
+        if not entry:
+            return
+        for cached in entry['questions']:
+            if cached['locator'] == question['locator']:
+                cached['strategy'] = strategy
+        _write_cache(cache)
+
+
+def schema_elements(questions, elements):
+    """Map record field -> located element for every tagged question."""
+    return {
+        question['field']: element
+        for question, element in zip(questions, elements)
+        if question.get('field') and element is not None
+    }
@@ -0,0 +1,93 @@
+from choice_resolver import labels_match
+
+# Reads every filled value back in a single execute_script round trip so a
+# run can be checked against the record before it is submitted.
+#
+# arguments[0] is a list of {name, kind, value, element} specs:
+#   kind 'text'   - input/textarea (including date inputs); element.value
+#   kind 'choice' - the checked radio (or the selected listbox option)
+#                   within element, the question; falls back to
+#                   element.value for text inputs
+#   kind 'any'    - any text input holding the value (e.g. the verification
+#                   code when its field is not known)
+# Returns one {name, actual} entry per spec.
+READBACK_SCRIPT = """
+const specs = arguments[0];
+
+function read(spec) {
+    if (spec.kind === 'choice') {
+        const scope = spec.element || document;
+        const checked = scope.querySelector('[role="radio"][aria-checked="true"], input[type="radio"]:checked');
+        if (checked) {
+            return checked.getAttribute('aria-label') || checked.getAttribute('data-value') || checked.value || '';
+        }
+        const option = scope.querySelector('div[role="listbox"] div[role="option"][aria-selected="true"]');
+        if (option) {
+            return option.getAttribute('data-value') || option.textContent.trim();
+        }
+        return spec.element ? spec.element.value : null;
+    }
+    if (spec.kind === 'any') {
+        const inputs = Array.from(document.querySelectorAll('input[type="text"]'));
+        return inputs.some(i => i.value === spec.value) ? spec.value : null;
+    }
+    return spec.element ? spec.element.value : null;
+}
+
+return specs.map(spec => {
+    try {
+        return {name: spec.name, actual: read(spec)};
+    } catch (e) {
+        return {name: spec.name, actual: null, error: String(e)};
+    }
+});
+"""
+
+
+def expected_spec(name, value, element=None, kind='text', aliases=None):
+    """``aliases`` (choice only) are passed to choice_resolver.labels_match."""
+    return {'name': name, 'kind': kind, 'value': value, 'element': element, 'aliases': aliases}
+
+
+def _matches(spec, actual):
+    if actual is None:
+        return False
+    expected = (spec['value'] or '').strip()
+    actual = actual.strip()
+    if spec['kind'] == 'choice':
+        # Exact or alias-equal only ('M' passes for 'Male'); a near miss
+        # is a mismatch, never a pass
+        return labels_match(expected, actual, spec.get('aliases'))
+    return expected == actual
+
+
+def read_back(driver, specs):
+    """Read all ``specs`` in one round trip and compare with the expected values.
+
+    Returns one {name, expected, actual, ok} entry per spec.
+    """
+    values = driver.execute_script(READBACK_SCRIPT, specs)
+    report = []
+    for spec, entry in zip(specs, values):
+        report.append({
+            'name': spec['name'],
+            'expected': spec['value'],
+            'actual': entry.get('actual'),
+            'ok': _matches(spec, entry.get('actual')),
+            'error': entry.get('error'),
+        })
+    return report
+
+
+def mismatches(report):
+    return [entry for entry in report if not entry['ok']]
+
+
+def print_report(report):
+    print("\nValidation (read back from the form):")
+    for entry in report:
+        status = "✓" if entry['ok'] else "✗"
+        line = f"  {status} {entry['name']}: {entry['actual']!r}"
+        if not entry['ok']:
+            line += f" (expected {entry['expected']!r})"
+        print(line)
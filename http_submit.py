@@ -0,0 +1,241 @@
+import os
+import re
+import json
+import time
+import argparse
+import threading
+from datetime import datetime
+from html.parser import HTMLParser
+from urllib.parse import urlencode, urljoin
+
+import urllib3
+
+from form_schema import assign_fields
+from choice_resolver import OptionIndex
+from record_validation import GENDER_ALIASES, validate_record
+from rate_control import throttle
+from instrumentation import Recorder, recording, stage
+from waits import CONFIRMATION_MARKERS
+
+VERIFICATION_CODE = "GNFPYC"
+
+# Connections kept per host in the shared pool. Override with HTTP_POOL_SIZE in .env
+DEFAULT_POOL_SIZE = 8
+DEFAULT_TIMEOUT = 15
+USER_AGENT = ('Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/119.0 Safari/537.36')
+
+# Google Forms question type codes in FB_PUBLIC_LOAD_DATA_
+GOOGLE_TYPES = {0: 'text', 1: 'textarea', 2: 'radio', 3: 'listbox', 4: 'checkbox', 9: 'date'}
+PAGE_BREAK = 8
+CHOICE_TYPES = ('radio', 'listbox', 'checkbox', 'choice')
+
+_LOAD_DATA = re.compile(r'FB_PUBLIC_LOAD_DATA_\s*=\s*(.*?);\s*</script>', re.DOTALL)
+
+
+class NeedsBrowser(Exception):
+    """The form cannot be submitted over plain HTTP; use the Selenium path."""
+
+
+# ----------------------------
+# PARSING
+# ----------------------------
+class _FormParser(HTMLParser):
+    """Collects the form's action and hidden inputs (fbzx and friends)."""
+
+    def __init__(self):
+        super().__init__()
+        self.action = None
+        self.hidden = {}
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'form' and self.action is None:
+            self.action = attrs.get('action')
+        elif tag == 'input' and attrs.get('type') == 'hidden' and attrs.get('name'):
+            # Answer inputs (entry.<id>) are filled from the record instead
+            if not attrs['name'].startswith('entry.'):
+                self.hidden[attrs['name']] = attrs.get('value') or ''
+
+
+def _questions(load_data):
+    """Questions from FB_PUBLIC_LOAD_DATA_ as [{entry_id, label, type, options}].
+
+    Google's nested layout and the stand-in's flat [entry_id, label, kind]
+    rows are both understood.
+    """
+    if load_data and all(isinstance(q, list) and len(q) == 3 and isinstance(q[0], int) for q in load_data):
+        return [{'entry_id': entry_id, 'label': label, 'type': kind, 'options': [], 'date_parts': False}
+                for entry_id, label, kind in load_data]
+
+    questions = []
+    try:
+        items = load_data[1][1]
+    except (IndexError, TypeError):
+        raise NeedsBrowser("unrecognised FB_PUBLIC_LOAD_DATA_ layout")
+    for item in items or []:
+        if len(item) > 3 and item[3] == PAGE_BREAK:
+            raise NeedsBrowser("multi-page form")
+        if len(item) < 5 or not item[4]:
+            continue  # titles, images, text blocks
+        kind = GOOGLE_TYPES.get(item[3])
+        if kind is None:
+            raise NeedsBrowser(f"unsupported question type {item[3]} ({item[1]})")
+        answer = item[4][0]
+        options = [option[0] for option in (answer[1] or []) if option and option[0]]
+        questions.append({'entry_id': answer[0], 'label': item[1] or '', 'type': kind, 'options': options,
+                          'date_parts': kind == 'date'})
+    return questions
+
+
+def parse_form(html, form_url):
+    """Return {'action', 'hidden', 'questions'} for a rendered form page."""
+    match = _LOAD_DATA.search(html)
+    if not match:
+        raise NeedsBrowser("no FB_PUBLIC_LOAD_DATA_ on the page")
+    try:
+        load_data = json.loads(match.group(1))
+    except ValueError:
+        raise NeedsBrowser("FB_PUBLIC_LOAD_DATA_ is not plain JSON")
+    parser = _FormParser()
+    parser.feed(html)
+    if not parser.action:
+        raise NeedsBrowser("no <form> on the page")
+    return {
+        'action': urljoin(form_url, parser.action),
+        'hidden': parser.hidden,
+        'questions': assign_fields(_questions(load_data)),
+    }
+
+
+# ----------------------------
+# ANSWERS
+# ----------------------------
+def answer_fields(form, record):
+    """POST fields for ``record``: entry.<id> answers plus the hidden tokens."""
+    fields = dict(form['hidden'])
+    for question in form['questions']:
+        key = question['field']
+        if key is None:
+            raise NeedsBrowser(f"no record field for question '{question['label']}'")
+        value = VERIFICATION_CODE if key == 'verification_code' else record.get(key)
+        if value is None:
+            raise NeedsBrowser(f"record has no {key}")
+        name = f"entry.{question['entry_id']}"
+
+        if question['type'] in CHOICE_TYPES and question['options']:
+            # Only an exact or alias match is posted; a near miss is not
+            # something to guess at without seeing the page
+            position, how = OptionIndex(question['options'], GENDER_ALIASES).match(value)
+            if position is None or how != 'exact':
+                raise ValueError(f"{question['label']}: no option is {value}")
+            fields[name] = question['options'][position]
+        elif question['date_parts']:
+            # Google posts dates as separate year / month / day fields
+            day = datetime.strptime(value, '%Y-%m-%d')
+            fields[f"{name}_year"] = str(day.year)
+            fields[f"{name}_month"] = str(day.month)
+            fields[f"{name}_day"] = str(day.day)
+        else:
+            fields[name] = value
+    return fields
+
+
+# ----------------------------
+# SUBMITTING
+# ----------------------------
+_http = None
+_http_lock = threading.Lock()
+
+
+def http_pool():
+    """Process-wide urllib3 PoolManager shared by every submission."""
+    global _http
+    with _http_lock:
+        if _http is None:
+            size = int(os.getenv('HTTP_POOL_SIZE', DEFAULT_POOL_SIZE))
+            _http = urllib3.PoolManager(
+                num_pools=4, maxsize=size, block=True,
+                timeout=urllib3.Timeout(total=float(os.getenv('WAIT_TIMEOUT', DEFAULT_TIMEOUT))),
+                retries=urllib3.Retry(total=2, backoff_factor=0.5, allowed_methods=['GET']),
+                headers={'User-Agent': USER_AGENT},
+            )
+        return _http
+
+
+def fetch_form(http, form_url):
+    throttle('form', form_url)
+    response = http.request('GET', form_url)
+    if response.status != 200:
+        raise NeedsBrowser(f"form page returned HTTP {response.status}")
+    return parse_form(response.data.decode('utf-8', 'replace'), form_url)
+
+
+def post_answers(http, form, fields):
+    """POST the answers; returns True once the confirmation page comes back."""
+    throttle('form', form['action'])
+    response = http.request('POST', form['action'], body=urlencode(fields),
+                            headers={'Content-Type': 'application/x-www-form-urlencoded'})
+    page = response.data.decode('utf-8', 'replace')
+    if response.status != 200:
+        raise RuntimeError(f"form rejected the response (HTTP {response.status}): {_text(page)[:200]}")
+    return any(marker in page for marker in CONFIRMATION_MARKERS)
+
+
+def _text(page):
+    return re.sub(r'\s+', ' ', re.sub(r'<[^>]+>', ' ', page)).strip()
+
+
+def submit_record(record, http=None, recorder=None, on_stage=None):
+    """Submit one record without a browser; same result dict as run_submission.
+
+    Raises NeedsBrowser (before anything is posted) for forms this engine
+    cannot handle, so callers can fall back to the Selenium path.
+    """
+    http = http or http_pool()
+    recorder = recorder or Recorder(email_id=record.get('email_id'))
+    on_stage = on_stage or (lambda name: None)
+    start = time.perf_counter()
+    result = {'email_id': record.get('email_id'), 'ok': False, 'error': None, 'engine': 'http'}
+    with recording(recorder):
+        try:
+            with stage('http_fetch'):
+                form = fetch_form(http, record['form_url'])
+            fields = answer_fields(form, record)
+            on_stage('filled')
+            on_stage('submitting')
+            with stage('http_submit') as event:
+                result['ok'] = event['ok'] = post_answers(http, form, fields)
+            if result['ok']:
+                on_stage('submitted')
+            else:
+                result['error'] = "no confirmation page after submitting"
+        except NeedsBrowser:
+            raise
+        except Exception as e:
+            result['error'] = str(e)
+    result['seconds'] = time.perf_counter() - start
+    result['stages'] = recorder.events
+    return result
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from form_automation import load_record_from_env
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Submit the .env record over HTTP, without a browser")
+    parser.add_argument('--form-url', default=None, help="override FORM_URL (e.g. the stand-in server)")
+    args = parser.parse_args()
+    record = load_record_from_env()
+    record['form_url'] = args.form_url or record['form_url']
+    record, errors = validate_record(record)
+    if errors:
+        raise SystemExit("\n".join(f"✗ {error}" for error in errors))
+    try:
+        result = submit_record(record)
+    except NeedsBrowser as e:
+        raise SystemExit(f"✗ This form needs the browser ({e}); run form_automation.py instead")
+    print(f"{'✓ Submitted' if result['ok'] else '✗ Failed'} in {result['seconds']:.3f}s"
+          + (f" - {result['error']}" if result['error'] else ""))
+    raise SystemExit(0 if result['ok'] else 1)
@@ -0,0 +1,192 @@
+import os
+import json
+import time
+import argparse
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+# Where stage events are appended as JSON lines. Override with METRICS_FILE
+# in .env; an empty value keeps events in memory only.
+DEFAULT_METRICS_FILE = 'metrics.jsonl'
+PERCENTILES = (50, 95, 99)
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+# ----------------------------
+# WEBDRIVER COMMAND COUNTING
+# ----------------------------
+class CommandCounter:
+    """Counts every WebDriver command sent by one driver.
+
+    All commands, including WebElement ones, go through ``driver.execute``,
+    so wrapping that single method on the instance sees them all.
+    """
+
+    def __init__(self, driver):
+        self.count = 0
+        self.by_command = Counter()
+        original = driver.execute
+
+        def execute(driver_command, params=None):
+            self.count += 1
+            self.by_command[driver_command] += 1
+            return original(driver_command, params)
+
+        driver.execute = execute
+
+
+def command_counter(driver):
+    counter = getattr(driver, '_command_counter', None)
+    if counter is None:
+        counter = CommandCounter(driver)
+        driver._command_counter = counter
+    return counter
+
+
+# ----------------------------
+# RECORDING
+# ----------------------------
+class Recorder:
+    """Collects stage events (wall time and WebDriver commands) for one run.
+
+    ``context`` (run id, record index, ...) is added to every event. Events
+    are written to ``metrics_file`` in one append when ``flush()`` is called.
+    """
+
+    def __init__(self, driver=None, metrics_file=None, **context):
+        self.counter = command_counter(driver) if driver is not None else None
+        self.metrics_file = (metrics_file if metrics_file is not None
+                             else os.getenv('METRICS_FILE', DEFAULT_METRICS_FILE))
+        self.context = context
+        self.events = []
+        self._written = 0
+
+    @contextmanager
+    def stage(self, name, /, **attrs):
+        """Time the block; the yielded dict can be given extra attributes."""
+        event = dict(self.context, stage=name, **attrs)
+        commands = self.counter.count if self.counter else 0
+        start = time.perf_counter()
+        event['ok'] = True
+        try:
+            yield event
+        except BaseException:
+            event['ok'] = False
+            raise
+        finally:
+            event['seconds'] = round(time.perf_counter() - start, 6)
+            if self.counter:
+                event['commands'] = self.counter.count - commands
+            event['ts'] = time.time()
+            self.events.append(event)
+
+    def flush(self):
+        if not self.metrics_file or self._written == len(self.events):
+            return
+        lines = ''.join(json.dumps(e) + '\n' for e in self.events[self._written:])
+        with _write_lock:
+            with open(self.metrics_file, 'a', encoding='utf-8') as f:
+                f.write(lines)
+        self._written = len(self.events)
+
+
+@contextmanager
+def recording(recorder):
+    """Make ``recorder`` the one ``stage()`` reports to on this thread."""
+    previous = getattr(_local, 'recorder', None)
+    _local.recorder = recorder
+    try:
+        yield recorder
+    finally:
+        _local.recorder = previous
+        recorder.flush()
+
+
+@contextmanager
+def stage(name, /, **attrs):
+    """Record a stage on the active recorder; a no-op without one."""
+    recorder = getattr(_local, 'recorder', None)
+    if recorder is None:
+        yield dict(attrs)
+        return
+    with recorder.stage(name, **attrs) as event:
+        yield event
+
+
+# ----------------------------
+# SUMMARY
+# ----------------------------
+def stage_key(event):
+    return event['stage']
+
+
+def field_key(event):
+    """Splits fill_field events per field, e.g. 'fill_field:Pin Code'."""
+    return f"{event['stage']}:{event['field']}" if 'field' in event else event['stage']
+
+
+def summarize_events(events, key=stage_key):
+    """Per-stage count, p50/p95/p99/max seconds and mean WebDriver commands."""
+    by_stage = {}
+    for event in events:
+        by_stage.setdefault(key(event), []).append(event)
+    summary = {}
+    for name, stage_events in by_stage.items():
+        seconds = sorted(e['seconds'] for e in stage_events)
+        commands = [e['commands'] for e in stage_events if 'commands' in e]
+        entry = {'count': len(seconds), 'max': seconds[-1], 'failed': sum(1 for e in stage_events if not e['ok'])}
+        for pct in PERCENTILES:
+            entry[f'p{pct}'] = percentile(seconds, pct)
+        entry['commands'] = sum(commands) / len(commands) if commands else None
+        strategies = Counter(e['strategy'] for e in stage_events if e.get('strategy'))
+        if strategies:
+            entry['strategies'] = dict(strategies)
+        summary[name] = entry
+    return summary
+
+
+def print_histogram(summary, width=30):
+    if not summary:
+        return
+    print("\n" + "=" * 70)
+    print(" " * 24 + "STAGE LATENCY (s)")
+    print("=" * 70)
+    label_width = max(16, max(len(name) for name in summary) + 2)
+    print(f"  {'stage':<{label_width}}{'n':>5}{'p50':>8}{'p95':>8}{'p99':>8}{'cmds':>6}")
+    scale = max(entry['p99'] for entry in summary.values()) or 1.0
+    for name, entry in sorted(summary.items(), key=lambda item: -item[1]['p50']):
+        bar = '█' * max(1, int(entry['p50'] / scale * width)) if entry['p50'] else ''
+        tail = '░' * (int(entry['p99'] / scale * width) - len(bar)) if entry['p99'] else ''
+        commands = f"{entry['commands']:.0f}" if entry['commands'] is not None else '-'
+        print(f"  {name:<{label_width}}{entry['count']:>5}{entry['p50']:>8.3f}{entry['p95']:>8.3f}{entry['p99']:>8.3f}"
+              f"{commands:>6}  {bar}{tail}")
+        if entry.get('strategies'):
+            print(f"  {'':<{label_width}}strategies: " + ", ".join(f"{k} x{v}" for k, v in entry['strategies'].items()))
+    print("=" * 70)
+
+
+def load_events(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarise stage timings from a metrics JSONL file")
+    parser.add_argument('path', nargs='?', default=DEFAULT_METRICS_FILE)
+    parser.add_argument('--run', default=None, help="only events from this run id")
+    parser.add_argument('--per-field', action='store_true', help="split fill_field by field")
+    args = parser.parse_args()
+    events = load_events(args.path)
+    if args.run:
+        events = [e for e in events if e.get('run') == args.run]
+    print_histogram(summarize_events(events, field_key if args.per_field else stage_key))
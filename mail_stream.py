@@ -0,0 +1,162 @@
+import os
+import re
+import sys
+import base64
+import secrets
+from email.message import Message
+from email.mime.text import MIMEText
+from email import policy
+
+# Raw bytes read per chunk. A multiple of 57 so every chunk encodes to whole
+# 76-character base64 lines. Override with ATTACHMENT_CHUNK_BYTES in .env
+DEFAULT_CHUNK_BYTES = 57 * 1024
+# Largest attachment accepted (Gmail's limit). Override with ATTACHMENT_MAX_BYTES
+DEFAULT_MAX_ATTACHMENT_BYTES = 25 * 1024 * 1024
+
+CRLF = b'\r\n'
+_SMTP_POLICY = policy.compat32.clone(linesep='\r\n')
+_LEADING_DOT = re.compile(rb'(?m)^\.')
+
+
+class AttachmentTooLarge(ValueError):
+    pass
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def attachment_headers(filename):
+    return (
+        b'Content-Type: application/octet-stream' + CRLF
+        + b'MIME-Version: 1.0' + CRLF
+        + b'Content-Transfer-Encoding: base64' + CRLF
+        + f'Content-Disposition: attachment; filename= {filename}'.encode('utf-8') + CRLF
+        + CRLF
+    )
+
+
+def iter_base64_file(path, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Yield CRLF-terminated base64 lines for ``path`` one chunk at a time.
+
+    A single read buffer is reused, so memory stays at roughly
+    ``chunk_bytes`` plus its encoding no matter how large the file is.
+    """
+    chunk_bytes = max(57, chunk_bytes - chunk_bytes % 57)
+    buffer = bytearray(chunk_bytes)
+    view = memoryview(buffer)
+    with open(path, 'rb') as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            yield base64.encodebytes(view[:n]).replace(b'\n', CRLF)
+
+
+class StreamingMessage:
+    """multipart/mixed message whose attachments are encoded while sending.
+
+    Nothing is held in memory beyond the headers, the text body and one
+    encoded chunk. ``iter_chunks()`` can be called again for a retry; the
+    files are simply re-read. With an ``attachment_cache`` the pre-encoded
+    part is sent from the cache when it fits the budget. Exposes ``[]`` / ``get_all`` for headers so it
+    can be used wherever an email.message.Message is expected for routing.
+    """
+
+    def __init__(self, headers, body, attachments=(), subtype='plain',
+                 max_attachment_bytes=None, chunk_bytes=None, attachment_cache=None):
+        self.headers = list(headers)
+        self.attachment_cache = attachment_cache
+        self.body = body
+        self.subtype = subtype
+        self.max_attachment_bytes = int(max_attachment_bytes or os.getenv(
+            'ATTACHMENT_MAX_BYTES', DEFAULT_MAX_ATTACHMENT_BYTES))
+        self.chunk_bytes = int(chunk_bytes or os.getenv('ATTACHMENT_CHUNK_BYTES', DEFAULT_CHUNK_BYTES))
+        self.boundary = '=' * 15 + secrets.token_hex(16) + '=='
+        self.attachments = []
+        self.stats = {'bytes_streamed': 0, 'peak_buffer_bytes': 0}
+        for path in attachments:
+            self.add_attachment(path)
+
+    # ----------------------------
+    # HEADERS
+    # ----------------------------
+    def __getitem__(self, name):
+        values = self.get_all(name)
+        return values[0] if values else None
+
+    def __setitem__(self, name, value):
+        self.headers.append((name, value))
+
+    def __delitem__(self, name):
+        self.headers = [(k, v) for k, v in self.headers if k.lower() != name.lower()]
+
+    def get_all(self, name, failobj=None):
+        values = [v for k, v in self.headers if k.lower() == name.lower()]
+        return values or failobj
+
+    def add_attachment(self, path):
+        size = os.path.getsize(path)
+        if size > self.max_attachment_bytes:
+            raise AttachmentTooLarge(
+                f"{path} is {size / (1024 * 1024):.1f} MB (limit {self.max_attachment_bytes / (1024 * 1024):.1f} MB)"
+            )
+        self.attachments.append(path)
+
+    # ----------------------------
+    # SERIALISATION
+    # ----------------------------
+    def header_bytes(self):
+        top = Message()
+        for name, value in self.headers:
+            if name.lower() != 'bcc':
+                top[name] = value
+        top['MIME-Version'] = '1.0'
+        top['Content-Type'] = f'multipart/mixed; boundary="{self.boundary}"'
+        top.set_payload('')
+        return top.as_bytes(policy=_SMTP_POLICY)
+
+    def body_bytes(self):
+        return MIMEText(self.body, self.subtype).as_bytes(policy=_SMTP_POLICY)
+
+    def iter_chunks(self):
+        """Yield the message as CRLF-terminated chunks of whole lines."""
+        self.stats = {'bytes_streamed': 0, 'peak_buffer_bytes': 0}
+        delimiter = b'--' + self.boundary.encode('ascii') + CRLF
+
+        yield self._track(self.header_bytes() + delimiter + self.body_bytes() + CRLF)
+        for path in self.attachments:
+            filename = os.path.basename(path)
+            yield self._track(delimiter + attachment_headers(filename))
+            encoded = self.attachment_cache.get(path, self.chunk_bytes) if self.attachment_cache else None
+            if encoded is not None:
+                # Shared, already-encoded part: no per-message copy is made
+                self.stats['bytes_streamed'] += len(encoded)
+                yield encoded
+                continue
+            for chunk in iter_base64_file(path, self.chunk_bytes):
+                yield self._track(chunk)
+        yield self._track(b'--' + self.boundary.encode('ascii') + b'--' + CRLF)
+
+    def _track(self, chunk):
+        self.stats['bytes_streamed'] += len(chunk)
+        self.stats['peak_buffer_bytes'] = max(self.stats['peak_buffer_bytes'], len(chunk))
+        return chunk
+
+    def iter_data(self):
+        """Chunks ready for the SMTP DATA phase (leading dots doubled)."""
+        for chunk in self.iter_chunks():
+            yield _LEADING_DOT.sub(b'..', chunk)
+
+    def as_bytes(self):
+        return b''.join(self.iter_chunks())
+
+    def as_string(self):
+        return self.as_bytes().decode('utf-8', errors='replace')
@@ -0,0 +1,322 @@
+import os
+import re
+import time
+import queue
+import smtplib
+import threading
+from contextlib import contextmanager
+from email.utils import getaddresses
+from rate_control import throttle
+
+# Connection settings. Override with SMTP_HOST / SMTP_PORT / SMTP_STARTTLS in
+# .env, e.g. SMTP_HOST=localhost SMTP_PORT=8025 SMTP_STARTTLS=0 for a local
+# aiosmtpd stand-in.
+DEFAULT_SMTP_HOST = 'smtp.gmail.com'
+DEFAULT_SMTP_PORT = 587
+DEFAULT_POOL_SIZE = 2
+# A connection idle for longer than this is probed with NOOP before reuse.
+DEFAULT_KEEPALIVE = 30
+
+# Errors after which the connection is dropped and the send retried once on
+# a fresh session. (Plain OSError is too broad: SMTPException subclasses it.)
+# Only raised before the end of DATA; later drops are DeliveryUncertain.
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+_LEADING_DOT = re.compile(rb'^\.', re.MULTILINE)
+
+
+class DeliveryUncertain(smtplib.SMTPException):
+    """The connection failed after the message's final '.' was sent.
+
+    The server may already have queued the message, so it is not resent.
+    """
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None or value == '':
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def envelope(msg):
+    """Return (from_addr, to_addrs) the way smtplib.send_message derives them."""
+    from_addr = msg['Sender'] or msg['From']
+    from_addr = getaddresses([from_addr])[0][1] if from_addr else ''
+    fields = [f for header in ('To', 'Cc', 'Bcc') for f in msg.get_all(header, [])]
+    return from_addr, [addr for _, addr in getaddresses(fields) if addr]
+
+
+def message_bytes(msg):
+    """Serialise ``msg`` with CRLF line endings as SMTP DATA requires."""
+    return msg.as_bytes(policy=msg.policy.clone(linesep='\r\n'))
+
+
+class SMTPPool:
+    """Pool of authenticated SMTP sessions reused across messages.
+
+    Connections are opened lazily (EHLO, STARTTLS, login once), probed with
+    NOOP when they have been idle, and replaced transparently when the
+    server drops them. ``acquire()`` waits for an idle session or a free
+    slot, so a dropped session's slot goes to the next waiter.
+    """
+
+    def __init__(self, host=None, port=None, username=None, password=None,
+                 use_tls=None, size=None, keepalive=None, timeout=30):
+        self.host = host or os.getenv('SMTP_HOST', DEFAULT_SMTP_HOST)
+        self.port = int(port or os.getenv('SMTP_PORT', DEFAULT_SMTP_PORT))
+        self.username = username if username is not None else os.getenv('SENDER_EMAIL')
+        self.password = password if password is not None else os.getenv('SENDER_PASSWORD')
+        self.use_tls = _env_bool('SMTP_STARTTLS', True) if use_tls is None else use_tls
+        self.size = int(size or os.getenv('SMTP_POOL_SIZE', DEFAULT_POOL_SIZE))
+        self.keepalive = float(keepalive if keepalive is not None else os.getenv('SMTP_KEEPALIVE', DEFAULT_KEEPALIVE))
+        self.timeout = timeout
+        self._idle = []  # (server, last used), most recently used last
+        self._open = 0
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self.stats = {'connects': 0, 'reconnects': 0, 'sent': 0, 'refused': 0, 'noops': 0}
+
+    # ----------------------------
+    # CONNECTIONS
+    # ----------------------------
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            server.ehlo()
+            if self.use_tls:
+                server.starttls()
+                server.ehlo()
+            if self.username and self.password:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        with self._lock:
+            self.stats['connects'] += 1
+        return server
+
+    def _alive(self, server):
+        try:
+            with self._lock:
+                self.stats['noops'] += 1
+            return server.noop()[0] == 250
+        except CONNECTION_ERRORS:
+            return False
+
+    def acquire(self, timeout=None):
+        """Check out a session; raises queue.Empty after ``timeout`` seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            idle = self._checkout(deadline)
+            if idle is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    self._free_slot()
+                    raise
+            server, last_used = idle
+            if time.monotonic() - last_used < self.keepalive or self._alive(server):
+                return server
+            self._drop(server)
+
+    def _checkout(self, deadline):
+        """An idle (server, last used) pair, or None once a slot for a new
+        connection is reserved."""
+        with self._available:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._open < self.size:
+                    self._open += 1
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                self._available.wait(remaining)
+
+    def release(self, server, broken=False):
+        if broken:
+            self._drop(server)
+        else:
+            with self._available:
+                self._idle.append((server, time.monotonic()))
+                self._available.notify()
+
+    def _drop(self, server):
+        try:
+            server.close()
+        except Exception:
+            pass
+        self._free_slot()
+
+    def _free_slot(self):
+        with self._available:
+            self._open -= 1
+            # Lets a waiting acquire() open a replacement
+            self._available.notify()
+
+    @contextmanager
+    def connection(self):
+        server = self.acquire()
+        broken = False
+        try:
+            yield server
+        except Exception as e:
+            broken = isinstance(e, CONNECTION_ERRORS) or server.sock is None
+            raise
+        finally:
+            self.release(server, broken=broken)
+
+    # ----------------------------
+    # SENDING
+    # ----------------------------
+    def _deliver(self, server, msg):
+        """Send ``msg``; returns {address: (code, reply)} for refused recipients."""
+        from_addr, to_addrs = envelope(msg)
+        refused = self._send_envelope(server, from_addr, to_addrs)
+        if hasattr(msg, 'iter_data'):
+            self._stream_data(server, msg.iter_data())
+        else:
+            data = _LEADING_DOT.sub(b'..', self._serialise(msg))
+            self._stream_data(server, [data if data.endswith(b'\r\n') else data + b'\r\n'])
+        with self._lock:
+            self.stats['sent'] += 1
+            self.stats['refused'] += len(refused)
+        for addr, (code, response) in refused.items():
+            print(f"⚠ {addr} refused by {self.host} ({code} {response.decode('utf-8', 'replace')})")
+        return refused
+
+    def _serialise(self, msg):
+        bcc = msg.get_all('Bcc')
+        if not bcc:
+            return message_bytes(msg)
+        # Bcc recipients stay in the envelope only
+        del msg['Bcc']
+        try:
+            return message_bytes(msg)
+        finally:
+            for value in bcc:
+                msg['Bcc'] = value
+
+    def _send_envelope(self, server, from_addr, to_addrs):
+        """MAIL FROM + RCPT TO, in a single write when PIPELINING is offered (RFC 2920)."""
+        commands = [f"MAIL FROM:<{from_addr}>"] + [f"RCPT TO:<{addr}>" for addr in to_addrs]
+        if server.has_extn('pipelining'):
+            server.send(''.join(command + '\r\n' for command in commands))
+            replies = [server.getreply() for _ in commands]
+        else:
+            replies = []
+            for command in commands:
+                server.putcmd(command)
+                replies.append(server.getreply())
+
+        code, response = replies[0]
+        if code != 250:
+            server.rset()
+            raise smtplib.SMTPSenderRefused(code, response, from_addr)
+        refused = {addr: reply for addr, reply in zip(to_addrs, replies[1:]) if reply[0] not in (250, 251)}
+        if len(refused) == len(to_addrs):
+            server.rset()
+            raise smtplib.SMTPRecipientsRefused(refused)
+        return refused
+
+    def _stream_data(self, server, chunks):
+        """DATA phase fed chunk by chunk (already dot-stuffed); the full
+        message is never built."""
+        server.putcmd('data')
+        code, response = server.getreply()
+        if code != 354:
+            server.rset()
+            raise smtplib.SMTPDataError(code, response)
+        try:
+            for chunk in chunks:
+                server.send(chunk)
+        except Exception:
+            # The session is stuck mid-DATA; it cannot be reused
+            server.close()
+            raise
+        server.send(b'.\r\n')
+        try:
+            code, response = server.getreply()
+        except CONNECTION_ERRORS as e:
+            server.close()
+            raise DeliveryUncertain(
+                f"connection lost after the message was sent; it may have been delivered ({e})") from e
+        if code != 250:
+            server.rset()
+            raise smtplib.SMTPDataError(code, response)
+
+    def send(self, msg):
+        """Send one message, reconnecting once if the session was dropped.
+
+        Returns the refused recipients like smtplib.sendmail (empty when
+        all were accepted). Only failures before the end of DATA are
+        retried; a drop after it raises DeliveryUncertain. Paced by the
+        relay's token bucket (SMTP_RATE), taken before a session is checked
+        out so waiting does not hold a connection.
+        """
+        throttle('smtp', self.host)
+        for attempt in range(2):
+            try:
+                with self.connection() as server:
+                    return self._deliver(server, msg)
+            except CONNECTION_ERRORS:
+                if attempt:
+                    raise
+                with self._lock:
+                    self.stats['reconnects'] += 1
+
+    def send_many(self, messages):
+        """Send ``messages`` back to back over a single session.
+
+        Returns a list with, per message, None when every recipient
+        accepted it, the refused recipients' dict when only some did, or
+        the exception that stopped it. A dropped connection is replaced
+        mid-batch; a message is resent only if the drop came before the
+        end of DATA.
+        """
+        results = []
+        server = None
+        try:
+            for msg in messages:
+                throttle('smtp', self.host)
+                for attempt in range(2):
+                    if server is None:
+                        server = self.acquire()
+                    try:
+                        results.append(self._deliver(server, msg) or None)
+                        break
+                    except CONNECTION_ERRORS as e:
+                        self._drop(server)
+                        server = None
+                        with self._lock:
+                            self.stats['reconnects'] += 1
+                        if attempt:
+                            results.append(e)
+                    except Exception as e:
+                        results.append(e)
+                        if server.sock is None:
+                            self._drop(server)
+                            server = None
+                        break
+        finally:
+            if server is not None:
+                self.release(server)
+        return results
+
+    def close(self):
+        with self._available:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            try:
+                server.quit()
+            except Exception:
+                server.close()
+            self._free_slot()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
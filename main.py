@@ -1,13 +1,102 @@
 import os
 import sys
-import subprocess
+import time
+import argparse
 from pathlib import Path
 
 
 class QuickStart:
-    def __init__(self):
+    """Runs every stage in this process.
+
+    Stages are plain functions imported from the project modules; they share
+    one RunConfig, one browser and one screenshot store, so a full run pays
+    the interpreter, import and Chrome startup cost once. Per-stage wall
+    times are recorded in ``timings``. Progress goes to the submission
+    journal, so running again does not submit or email the record twice.
+    """
+
+    def __init__(self, pipeline=False):
         self.project_root = Path.cwd()
         self.steps_completed = []
+        # Unattended: prompts take their default answer, the form is
+        # validated and submitted automatically and the email sent
+        self.pipeline = pipeline
+        self.config = None
+        self.driver = None
+        self.screenshots = None
+        self.journal = None
+        self.confirmation = None
+        self.timings = []
+
+    # ----------------------------
+    # SHARED STATE
+    # ----------------------------
+    def get_config(self):
+        if self.config is None:
+            from form_automation import RunConfig
+            self.config = RunConfig.from_env(pipeline=self.pipeline)
+        return self.config
+
+    def get_driver(self):
+        if self.driver is None:
+            from browser import create_driver
+            self.driver = create_driver(profile=self.get_config().profile)
+        return self.driver
+
+    def get_screenshots(self):
+        if self.screenshots is None:
+            from screenshots import ScreenshotStore
+            self.screenshots = ScreenshotStore()
+        return self.screenshots
+
+    def get_journal(self):
+        if self.journal is None:
+            from submission_journal import SubmissionJournal
+            self.journal = SubmissionJournal()
+        return self.journal
+
+    def record_key(self):
+        from submission_journal import record_key
+        return record_key(self.get_config().record)
+
+    def on_stage(self, stage):
+        from submission_journal import journal_hook
+        record = self.get_config().record
+        journal_hook(self.get_journal(), self.record_key(), email_id=record.get('email_id'))(stage)
+
+    def close(self):
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
+        if self.screenshots is not None:
+            # Pending captures report 'screenshotted' to the journal, so it closes last
+            self.screenshots.close()
+            self.screenshots = None
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def timed(self, name, stage):
+        """Run ``stage()`` and record (name, seconds, ok)."""
+        start = time.perf_counter()
+        ok = False
+        try:
+            ok = stage()
+            return ok
+        finally:
+            self.timings.append((name, time.perf_counter() - start, ok is not False))
+
+    def print_timings(self):
+        print("\nStage timings:")
+        for name, seconds, ok in self.timings:
+            print(f"  {'✓' if ok else '✗'} {name:<22} {seconds:7.2f}s")
+        print(f"  {'total':<24} {sum(seconds for _, seconds, _ in self.timings):7.2f}s")
+
+    def ask(self, prompt, default):
+        if self.pipeline:
+            print(f"{prompt}{default} (pipeline)")
+            return default
+        return input(prompt)
 
     def print_header(self, text):
         print("\n" + "=" * 60)
@@ -42,20 +131,17 @@ class QuickStart:
 
         print("✓ .env file found")
 
-        with open(env_path, 'r') as f:
-            content = f.read()
-            required_vars = [
-                'FORM_URL', 'FULL_NAME', 'CONTACT_NUMBER',
-                'EMAIL_ID', 'SENDER_EMAIL', 'SENDER_PASSWORD'
-            ]
-            missing = []
-            for var in required_vars:
-                if var not in content or f'{var}=' in content:
-                    missing.append(var)
-
-            if missing:
-                print(f"⚠ Warning: These variables might be empty: {', '.join(missing)}")
-                return False
+        from dotenv import dotenv_values
+        values = dotenv_values(env_path)
+        required_vars = [
+            'FORM_URL', 'FULL_NAME', 'CONTACT_NUMBER',
+            'EMAIL_ID', 'SENDER_EMAIL', 'SENDER_PASSWORD'
+        ]
+        missing = [var for var in required_vars if not (values.get(var) or '').strip()]
+
+        if missing:
+            print(f"⚠ Warning: These variables are missing or empty: {', '.join(missing)}")
+            return False
 
         print("✓ Environment variables configured")
         return True
@@ -89,25 +175,34 @@ class QuickStart:
     def run_form_automation(self):
         self.print_step(5, "Running Form Automation")
         print("This will open Chrome and fill the form automatically...")
-        response = input("\nProceed with form automation? (y/n): ")
+        response = self.ask("\nProceed with form automation? (y/n): ", 'y')
 
         if response.lower() == 'y':
             try:
                 print("\nStarting automation...")
-                result = subprocess.run(
-                    [sys.executable, 'form_automation.py'],
-                    capture_output=True,
-                    text=True
-                )
+                from form_automation import automate_form
+                if self.get_config().validate():
+                    print("✗ Fix the values above in .env before running the automation")
+                    return False
+                journal, key = self.get_journal(), self.record_key()
+                if journal.is_uncertain(key):
+                    print("⚠ A previous run crashed while submitting this record; check the form's responses.")
+                    print(f"  Delete its entries from {journal.path} to submit it again.")
+                    return False
+                if journal.is_done(key):
+                    from screenshots import latest_screenshot
+                    print(f"✓ Already submitted ({journal.stage(key)}, see {journal.path}); not submitting again")
+                    self.confirmation = latest_screenshot('form_confirmation')
+                    return True
+                result = automate_form(self.get_driver(), self.get_config(), self.get_screenshots(),
+                                       on_stage=self.on_stage)
 
-                if result.returncode == 0:
+                if result['ok']:
+                    self.confirmation = result['confirmation']
                     print("✓ Form automation completed successfully")
-                    print("\nCheck for:")
-                    print("  - form_confirmation.png")
-                    print("  - form_filled_before_submit.png")
                     return True
                 else:
-                    print(f"✗ Automation failed: {result.stderr}")
+                    print(f"✗ Automation failed: {result['error'] or 'form not submitted'}")
                     return False
             except Exception as e:
                 print(f"✗ Error running automation: {str(e)}")
@@ -118,10 +213,14 @@ class QuickStart:
 
     def verify_screenshots(self):
         self.print_step(6, "Verifying Screenshots")
-        confirmation = self.project_root / 'form_confirmation.png'
-
-        if confirmation.exists():
-            print("✓ form_confirmation.png found")
+        from screenshots import latest_screenshot
+        confirmation = self.confirmation or latest_screenshot('form_confirmation')
+        legacy = self.project_root / 'form_confirmation.png'
+        if not confirmation and legacy.exists():
+            confirmation = legacy
+
+        if confirmation:
+            print(f"✓ {confirmation} found")
             return True
         else:
             print("✗ form_confirmation.png not found")
@@ -130,28 +229,43 @@ class QuickStart:
 
     def setup_email(self):
         self.print_step(7, "Email Submission Setup")
+        if self.pipeline:
+            return self.send_email() if self.get_config().send_email else False
         print("\nChoose email sending method:")
-        print("1. Flask Web Interface (Recommended)")
-        print("2. Simple Python Script")
-        print("3. Skip for now")
+        print("1. Send now")
+        print("2. Review the message first")
+        print("3. Start the email API (Flask) and send through it")
+        print("4. Skip for now")
 
-        choice = input("\nEnter choice (1/2/3): ")
+        choice = self.ask("\nEnter choice (1/2/3/4): ", '4')
 
         if choice == '1':
-            print("\nStarting Flask server...")
-            print("Open browser to: http://localhost:5000")
-            print("\nPress Ctrl+C to stop server")
-            try:
-                subprocess.run([sys.executable, 'email_sender.py'])
-            except KeyboardInterrupt:
-                print("\n\nServer stopped")
+            return self.send_email()
         elif choice == '2':
-            print("\nℹ Before running, update the GitHub link in send_email_simple.py")
-            response = input("Ready to send? (y/n): ")
+            from email_sender import build_streaming_assignment_email
+            msg = build_streaming_assignment_email(self.confirmation)
+            print(f"\nTo: {msg['To']}\nCc: {msg['Cc']}\nSubject: {msg['Subject']}\n\n{msg.body}")
+            response = self.ask("Ready to send? (y/n): ", 'n')
             if response.lower() == 'y':
-                subprocess.run([sys.executable, 'send_email_simple.py'])
-        else:
-            print("⊘ Skipped email sending")
+                return self.send_email()
+        elif choice == '3':
+            # The browser is not needed while the service runs
+            self.close()
+            from email_service import serve
+            serve()
+            return None
+        print("⊘ Skipped email sending")
+        return None
+
+    def send_email(self):
+        from email_sender import send_assignment_email
+        if self.get_journal().is_done(self.record_key(), 'emailed'):
+            print("✓ Assignment email already sent for this record")
+            return True
+        sent = send_assignment_email(confirmation=self.confirmation)
+        if sent:
+            self.on_stage('emailed')
+        return sent
 
     def show_final_checklist(self):
         self.print_header("FINAL SUBMISSION CHECKLIST")
@@ -191,7 +305,7 @@ class QuickStart:
 
         all_passed = True
         for name, check_func in checks:
-            if not check_func():
+            if not self.timed(name, check_func):
                 all_passed = False
 
         if not all_passed:
@@ -204,10 +318,17 @@ class QuickStart:
         print("✓ All prerequisite checks passed!")
         print("=" * 60)
 
-        if self.run_form_automation():
-            self.verify_screenshots()
+        try:
+            if self.timed("form automation", self.run_form_automation):
+                self.timed("verify screenshots", self.verify_screenshots)
+            elif self.pipeline:
+                # Nothing was submitted, so there is nothing to email
+                return
 
-        self.setup_email()
+            self.timed("email", self.setup_email)
+        finally:
+            self.close()
+            self.print_timings()
 
         self.show_final_checklist()
 
@@ -215,5 +336,9 @@ class QuickStart:
 
 
 if __name__ == "__main__":
-    quick_start = QuickStart()
+    parser = argparse.ArgumentParser(description="Guided setup and end-to-end run")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="no prompts: fill, validate, submit, screenshot and email in one go")
+    args = parser.parse_args()
+    quick_start = QuickStart(pipeline=args.pipeline)
     quick_start.run()
\ No newline at end of file
@@ -1,24 +1,26 @@
 import os
-import time
-from selenium import webdriver
+import sys
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.keys import Keys
 from dotenv import load_dotenv
+from browser import create_driver
+from waits import WaitEngine
+from form_verify import expected_spec, read_back, mismatches, print_report as print_verify_report
+from form_automation import submit_form
+from screenshots import ScreenshotStore
+from choice_resolver import load_options, select_option
+from record_validation import GENDER_ALIASES
 
 load_dotenv()
 
-chrome_options = Options()
-chrome_options.add_argument('--start-maximized')
+# --pipeline (or PIPELINE_MODE=1): validate by reading the values back and
+# submit automatically instead of waiting at the two ENTER prompts
+pipeline = '--pipeline' in sys.argv or os.getenv('PIPELINE_MODE') == '1'
 
-try:
-    from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.chrome.service import Service
+driver = create_driver(headless=True) if pipeline else create_driver()
+screenshots = ScreenshotStore()
 
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-except:
-    driver = webdriver.Chrome(options=chrome_options)
+waits = WaitEngine(driver)
 
 form_url = os.getenv('FORM_URL')
 full_name = os.getenv('FULL_NAME')
@@ -34,7 +36,7 @@ print("Opening Google Form...")
 print("=" * 60)
 
 driver.get(form_url)
-time.sleep(5)
+waits.form_rendered()
 
 print("\nFinding all input fields...")
 inputs = driver.find_elements(By.TAG_NAME, 'input')
@@ -49,30 +51,45 @@ data_to_fill = [
     "GNFPYC"
 ]
 
+# What the form must hold before a pipeline submit, built from the record up
+# front: a field that could not be found or filled keeps element None, reads
+# back as nothing and fails validation
+text_specs = [expected_spec(f"Field {i + 1}", value) for i, value in enumerate(data_to_fill)]
+date_spec = expected_spec("Date", date_of_birth)
+gender_spec = expected_spec("Gender", gender, kind='choice', aliases=GENDER_ALIASES)
+expected = text_specs + [date_spec, gender_spec]
+fill_errors = []
+
 print("\nFilling text fields...")
 text_field_index = 0
 
 for inp in inputs:
     input_type = inp.get_attribute('type')
     if input_type == 'text' and text_field_index < len(data_to_fill):
+        spec = text_specs[text_field_index]
+        text_field_index += 1
         try:
             driver.execute_script("arguments[0].scrollIntoView(true);", inp)
-            time.sleep(0.5)
+            waits.clickable(inp, spec['name'])
             inp.click()
-            time.sleep(0.3)
             inp.clear()
-            inp.send_keys(data_to_fill[text_field_index])
-            print(f"  Field {text_field_index + 1}: {data_to_fill[text_field_index][:30]}...")
-            text_field_index += 1
-            time.sleep(0.5)
+            inp.send_keys(spec['value'])
+            waits.value_accepted(inp, spec['value'], spec['name'])
+            spec['element'] = inp
+            print(f"  {spec['name']}: {spec['value'][:30]}...")
         except Exception as e:
-            print(f"  Error on field {text_field_index}: {e}")
+            fill_errors.append(f"{spec['name']}: {e}")
+            print(f"  Error on {spec['name']}: {e}")
+
+if text_field_index < len(data_to_fill):
+    fill_errors.append(f"only {text_field_index} of {len(data_to_fill)} text fields found")
+    print(f"  Only {text_field_index} of {len(data_to_fill)} text fields found")
 
 print("\nFilling date field...")
 try:
     date_input = driver.find_element(By.CSS_SELECTOR, 'input[type="date"]')
     driver.execute_script("arguments[0].scrollIntoView(true);", date_input)
-    time.sleep(0.5)
+    waits.clickable(date_input, "Date")
 
     from datetime import datetime
 
@@ -80,51 +97,66 @@ try:
     date_formatted = date_obj.strftime('%m%d%Y')
 
     date_input.click()
-    time.sleep(0.3)
     date_input.send_keys(date_formatted)
+    waits.value_accepted(date_input, date_obj.strftime('%Y-%m-%d'), "Date")
+    date_spec['element'] = date_input
     print(f"  Date filled: {date_obj.strftime('%m/%d/%Y')}")
-    time.sleep(0.5)
 except Exception as e:
+    fill_errors.append(f"Date: {e}")
     print(f"  Error filling date: {e}")
 
 print("\nSelecting gender...")
 try:
-    radio_buttons = driver.find_elements(By.CSS_SELECTOR, 'div[role="radio"]')
-    for radio in radio_buttons:
-        data_value = radio.get_attribute('data-value') or ''
-        if gender.lower() in data_value.lower():
-            driver.execute_script("arguments[0].scrollIntoView(true);", radio)
-            time.sleep(0.5)
-            radio.click()
-            print(f"  Gender selected: {gender}")
-            time.sleep(0.5)
-            break
+    choice = load_options(driver, aliases=GENDER_ALIASES)
+    label = select_option(driver, waits, choice, gender, "Gender")
+    if label:
+        print(f"  Gender selected: {label} ({choice.strategy})")
+    else:
+        fill_errors.append(f"Gender: no {choice.strategy} option matches {gender}")
+        print(f"  No {choice.strategy} option matches {gender}")
 except Exception as e:
+    fill_errors.append(f"Gender: {e}")
     print(f"  Error selecting gender: {e}")
 
 print("\n" + "=" * 60)
 print("Form filling complete!")
 print("=" * 60)
 
-input("\nCheck the form. Press ENTER to take screenshot and close...")
+if pipeline:
+    report = read_back(driver, expected)
+    print_verify_report(report)
+else:
+    input("\nCheck the form. Press ENTER to take screenshot and close...")
 
 print("Taking screenshot...")
-driver.save_screenshot('form_filled_manual.png')
-print("Saved: form_filled_manual.png")
-
-print("\nTo submit:")
-print("1. Manually click Submit button")
-print("2. Wait for confirmation page")
-print("3. Take screenshot: driver.save_screenshot('form_confirmation.png')")
-
-input("\nPress ENTER after you manually submit to take confirmation screenshot...")
-
-try:
-    driver.save_screenshot('form_confirmation.png')
-    print("Saved: form_confirmation.png")
-except:
-    print("Could not save confirmation screenshot")
-
-time.sleep(2)
+screenshots.capture(driver, 'form_filled_manual')
+
+if pipeline:
+    if fill_errors or mismatches(report):
+        for error in fill_errors:
+            print(f"  ✗ {error}")
+        print("\n✗ Validation failed, form NOT submitted")
+    else:
+        print("\nSubmitting form...")
+        if submit_form(driver, waits):
+            screenshots.capture(driver, 'form_confirmation', dedupe=True)
+else:
+    print("\nTo submit:")
+    print("1. Manually click Submit button")
+    print("2. Wait for confirmation page")
+    print("3. Come back here; the confirmation screenshot is taken for you")
+
+    input("\nPress ENTER after you manually submit to take confirmation screenshot...")
+
+    try:
+        screenshots.capture(driver, 'form_confirmation', dedupe=True)
+    except Exception:
+        print("Could not save confirmation screenshot")
+
+for path in screenshots.flush().values():
+    print(f"Saved: {path}")
+
+waits.print_report()
 driver.quit()
+screenshots.close()
 print("\nDone!")
\ No newline at end of file
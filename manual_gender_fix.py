@@ -1,25 +1,20 @@
 import os
-import time
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.keys import Keys
 from dotenv import load_dotenv
 from datetime import datetime
+from browser import create_driver
+from waits import WaitEngine
+from choice_resolver import load_options, select_option
+from record_validation import GENDER_ALIASES
+from screenshots import ScreenshotStore
 
 load_dotenv()
 
-chrome_options = Options()
-chrome_options.add_argument('--start-maximized')
+driver = create_driver()
 
-try:
-    from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.chrome.service import Service
-
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-except:
-    driver = webdriver.Chrome(options=chrome_options)
+waits = WaitEngine(driver)
+screenshots = ScreenshotStore()
 
 form_url = os.getenv('FORM_URL')
 full_name = os.getenv('FULL_NAME')
@@ -36,7 +31,7 @@ print("=" * 70)
 
 driver.get(form_url)
 print("\n[1/9] Opening form...")
-time.sleep(5)
+waits.form_rendered()
 
 text_inputs = driver.find_elements(By.CSS_SELECTOR, 'input[type="text"]')
 textarea = driver.find_elements(By.TAG_NAME, 'textarea')[0]
@@ -48,13 +43,11 @@ print(f"Found {len(text_inputs)} text fields, 1 textarea, 1 date field\n")
 def fill_field(field, value, name):
     try:
         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", field)
-        time.sleep(0.8)
+        waits.clickable(field, name)
         field.click()
-        time.sleep(0.3)
         field.clear()
-        time.sleep(0.2)
         field.send_keys(value)
-        time.sleep(0.5)
+        waits.value_accepted(field, value, name)
         print(f"✓ {name}: {value[:50]}")
         return True
     except Exception as e:
@@ -80,15 +73,13 @@ fill_field(text_inputs[3], pin_code, "Pin Code")
 print("[7/9] Filling Date of Birth...")
 try:
     driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", date_field)
-    time.sleep(0.8)
+    waits.clickable(date_field, "Date of Birth")
 
     date_obj = datetime.strptime(date_of_birth, '%Y-%m-%d')
 
     date_field.click()
-    time.sleep(0.5)
 
     driver.execute_script("arguments[0].value = '';", date_field)
-    time.sleep(0.3)
 
     year = str(date_obj.year)
     month = str(date_obj.month).zfill(2)
@@ -97,17 +88,25 @@ try:
     formatted_date = f"{year}-{month}-{day}"
 
     driver.execute_script(f"arguments[0].value = '{formatted_date}';", date_field)
-    time.sleep(0.5)
+    waits.value_accepted(date_field, formatted_date, "Date of Birth")
 
     date_field.send_keys(Keys.TAB)
-    time.sleep(0.8)
 
     print(f"✓ Date of Birth: {day}/{month}/{year}")
 except Exception as e:
     print(f"✗ Date of Birth: ERROR - {str(e)}")
 
-print("[8/9] Filling Gender (TEXT INPUT)...")
-fill_field(text_inputs[4], gender, "Gender")
+print("[8/9] Selecting Gender...")
+try:
+    choice = load_options(driver, aliases=GENDER_ALIASES)
+    if choice.strategy == 'text':
+        fill_field(text_inputs[4], gender, "Gender")
+    else:
+        label = select_option(driver, waits, choice, gender, "Gender")
+        print(f"✓ Gender: {label} selected ({choice.strategy})" if label
+              else f"✗ Gender: no option matches {gender}")
+except Exception as e:
+    print(f"✗ Gender: ERROR - {str(e)}")
 
 print("[9/9] Filling Verification Code (GNFPYC)...")
 fill_field(text_inputs[5], "GNFPYC", "Verification Code")
@@ -116,11 +115,8 @@ print("\n" + "=" * 70)
 print(" " * 15 + "🎯 ALL FIELDS FILLED SUCCESSFULLY! 🎯")
 print("=" * 70)
 
-time.sleep(2)
-
 print("\nTaking screenshot of filled form...")
-driver.save_screenshot('form_filled_before_submit.png')
-print("✓ Screenshot saved: form_filled_before_submit.png")
+screenshots.capture(driver, 'form_filled_before_submit')
 
 print("\n" + "=" * 70)
 print("VERIFY ALL FIELDS in browser:")
@@ -142,23 +138,22 @@ try:
 
     if submit_buttons:
         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", submit_buttons[0])
-        time.sleep(1)
+        waits.clickable(submit_buttons[0], "Submit")
+        old_url = driver.current_url
         submit_buttons[0].click()
         print("✓ Submit button clicked")
 
         print("\nWaiting for confirmation page...")
-        time.sleep(6)
+        if not waits.confirmation_loaded(submit_buttons[0], old_url):
+            print("⚠ No confirmation message on the page; check the screenshot before relying on it")
 
         print("Taking confirmation screenshot...")
-        driver.save_screenshot('form_confirmation.png')
-        print("✓ Screenshot saved: form_confirmation.png")
+        screenshots.capture(driver, 'form_confirmation', dedupe=True)
 
         print("\n" + "=" * 70)
         print(" " * 10 + "🎉 FORM SUBMITTED SUCCESSFULLY! 🎉")
         print("=" * 70)
-        print("\n✅ Screenshots created:")
-        print("   1. form_filled_before_submit.png")
-        print("   2. form_confirmation.png")
+        print(f"\n✅ Screenshots in {screenshots.run_dir}")
         print("\n✅ Next Steps:")
         print("   1. Verify both screenshots")
         print("   2. Upload code to GitHub")
@@ -169,10 +164,14 @@ try:
 
 except Exception as e:
     print(f"\n✗ Submission error: {str(e)}")
-    driver.save_screenshot('error_screenshot.png')
-    print("Error screenshot saved: error_screenshot.png")
+    screenshots.capture(driver, 'error_screenshot', selector='')
+
+for path in screenshots.flush().values():
+    print(f"✓ Screenshot saved: {path}")
+
+waits.print_report()
 
-print("\nClosing browser in 3 seconds...")
-time.sleep(3)
+print("\nClosing browser...")
 driver.quit()
+screenshots.close()
 print("\n🚀 DONE! Good luck with your internship, Nikhil! 🚀")
\ No newline at end of file
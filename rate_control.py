@@ -0,0 +1,170 @@
+import os
+import time
+import threading
+from urllib.parse import urlparse
+
+# Requests per second allowed per destination, with the burst a bucket may
+# save up. Override with FORM_RATE / FORM_BURST (form host) and SMTP_RATE /
+# SMTP_BURST (SMTP relay) in .env; 0 or unset means unlimited.
+RATE_SETTINGS = {
+    'form': ('FORM_RATE', 'FORM_BURST'),
+    'smtp': ('SMTP_RATE', 'SMTP_BURST'),
+}
+
+# Adaptive concurrency: a window of this many results ends with the limit
+# raised by one, or multiplied by DEFAULT_DECREASE if it saw an error rate
+# above DEFAULT_ERROR_RATE or latency above the target.
+DEFAULT_WINDOW = 8
+DEFAULT_DECREASE = 0.5
+DEFAULT_ERROR_RATE = 0.1
+# Without an explicit target, latency counts as too high once the window's
+# median is this many times the best median seen so far
+DEFAULT_LATENCY_TOLERANCE = 2.0
+
+
+# ----------------------------
+# TOKEN BUCKETS
+# ----------------------------
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, at most ``burst`` saved.
+
+    ``acquire()`` blocks until a token is available, so callers are paced to
+    the rate without any fixed sleeps of their own.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(1.0, self.rate))
+        if self.burst < 1:
+            raise ValueError(f"token bucket burst must be at least 1 token, got {self.burst}")
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.stats = {'acquired': 0, 'waited_seconds': 0.0}
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1.0, timeout=None):
+        """Take ``tokens``; returns False if that would take over ``timeout``."""
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self.stats['acquired'] += 1
+                    self.stats['waited_seconds'] += now - start
+                    return True
+                delay = (tokens - self._tokens) / self.rate
+            if timeout is not None and now - start + delay > timeout:
+                return False
+            time.sleep(delay)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+# Fraction of the configured rates this process may use, so N process
+# workers together stay within the limit (see set_share)
+_share = 1.0
+
+
+def set_share(share):
+    """Give this process ``share`` of every .env rate (ProcessPoolExecutor initializer)."""
+    global _share
+    with _buckets_lock:
+        _share = share
+        _buckets.clear()
+
+
+def destination_key(kind, address):
+    """'form:<host>' for a URL, 'smtp:<host>' for a relay host."""
+    if kind == 'form':
+        address = urlparse(address).netloc or address
+    return f"{kind}:{address}"
+
+
+def bucket_for(kind, address):
+    """The destination's TokenBucket, created from .env on first use, or
+    None when it is unlimited."""
+    key = destination_key(kind, address)
+    with _buckets_lock:
+        if key not in _buckets:
+            rate_var, burst_var = RATE_SETTINGS[kind]
+            rate = float(os.getenv(rate_var) or 0) * _share
+            burst = float(os.getenv(burst_var) or 0) * _share
+            # A worker's share of the burst still has to hold one whole token
+            burst = max(burst, 1.0, rate) if burst else None
+            _buckets[key] = TokenBucket(rate, burst) if rate else None
+        return _buckets[key]
+
+
+def throttle(kind, address):
+    """Block until ``address`` may be hit again; a no-op when unlimited."""
+    bucket = bucket_for(kind, address)
+    if bucket is not None:
+        bucket.acquire()
+
+
+# ----------------------------
+# ADAPTIVE CONCURRENCY
+# ----------------------------
+class AIMDController:
+    """Additive-increase / multiplicative-decrease concurrency limit.
+
+    Callers keep at most ``limit`` jobs in flight and ``record()`` each
+    result's latency and outcome. Every ``window`` results the limit goes
+    up by one if the window was healthy, and is cut by ``decrease`` if its
+    error rate exceeded ``error_rate`` or its median latency exceeded
+    ``latency_target`` (by default ``tolerance`` x the best median seen).
+    """
+
+    def __init__(self, max_limit, min_limit=1, initial=None, window=DEFAULT_WINDOW,
+                 decrease=DEFAULT_DECREASE, error_rate=DEFAULT_ERROR_RATE,
+                 latency_target=None, tolerance=DEFAULT_LATENCY_TOLERANCE):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = initial if initial is not None else min_limit
+        self.window = window
+        self.decrease = decrease
+        self.error_rate = error_rate
+        self.latency_target = latency_target
+        self.tolerance = tolerance
+        self.best_median = None
+        self.history = [(0.0, self.limit)]  # (seconds since start, limit)
+        self._samples = []
+        self._drain = 0
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, seconds, ok):
+        with self._lock:
+            if self._drain:
+                # Started before the last decrease; says nothing about the new limit
+                self._drain -= 1
+                return self.limit
+            self._samples.append((seconds, ok))
+            if len(self._samples) < self.window:
+                return self.limit
+            samples, self._samples = self._samples, []
+
+            latencies = sorted(s for s, _ in samples)
+            median = latencies[len(latencies) // 2]
+            errors = sum(1 for _, ok in samples if not ok) / len(samples)
+            target = self.latency_target
+            if target is None and self.best_median is not None:
+                target = self.best_median * self.tolerance
+            if errors == 0:
+                self.best_median = median if self.best_median is None else min(self.best_median, median)
+
+            if errors > self.error_rate or (target is not None and median > target):
+                limit = max(self.min_limit, int(self.limit * self.decrease))
+                self._drain = self.limit
+            else:
+                limit = min(self.max_limit, self.limit + 1)
+            if limit != self.limit:
+                self.limit = limit
+                self.history.append((round(time.monotonic() - self._start, 3), limit))
+            return self.limit
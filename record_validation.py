@@ -0,0 +1,258 @@
+import os
+import re
+import json
+import argparse
+from datetime import date, datetime
+from itertools import islice
+
+# Records are validated this many at a time, one column at a time
+DEFAULT_BATCH_SIZE = 1000
+
+REQUIRED_FIELDS = [
+    'form_url', 'full_name', 'contact_number', 'email_id',
+    'full_address', 'pin_code', 'date_of_birth', 'gender'
+]
+
+# Tried in order; day-first formats come before month-first ones because
+# the form is Indian (DD/MM/YYYY). DATE_MONTH_FIRST=1 flips that.
+DAY_FIRST_FORMATS = ['%Y-%m-%d', '%Y/%m/%d', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y',
+                     '%d %b %Y', '%d %B %Y', '%b %d %Y', '%B %d %Y']
+MONTH_FIRST_FORMATS = ['%Y-%m-%d', '%Y/%m/%d', '%m/%d/%Y', '%m-%d-%Y', '%m.%d.%Y',
+                       '%d %b %Y', '%d %B %Y', '%b %d %Y', '%B %d %Y']
+
+GENDER_ALIASES = {
+    'male': 'Male', 'm': 'Male', 'man': 'Male', 'boy': 'Male',
+    'female': 'Female', 'f': 'Female', 'woman': 'Female', 'girl': 'Female',
+    'other': 'Other', 'o': 'Other', 'non-binary': 'Other', 'nonbinary': 'Other',
+    'prefer not to say': 'Prefer not to say',
+}
+
+_NON_DIGITS = re.compile(r'\D')
+_WHITESPACE = re.compile(r'\s+')
+_EMAIL = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
+class InvalidValue(ValueError):
+    pass
+
+
+# ----------------------------
+# COLUMN NORMALIZERS
+# ----------------------------
+# Each takes a whole column and returns it normalized, with an InvalidValue
+# instance in place of every value that cannot be used.
+def _each(column, normalize):
+    out = []
+    for value in column:
+        try:
+            out.append(normalize(value))
+        except InvalidValue as e:
+            out.append(e)
+    return out
+
+
+def normalize_text(column):
+    """Collapse whitespace (names, addresses)."""
+    return [_WHITESPACE.sub(' ', value).strip() for value in column]
+
+
+def normalize_dates(column, month_first=None):
+    """Parse dates of birth to YYYY-MM-DD.
+
+    Dates of birth repeat a lot in real data, so each distinct string is
+    parsed once per column.
+    """
+    if month_first is None:
+        month_first = os.getenv('DATE_MONTH_FIRST') == '1'
+    formats = MONTH_FIRST_FORMATS if month_first else DAY_FIRST_FORMATS
+    today = date.today()
+    parsed = {}
+
+    def parse(value):
+        text = value.replace(',', ' ')
+        text = _WHITESPACE.sub(' ', text).strip()
+        for fmt in formats:
+            try:
+                day = datetime.strptime(text, fmt).date()
+            except ValueError:
+                continue
+            if not date(1900, 1, 1) <= day <= today:
+                return InvalidValue(f"date of birth out of range: {value}")
+            return day.isoformat()
+        return InvalidValue(f"unrecognised date: {value}")
+
+    out = []
+    for value in column:
+        if value not in parsed:
+            parsed[value] = parse(value)
+        out.append(parsed[value])
+    return out
+
+
+def normalize_phones(column):
+    """Strip formatting and the +91 / 0 prefixes; expect a 10 digit number."""
+    def normalize(value):
+        digits = _NON_DIGITS.sub('', value)
+        if len(digits) == 12 and digits.startswith('91'):
+            digits = digits[2:]
+        elif len(digits) == 11 and digits.startswith('0'):
+            digits = digits[1:]
+        if len(digits) != 10:
+            raise InvalidValue(f"contact number must have 10 digits: {value}")
+        return digits
+    return _each(column, normalize)
+
+
+def normalize_pins(column):
+    def normalize(value):
+        digits = _NON_DIGITS.sub('', value)
+        if len(digits) != 6 or digits[0] == '0':
+            raise InvalidValue(f"PIN code must be 6 digits not starting with 0: {value}")
+        return digits
+    return _each(column, normalize)
+
+
+def normalize_genders(column):
+    def normalize(value):
+        canonical = GENDER_ALIASES.get(_WHITESPACE.sub(' ', value).strip().lower())
+        if canonical is None:
+            raise InvalidValue(f"unknown gender: {value}")
+        return canonical
+    return _each(column, normalize)
+
+
+def normalize_emails(column):
+    def normalize(value):
+        value = value.strip()
+        if not _EMAIL.match(value):
+            raise InvalidValue(f"invalid email: {value}")
+        local, _, domain = value.rpartition('@')
+        return f"{local}@{domain.lower()}"
+    return _each(column, normalize)
+
+
+COLUMN_NORMALIZERS = {
+    'full_name': normalize_text,
+    'full_address': normalize_text,
+    'contact_number': normalize_phones,
+    'email_id': normalize_emails,
+    'pin_code': normalize_pins,
+    'date_of_birth': normalize_dates,
+    'gender': normalize_genders,
+}
+
+
+# ----------------------------
+# BATCH VALIDATION
+# ----------------------------
+def validate_batch(rows, required=REQUIRED_FIELDS):
+    """Validate and normalize a list of records column by column.
+
+    Returns (valid, rejected): valid is a list of normalized records,
+    rejected a list of (position in ``rows``, record, [errors]).
+    """
+    errors = [[] for _ in rows]
+    columns = {}
+    for key in list(required) + [key for key in COLUMN_NORMALIZERS if key not in required]:
+        # JSONL may carry numbers (pin_code: 110001); everything is text here
+        column = [None if row.get(key) is None else str(row.get(key)) for row in rows]
+        if key in required:
+            for i, value in enumerate(column):
+                if value is None or not value.strip():
+                    errors[i].append(f"{key} is required")
+        columns[key] = column
+
+    for key, normalize in COLUMN_NORMALIZERS.items():
+        column = columns[key]
+        present = [i for i, value in enumerate(column) if value is not None and value.strip()]
+        normalized = normalize([column[i] for i in present])
+        for i, value in zip(present, normalized):
+            if isinstance(value, InvalidValue):
+                errors[i].append(str(value))
+            else:
+                column[i] = value
+        columns[key] = column
+
+    valid, rejected = [], []
+    for i, row in enumerate(rows):
+        if errors[i]:
+            rejected.append((i, row, errors[i]))
+        else:
+            record = dict(row)
+            record.update({key: column[i] for key, column in columns.items()})
+            valid.append(record)
+    return valid, rejected
+
+
+def validate_stream(records, on_reject=None, batch_size=DEFAULT_BATCH_SIZE, indexed=False):
+    """Yield normalized records, validating ``batch_size`` at a time.
+
+    ``on_reject(index, record, errors)`` is called for every bad record
+    (index is its position in the input); by default it is printed. With
+    ``indexed`` (index, record) pairs are yielded, so callers can keep
+    reporting records by their input position.
+    """
+    records = iter(records)
+    offset = 0
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        valid, rejected = validate_batch(batch)
+        for i, row, errors in rejected:
+            if on_reject:
+                on_reject(offset + i, row, errors)
+            else:
+                print(f"✗ record {offset + i} rejected: {'; '.join(errors)}")
+        if indexed:
+            rejected_at = {i for i, _, _ in rejected}
+            positions = [offset + i for i in range(len(batch)) if i not in rejected_at]
+            valid = zip(positions, valid)
+        offset += len(batch)
+        yield from valid
+
+
+def validate_record(record):
+    """Single-record form of validate_batch: returns (record, errors)."""
+    valid, rejected = validate_batch([record])
+    if rejected:
+        return record, rejected[0][2]
+    return valid[0], []
+
+
+class RejectLog:
+    """on_reject callback that writes rejected records to a JSONL file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = None
+
+    def __call__(self, index, record, errors):
+        if self._file is None:
+            self._file = open(self.path, 'w', encoding='utf-8')
+        self._file.write(json.dumps({'index': index, 'errors': errors, 'record': record}) + '\n')
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from batch_runner import load_records
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Validate and normalize records without starting a browser")
+    parser.add_argument('records', help="CSV or JSONL file of records")
+    parser.add_argument('--rejects', default=None, help="write rejected records here (JSONL)")
+    args = parser.parse_args()
+
+    reject_log = RejectLog(args.rejects) if args.rejects else None
+    valid = sum(1 for _ in validate_stream(load_records(args.records), on_reject=reject_log))
+    if reject_log:
+        reject_log.close()
+        print(f"{valid} valid, {reject_log.count} rejected (see {args.rejects})")
+    else:
+        print(f"{valid} valid")
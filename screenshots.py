@@ -0,0 +1,292 @@
+import os
+import io
+import glob
+import json
+import time
+import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from PIL import Image
+
+from instrumentation import stage
+
+# Root folder for captures; each run writes to its own sub-directory.
+# Override with SCREENSHOT_DIR / SCREENSHOT_FORMAT / SCREENSHOT_MAX_BYTES /
+# SCREENSHOT_DEDUPE_DISTANCE in .env
+DEFAULT_SCREENSHOT_DIR = 'screenshots'
+DEFAULT_FORMAT = 'png'
+DEFAULT_MAX_BYTES = 300 * 1024
+# Perceptual hashes this many bits apart (or fewer) count as the same page.
+# Re-encoding the same page moves a 64-bit dhash by a bit or two at most.
+DEFAULT_DEDUPE_DISTANCE = 2
+
+EXTENSIONS = {'png': 'png', 'jpeg': 'jpg', 'webp': 'webp'}
+QUALITY_STEPS = [85, 75, 65, 50, 35]
+# Each store appends to its own index file (phash_index.<run>.<pid>.json), so
+# process workers sharing base_dir never overwrite each other's entries; all
+# of them (and the older single phash_index.json) are merged on load.
+INDEX_PATTERN = 'phash_index*.json'
+# Region captured by default: the form card rather than the whole window.
+# Pages without a match (e.g. the confirmation page) fall back to the viewport.
+DEFAULT_SELECTOR = 'form'
+
+CLIP_SCRIPT = """
+const el = document.querySelector(arguments[0]);
+if (!el) return null;
+const r = el.getBoundingClientRect();
+if (!r.width || !r.height) return null;
+return {x: r.left + window.scrollX, y: r.top + window.scrollY, width: r.width, height: r.height};
+"""
+
+
+def new_run_id():
+    return time.strftime('%Y%m%d-%H%M%S') + f'-{os.getpid()}'
+
+
+# ----------------------------
+# CAPTURE (runs on the driver's thread)
+# ----------------------------
+def element_clip(driver, selector):
+    """Page-coordinate rectangle of the first match for ``selector``, or None."""
+    return driver.execute_script(CLIP_SCRIPT, selector)
+
+
+def capture_base64(driver, element=None, clip=None):
+    """Return a base64 PNG of an element, a CDP clip rectangle or the viewport.
+
+    The payload is left encoded as it came off the wire; decoding happens on
+    the writer thread. ``clip`` is a dict with x, y, width, height in CSS
+    pixels; it may extend below the fold because the capture is taken beyond
+    the viewport.
+    """
+    if element is not None:
+        return element.screenshot_as_base64
+    if clip is not None and hasattr(driver, 'execute_cdp_cmd'):
+        result = driver.execute_cdp_cmd('Page.captureScreenshot', {
+            'format': 'png',
+            'captureBeyondViewport': True,
+            'clip': dict(clip, scale=clip.get('scale', 1)),
+        })
+        return result['data']
+    return driver.get_screenshot_as_base64()
+
+
+# ----------------------------
+# ENCODING (runs on the worker pool)
+# ----------------------------
+def dhash(image, size=8):
+    """64-bit difference hash: robust to re-encoding and tiny render noise."""
+    small = image.convert('L').resize((size + 1, size), Image.LANCZOS)
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return bits
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def _save(image, fmt, quality=None):
+    buffer = io.BytesIO()
+    if fmt == 'png':
+        image.save(buffer, 'PNG', optimize=True)
+    elif fmt == 'jpeg':
+        image.convert('RGB').save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(buffer, 'WEBP', quality=quality, method=4)
+    return buffer.getvalue()
+
+
+def encode_within_budget(image, fmt=DEFAULT_FORMAT, max_bytes=DEFAULT_MAX_BYTES):
+    """Encode ``image`` as ``fmt``, degrading until it fits ``max_bytes``.
+
+    Lossy formats step down in quality; PNG is palette-quantised. If that is
+    still too large the image is scaled down by a quarter and tried again.
+    The smallest attempt is returned if nothing fits.
+    """
+    smallest = None
+    while True:
+        if fmt == 'png':
+            attempts = [lambda: _save(image, 'png'), lambda: _save(image.quantize(256), 'png')]
+        else:
+            attempts = [lambda q=q: _save(image, fmt, q) for q in QUALITY_STEPS]
+        for attempt in attempts:
+            data = attempt()
+            if smallest is None or len(data) < len(smallest):
+                smallest = data
+            if len(data) <= max_bytes:
+                return data
+        if min(image.size) < 200:
+            return smallest
+        image = image.resize((int(image.width * 0.75), int(image.height * 0.75)), Image.LANCZOS)
+
+
+class ScreenshotStore:
+    """Writes screenshots to ``<base_dir>/<run_id>/`` off the calling thread.
+
+    The driver only pays for grabbing the base64 PNG; decoding, perceptual
+    hashing, compression and the fsync'd write happen on a small worker pool,
+    so the caller can move on to the next form straight away. ``flush()`` or
+    ``result(name)`` wait for files that are needed immediately. Captures
+    made with ``dedupe=True`` (confirmation pages) whose perceptual hash
+    matches an earlier one are not written again; the earlier file's path is
+    returned instead.
+    """
+
+    def __init__(self, base_dir=None, run_id=None, fmt=None, max_bytes=None, selector=None,
+                 workers=2, dedupe=True, dedupe_distance=None):
+        self.base_dir = base_dir or os.getenv('SCREENSHOT_DIR', DEFAULT_SCREENSHOT_DIR)
+        self.run_id = run_id or new_run_id()
+        self.run_dir = os.path.join(self.base_dir, self.run_id)
+        self.fmt = (fmt or os.getenv('SCREENSHOT_FORMAT', DEFAULT_FORMAT)).lower()
+        if self.fmt == 'jpg':
+            self.fmt = 'jpeg'
+        if self.fmt not in EXTENSIONS:
+            raise ValueError(f"Unsupported screenshot format '{self.fmt}' (png, jpeg or webp)")
+        self.max_bytes = int(max_bytes or os.getenv('SCREENSHOT_MAX_BYTES', DEFAULT_MAX_BYTES))
+        self.selector = selector if selector is not None else os.getenv('SCREENSHOT_SELECTOR', DEFAULT_SELECTOR)
+        self.dedupe = dedupe
+        self.dedupe_distance = int(dedupe_distance if dedupe_distance is not None
+                                   else os.getenv('SCREENSHOT_DEDUPE_DISTANCE', DEFAULT_DEDUPE_DISTANCE))
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='screenshot')
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._index = self._load_index() if dedupe else []
+        self._own_index = []  # entries this store added, saved to its own file
+        self.stats = {'captured': 0, 'written': 0, 'deduplicated': 0, 'bytes_written': 0, 'errors': 0}
+        os.makedirs(self.run_dir, exist_ok=True)
+
+    # ----------------------------
+    # DEDUPE INDEX (shared by all runs under base_dir)
+    # ----------------------------
+    def _index_path(self):
+        return os.path.join(self.base_dir, f"phash_index.{self.run_id}.{os.getpid()}.json")
+
+    def _load_index(self):
+        index = []
+        for index_path in sorted(glob.glob(os.path.join(self.base_dir, INDEX_PATTERN))):
+            try:
+                with open(index_path, 'r') as f:
+                    index.extend((int(h, 16), path) for h, path in json.load(f) if os.path.exists(path))
+            except (OSError, ValueError):
+                continue
+        return index
+
+    def _save_index(self):
+        tmp_path = self._index_path() + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump([(f'{h:016x}', path) for h, path in self._own_index], f)
+        os.replace(tmp_path, self._index_path())
+
+    def _find_duplicate(self, digest):
+        for known, path in self._index:
+            if hamming(known, digest) <= self.dedupe_distance:
+                return path
+        return None
+
+    # ----------------------------
+    # CAPTURE / WRITE
+    # ----------------------------
+    def path_for(self, name):
+        return os.path.join(self.run_dir, f"{name}.{EXTENSIONS[self.fmt]}")
+
+    def capture(self, driver, name, element=None, clip=None, selector=None, dedupe=False):
+        """Grab a screenshot now and return a Future for the written path.
+
+        Without an explicit ``element`` or ``clip`` the region matched by
+        ``selector`` (default: the store's selector) is captured, including
+        any part of it below the fold; an empty selector means the viewport.
+        ``dedupe`` is for pages expected to look the same on every run.
+        """
+        selector = self.selector if selector is None else selector
+        with stage('screenshot', shot=name):
+            if element is None and clip is None and selector:
+                clip = element_clip(driver, selector)
+            payload = capture_base64(driver, element=element, clip=clip)
+        future = self._executor.submit(self._write, payload, name, dedupe and self.dedupe)
+        with self._lock:
+            self.stats['captured'] += 1
+            self._pending[name] = future
+        future.add_done_callback(lambda f: self._done(name, f))
+        return future
+
+    def _done(self, name, future):
+        if future.exception() is not None:
+            with self._lock:
+                self.stats['errors'] += 1
+            print(f"⚠ Screenshot {name} could not be written: {future.exception()}")
+
+    def result(self, name, timeout=None):
+        """Block until screenshot ``name`` is on disk and return its path."""
+        with self._lock:
+            future = self._pending[name]
+        return future.result(timeout)
+
+    def flush(self, timeout=None):
+        """Wait for every capture so far; return {name: path or None on error}."""
+        with self._lock:
+            pending = dict(self._pending)
+        wait(pending.values(), timeout=timeout)
+        return {name: (f.result() if f.done() and f.exception() is None else None)
+                for name, f in pending.items()}
+
+    def _write(self, payload, name, dedupe):
+        image = Image.open(io.BytesIO(base64.b64decode(payload)))
+        image.load()
+
+        digest = dhash(image) if dedupe else None
+        if digest is not None:
+            with self._lock:
+                duplicate = self._find_duplicate(digest)
+                if duplicate:
+                    self.stats['deduplicated'] += 1
+                    return duplicate
+
+        data = encode_within_budget(image, self.fmt, self.max_bytes)
+        path = self.path_for(name)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.stats['written'] += 1
+            self.stats['bytes_written'] += len(data)
+            if digest is not None:
+                self._index.append((digest, path))
+                self._own_index.append((digest, path))
+                self._save_index()
+        return path
+
+    def close(self, wait=True):
+        """Stop the writer; with ``wait`` every pending capture is written first."""
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def latest_screenshot(name, base_dir=None):
+    """Newest ``<name>.*`` under any run directory, or None."""
+    base_dir = base_dir or os.getenv('SCREENSHOT_DIR', DEFAULT_SCREENSHOT_DIR)
+    newest = None
+    try:
+        runs = os.listdir(base_dir)
+    except OSError:
+        return None
+    for run in runs:
+        for ext in EXTENSIONS.values():
+            path = os.path.join(base_dir, run, f"{name}.{ext}")
+            if os.path.exists(path) and (newest is None or os.path.getmtime(path) > os.path.getmtime(newest)):
+                newest = path
+    return newest
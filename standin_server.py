@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import random
+import argparse
+import threading
+import secrets
+from html import escape
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+VERIFICATION_CODE = "GNFPYC"
+
+# Questions in the order Google Forms renders them: (entry id, label, kind).
+# Entry ids are what a real form posts as ``entry.<id>``.
+QUESTIONS = [
+    (1001, "Full Name", 'text'),
+    (1002, "Contact Number", 'text'),
+    (1003, "Email ID", 'text'),
+    (1004, "Full Address", 'textarea'),
+    (1005, "Pin Code", 'text'),
+    (1006, "Date of Birth", 'date'),
+    (1007, "Gender", 'choice'),
+    (1008, "Verification Code", 'text'),
+]
+GENDER_OPTIONS = ["Male", "Female", "Other"]
+
+# Radio / listbox widgets keep their value in a hidden entry input, the way
+# Google Forms does, so a plain form POST carries every answer.
+PAGE_SCRIPT = """
+document.querySelectorAll('div[role="radio"]').forEach(radio => {
+    radio.addEventListener('click', () => {
+        const group = radio.closest('[role="radiogroup"]');
+        group.querySelectorAll('div[role="radio"]').forEach(r => r.setAttribute('aria-checked', 'false'));
+        radio.setAttribute('aria-checked', 'true');
+        group.querySelector('input[type="hidden"]').value = radio.getAttribute('data-value');
+    });
+});
+document.querySelectorAll('div[role="listbox"]').forEach(listbox => {
+    const options = listbox.querySelector('.options');
+    listbox.addEventListener('click', event => {
+        const option = event.target.closest('div[role="option"]');
+        if (option) {
+            listbox.querySelectorAll('div[role="option"]').forEach(o => o.setAttribute('aria-selected', 'false'));
+            option.setAttribute('aria-selected', 'true');
+            listbox.querySelector('input[type="hidden"]').value = option.getAttribute('data-value');
+            options.style.display = 'none';
+        } else {
+            options.style.display = 'block';
+        }
+    });
+});
+"""
+
+
+def question_html(entry_id, label, kind, gender_widget):
+    heading_id = f"q{entry_id}"
+    name = f"entry.{entry_id}"
+    head = f'<div role="listitem"><div role="heading" id="{heading_id}">{escape(label)}</div>'
+    if kind == 'textarea':
+        control = f'<textarea name="{name}" aria-labelledby="{heading_id}"></textarea>'
+    elif kind == 'date':
+        control = f'<input type="date" name="{name}" aria-labelledby="{heading_id}">'
+    elif kind == 'choice' and gender_widget == 'listbox':
+        options = ''.join(f'<div role="option" data-value="{o}" aria-selected="false">{o}</div>'
+                          for o in GENDER_OPTIONS)
+        control = (f'<div role="listbox" aria-labelledby="{heading_id}">Choose'
+                   f'<div class="options" style="display:none">{options}</div>'
+                   f'<input type="hidden" name="{name}"></div>')
+    elif kind == 'choice' and gender_widget == 'text':
+        control = f'<input type="text" name="{name}" aria-labelledby="{heading_id}">'
+    elif kind == 'choice':
+        options = ''.join(f'<div role="radio" aria-label="{o}" data-value="{o}" aria-checked="false">{o}</div>'
+                          for o in GENDER_OPTIONS)
+        control = (f'<div role="radiogroup" aria-labelledby="{heading_id}">{options}'
+                   f'<input type="hidden" name="{name}"></div>')
+    else:
+        control = f'<input type="text" name="{name}" aria-labelledby="{heading_id}">'
+    return head + control + '</div>'
+
+
+def form_page(fbzx, gender_widget='radio'):
+    entries = [[entry_id, label, kind] for entry_id, label, kind in QUESTIONS]
+    questions = ''.join(question_html(*q, gender_widget) for q in QUESTIONS)
+    return f"""<!DOCTYPE html>
+<html><head><title>Stand-in form</title></head>
+<body>
+<form action="/formResponse" method="POST">
+<div role="list">{questions}</div>
+<input type="hidden" name="fbzx" value="{fbzx}">
+<button type="submit">Submit</button>
+</form>
+<script>var FB_PUBLIC_LOAD_DATA_ = {json.dumps(entries)};</script>
+<script>{PAGE_SCRIPT}</script>
+</body></html>"""
+
+
+CONFIRMATION_PAGE = """<!DOCTYPE html>
+<html><head><title>Stand-in form</title></head>
+<body><div role="heading">Stand-in form</div>
+<div class="confirmation">Your response has been recorded.</div></body></html>"""
+
+
+def validate(answers, tokens):
+    """Return a list of problems with a posted submission."""
+    problems = []
+    if answers.get('fbzx') not in tokens:
+        problems.append('missing or unknown fbzx token')
+    for entry_id, label, kind in QUESTIONS:
+        if not answers.get(f'entry.{entry_id}'):
+            problems.append(f'{label} is required')
+    if answers.get('entry.1008') and answers['entry.1008'] != VERIFICATION_CODE:
+        problems.append('wrong verification code')
+    return problems
+
+
+class StandinState:
+    """Submissions and issued fbzx tokens, shared by the handler threads."""
+
+    def __init__(self, latency=0.0, jitter=0.0, gender_widget='radio'):
+        self.latency = latency
+        self.jitter = jitter
+        self.gender_widget = gender_widget
+        self.lock = threading.Lock()
+        self.tokens = set()
+        self.submissions = []
+        self.rejected = 0
+
+    def delay(self):
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    state = None  # set per server by make_server
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type='text/html; charset=utf-8'):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        state = self.state
+        if url.path in ('/', '/viewform'):
+            state.delay()
+            widget = parse_qs(url.query).get('gender', [state.gender_widget])[0]
+            fbzx = secrets.token_hex(8)
+            with state.lock:
+                state.tokens.add(fbzx)
+            self._send(200, form_page(fbzx, widget))
+        elif url.path == '/stats':
+            with state.lock:
+                stats = {'submissions': len(state.submissions), 'rejected': state.rejected}
+            self._send(200, json.dumps(stats), 'application/json')
+        elif url.path == '/submissions':
+            with state.lock:
+                self._send(200, json.dumps(state.submissions), 'application/json')
+        else:
+            self._send(404, 'not found', 'text/plain')
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/formResponse':
+            self._send(404, 'not found', 'text/plain')
+            return
+        state = self.state
+        state.delay()
+        length = int(self.headers.get('Content-Length') or 0)
+        answers = {key: values[-1] for key, values in parse_qs(self.rfile.read(length).decode('utf-8')).items()}
+        with state.lock:
+            problems = validate(answers, state.tokens)
+            if problems:
+                state.rejected += 1
+            else:
+                state.tokens.discard(answers['fbzx'])
+                state.submissions.append(answers)
+        if problems:
+            self._send(400, '<html><body><div class="error">' + escape('; '.join(problems)) + '</div></body></html>')
+        else:
+            self._send(200, CONFIRMATION_PAGE)
+
+
+def make_server(host='127.0.0.1', port=0, latency=0.0, jitter=0.0, gender_widget='radio'):
+    """Build a stand-in server; port 0 picks a free port (see ``server_address``)."""
+    handler = type('Handler', (StandinHandler,), {'state': StandinState(latency, jitter, gender_widget)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = handler.state
+    return server
+
+
+def start_server(**kwargs):
+    """Serve in a daemon thread; returns (server, form_url). Stop with server.shutdown()."""
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, name='standin-server', daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}/viewform"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Google Form")
+    parser.add_argument('--port', type=int, default=int(os.getenv('STANDIN_PORT', 8765)))
+    parser.add_argument('--latency', type=float, default=float(os.getenv('STANDIN_LATENCY', 0)),
+                        help="seconds added to every page load and submission")
+    parser.add_argument('--jitter', type=float, default=0.0, help="+/- random seconds on top of --latency")
+    parser.add_argument('--gender', choices=['radio', 'listbox', 'text'], default='radio',
+                        help="widget used for the gender question (override per request with ?gender=)")
+    args = parser.parse_args()
+    server = make_server(port=args.port, latency=args.latency, jitter=args.jitter, gender_widget=args.gender)
+    print(f"Stand-in form at http://127.0.0.1:{args.port}/viewform (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nServer stopped")
@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+# Append-only log of per-record progress. Override with SUBMISSION_JOURNAL in .env
+DEFAULT_JOURNAL = 'submission_journal.jsonl'
+# Entries are fsync'd together at most this often (seconds) ...
+DEFAULT_FLUSH_INTERVAL = 0.05
+# ... or as soon as this many are waiting
+DEFAULT_FLUSH_BATCH = 64
+
+# Stages in the order a record goes through them. 'submitting' is written
+# (durably) just before Submit is clicked: a record left there crashed
+# mid-submit and may or may not have been recorded by the form.
+STAGES = ['filled', 'validated', 'submitting', 'submitted', 'screenshotted', 'emailed']
+_RANK = {stage: rank for rank, stage in enumerate(STAGES)}
+
+KEY_FIELDS = [
+    'form_url', 'full_name', 'contact_number', 'email_id',
+    'full_address', 'pin_code', 'date_of_birth', 'gender'
+]
+
+
+def record_key(record):
+    """Idempotency key: a hash of the record's (normalized) values, so the
+    same row gets the same key however the input file is reordered."""
+    payload = json.dumps([record.get(field) for field in KEY_FIELDS], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+def reached(stage, target):
+    """True if ``stage`` is ``target`` or later."""
+    return stage is not None and _RANK[stage] >= _RANK[target]
+
+
+class SubmissionJournal:
+    """Append-only JSONL journal of record stages with group commit.
+
+    ``record()`` queues an entry; a flusher thread writes and fsyncs queued
+    entries together every ``flush_interval`` seconds (or once
+    ``flush_batch`` are waiting). ``durable=True`` blocks until the entry
+    is on disk, which is used for the entries guarding against duplicate
+    submissions. Several processes may append to the same file: each flush
+    is a single write of whole lines.
+
+    If a write or fsync fails the flusher stops and the error is raised by
+    every later ``record()`` (including durable ones already waiting) and
+    by ``close()``.
+    """
+
+    def __init__(self, path=None, flush_interval=None, flush_batch=DEFAULT_FLUSH_BATCH):
+        self.path = path or os.getenv('SUBMISSION_JOURNAL', DEFAULT_JOURNAL)
+        self.flush_interval = float(flush_interval if flush_interval is not None
+                                    else os.getenv('JOURNAL_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL))
+        self.flush_batch = flush_batch
+        self.stages = self._replay()
+        self._pending = []
+        self._flushed = 0   # entries written so far (sequence numbers)
+        self._queued = 0
+        self._oldest = 0.0
+        self._durable_waiters = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._error = None  # OSError that stopped the flusher
+        self.stats = {'entries': 0, 'fsyncs': 0}
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._end_torn_line()
+        self._thread = threading.Thread(target=self._flusher, name='journal-flusher', daemon=True)
+        self._thread.start()
+
+    def _replay(self):
+        """Latest stage per key. A torn last line from a crash is ignored."""
+        stages = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    key, stage = entry.get('key'), entry.get('stage')
+                    if stage in _RANK and not reached(stages.get(key), stage):
+                        stages[key] = stage
+        except FileNotFoundError:
+            pass
+        return stages
+
+    def _end_torn_line(self):
+        """Terminate a torn last line so the next entry starts a line of its own."""
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return
+            f.seek(-1, os.SEEK_END)
+            torn = f.read(1) != b'\n'
+        if torn:
+            os.write(self._fd, b'\n')
+
+    # ----------------------------
+    # QUERIES
+    # ----------------------------
+    def stage(self, key):
+        return self.stages.get(key)
+
+    def is_done(self, key, target='submitted'):
+        return reached(self.stages.get(key), target)
+
+    def is_uncertain(self, key):
+        """Crashed between clicking Submit and recording the result."""
+        return self.stages.get(key) == 'submitting'
+
+    # ----------------------------
+    # WRITES
+    # ----------------------------
+    def record(self, key, stage, durable=False, **info):
+        entry = dict(info, key=key, stage=stage, ts=round(time.time(), 3))
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("SubmissionJournal is closed")
+            if self._error is not None:
+                raise self._error
+            if not reached(self.stages.get(key), stage):
+                self.stages[key] = stage
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append(json.dumps(entry) + '\n')
+            self._queued += 1
+            sequence = self._queued
+            if durable:
+                self._durable_waiters += 1
+            self._cond.notify_all()
+            if durable:
+                while self._flushed < sequence and self._error is None:
+                    self._cond.wait()
+                self._durable_waiters -= 1
+                if self._flushed < sequence:
+                    raise self._error
+
+    def _flush_due(self):
+        if not self._pending:
+            return False
+        return (self._closed or self._durable_waiters or len(self._pending) >= self.flush_batch
+                or time.monotonic() - self._oldest >= self.flush_interval)
+
+    def _flusher(self):
+        while True:
+            with self._cond:
+                while not self._flush_due():
+                    if self._closed and not self._pending:
+                        return
+                    timeout = None
+                    if self._pending:
+                        timeout = max(0.0, self._oldest + self.flush_interval - time.monotonic())
+                    self._cond.wait(timeout)
+                lines, self._pending = self._pending, []
+                sequence = self._queued
+            try:
+                os.write(self._fd, ''.join(lines).encode('utf-8'))
+                os.fsync(self._fd)
+            except OSError as e:
+                with self._cond:
+                    self._error = e
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self._flushed = sequence
+                self.stats['entries'] += len(lines)
+                self.stats['fsyncs'] += 1
+                self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        os.close(self._fd)
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def journal_hook(journal, key, **info):
+    """``on_stage`` callback for run_submission / automate_form."""
+    def on_stage(stage):
+        journal.record(key, stage, durable=stage in ('submitting', 'submitted'), **info)
+    return on_stage
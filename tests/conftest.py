@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+
+# The project is a set of top-level modules run from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rate_control
+from standin_server import start_server
+
+
+@pytest.fixture(autouse=True)
+def isolated_env(monkeypatch, tmp_path):
+    """No metrics file, no rate limits and no .env leaking into a test."""
+    monkeypatch.setenv('METRICS_FILE', '')
+    for var in ('FORM_RATE', 'FORM_BURST', 'SMTP_RATE', 'SMTP_BURST'):
+        monkeypatch.delenv(var, raising=False)
+    rate_control.set_share(1.0)
+    monkeypatch.chdir(tmp_path)
+    yield
+    rate_control.set_share(1.0)
+
+
+@pytest.fixture
+def standin():
+    """The local stand-in form; yields (server, form_url)."""
+    server, form_url = start_server()
+    try:
+        yield server, form_url
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def record(standin):
+    _, form_url = standin
+    return {
+        'form_url': form_url,
+        'full_name': "Test User",
+        'contact_number': "9876543210",
+        'email_id': "test.user@example.com",
+        'full_address': "1 Test Street, Test City",
+        'pin_code': "110001",
+        'date_of_birth': "1995-06-15",
+        'gender': "Male",
+    }
@@ -0,0 +1,60 @@
+import pytest
+
+import batch_runner
+from submission_journal import SubmissionJournal
+
+
+def records(count):
+    return [{'email_id': f"user{i}@example.com", 'form_url': "http://form.test/"} for i in range(count)]
+
+
+def test_a_worker_exception_fails_only_its_record(monkeypatch, tmp_path):
+    def fake_submit(index, record, *args):
+        if index == 1:
+            raise RuntimeError("chrome would not start")
+        return {'index': index, 'email_id': record['email_id'], 'ok': True, 'error': None,
+                'seconds': 0.01, 'worker': "w"}
+
+    monkeypatch.setattr(batch_runner, '_submit_record', fake_submit)
+    summary = batch_runner.run_batch(records(4), workers=2, validate=False,
+                                     journal_path=str(tmp_path / "journal.jsonl"))
+
+    assert (summary['records'], summary['succeeded'], summary['failed']) == (4, 3, 1)
+    assert summary['workers'] == 1
+
+
+def test_cleanup_runs_when_closing_the_pool_fails(monkeypatch, tmp_path):
+    closed = []
+
+    class BrokenPool:
+        def __init__(self, **kwargs):
+            pass
+
+        def close(self):
+            raise OSError("driver quit failed")
+
+    class Store:
+        def __init__(self, **kwargs):
+            pass
+
+        def close(self):
+            closed.append('screenshots')
+
+    real_close = SubmissionJournal.close
+
+    def close_journal(journal):
+        closed.append('journal')
+        real_close(journal)
+
+    monkeypatch.setattr(batch_runner, 'DriverPool', BrokenPool)
+    monkeypatch.setattr(batch_runner, 'ScreenshotStore', Store)
+    monkeypatch.setattr(SubmissionJournal, 'close', close_journal)
+    monkeypatch.setattr(batch_runner, '_submit_record', lambda index, record, *args: {
+        'index': index, 'email_id': record['email_id'], 'ok': True, 'error': None, 'seconds': 0.0, 'worker': "w"})
+
+    with pytest.raises(OSError):
+        batch_runner.run_batch(records(1), workers=1, validate=False, screenshot_dir=str(tmp_path),
+                               journal_path=str(tmp_path / "journal.jsonl"))
+
+    assert closed == ['screenshots', 'journal']
+    assert batch_runner._pool is None and batch_runner._screenshots is None
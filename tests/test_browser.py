@@ -0,0 +1,69 @@
+import json
+import sys
+import types
+
+import pytest
+from selenium.common.exceptions import SessionNotCreatedException
+
+import browser
+
+
+@pytest.fixture
+def driver_cache(tmp_path, monkeypatch):
+    cache_file = tmp_path / "chromedriver.json"
+    monkeypatch.setenv('DRIVER_CACHE_FILE', str(cache_file))
+    monkeypatch.setattr(browser, '_resolved', {})
+    driver_file = tmp_path / "chromedriver"
+    driver_file.write_text("")
+    installs = []
+
+    class ChromeDriverManager:
+        def install(self):
+            installs.append(str(driver_file))
+            return str(driver_file)
+
+    manager = types.ModuleType('webdriver_manager.chrome')
+    manager.ChromeDriverManager = ChromeDriverManager
+    monkeypatch.setitem(sys.modules, 'webdriver_manager', types.ModuleType('webdriver_manager'))
+    monkeypatch.setitem(sys.modules, 'webdriver_manager.chrome', manager)
+    return cache_file, str(driver_file), installs
+
+
+def test_driver_is_cached_by_chrome_version(driver_cache, monkeypatch):
+    cache_file, driver_file, installs = driver_cache
+    monkeypatch.setattr(browser, 'detect_chrome_version', lambda: "120.0.6099.109")
+    assert browser.resolve_driver_path() == driver_file
+    assert json.loads(cache_file.read_text()) == {"120.0.6099.109": driver_file}
+
+    monkeypatch.setattr(browser, '_resolved', {})
+    assert browser.resolve_driver_path() == driver_file
+    assert len(installs) == 1
+
+
+def test_unknown_chrome_version_is_not_persisted(driver_cache, monkeypatch):
+    cache_file, driver_file, installs = driver_cache
+    monkeypatch.setattr(browser, 'detect_chrome_version', lambda: None)
+    assert browser.resolve_driver_path() == driver_file
+    assert not cache_file.exists()
+
+
+def test_refused_driver_is_evicted(driver_cache, monkeypatch):
+    cache_file, driver_file, installs = driver_cache
+    monkeypatch.setattr(browser, 'detect_chrome_version', lambda: "120.0.6099.109")
+    started = []
+
+    class FakeChrome:
+        def __init__(self, service=None, options=None):
+            if service is not None:
+                raise SessionNotCreatedException("This version of ChromeDriver only supports Chrome version 119")
+            started.append(self)
+
+    monkeypatch.setattr(browser.webdriver, 'Chrome', FakeChrome)
+    monkeypatch.setattr(browser.BrowserProfile, 'apply', lambda profile, driver: driver)
+    monkeypatch.setattr(browser, 'Service', lambda path: path)
+
+    driver = browser.create_driver(headless=True)
+    assert started == [driver]
+    assert json.loads(cache_file.read_text()) == {}
+    # The rest of the process goes straight to Selenium Manager
+    assert browser.resolve_driver_path() is None
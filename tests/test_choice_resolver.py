@@ -0,0 +1,71 @@
+import pytest
+
+from choice_resolver import OptionIndex, labels_match, normalize_label
+from record_validation import GENDER_ALIASES
+
+
+def test_normalize_label_folds_case_and_punctuation():
+    assert normalize_label("  Prefer-not_to   SAY! ") == "prefer not to say"
+    assert normalize_label(None) == ""
+
+
+@pytest.mark.parametrize('value, expected', [
+    ("Male", (0, 'exact')),
+    ("female", (1, 'exact')),
+    ("  OTHER ", (2, 'exact')),
+])
+def test_exact_match(value, expected):
+    assert OptionIndex(["Male", "Female", "Other"]).match(value) == expected
+
+
+def test_male_never_selects_female():
+    index = OptionIndex(["Female", "Male"])
+    assert index.match("Male") == (1, 'exact')
+    assert OptionIndex(["Female"]).match("Male") == (None, None)
+
+
+def test_female_never_selects_male():
+    assert OptionIndex(["Male", "Other"]).match("Female") == (None, None)
+    assert OptionIndex(["Male", "Other"], GENDER_ALIASES).match("Female") == (None, None)
+    assert not labels_match("Female", "Male", GENDER_ALIASES)
+
+
+def test_alias_values_are_not_fuzzy_matched():
+    assert OptionIndex(["Males"], GENDER_ALIASES).match("Male") == (None, None)
+
+
+def test_aliases_work_both_ways():
+    assert OptionIndex(["M", "F"], GENDER_ALIASES).match("Male") == (0, 'exact')
+    assert OptionIndex(["Male", "Female"], GENDER_ALIASES).match("f") == (1, 'exact')
+
+
+def test_prefix_match_on_labels_with_trailing_text():
+    index = OptionIndex(["Male, option 1 of 3", "Female, option 2 of 3"])
+    assert index.match("Male") == (0, 'prefix')
+
+
+def test_ambiguous_prefix_is_not_guessed():
+    index = OptionIndex(["Other - please specify", "Other (prefer not to say)"])
+    assert index.match("Other") == (None, None)
+
+
+def test_fuzzy_match_for_typos():
+    assert OptionIndex(["Male", "Female", "Other"]).match("Femal") == (1, 'fuzzy')
+
+
+def test_no_match():
+    assert OptionIndex(["Yes", "No"]).match("Maybe") == (None, None)
+    assert OptionIndex(["Yes"]).match("") == (None, None)
+
+
+def test_labels_match():
+    assert labels_match("Male", "male")
+    assert labels_match("Male", "M", GENDER_ALIASES)
+    assert not labels_match("Male", "Female")
+    assert not labels_match("Male", None)
+
+
+def test_labels_match_is_strict():
+    assert not labels_match("Femal", "Female")
+    assert not labels_match("Male", "Male, option 1 of 3")
+    assert not labels_match("", "")
@@ -0,0 +1,67 @@
+from driver_pool import DriverPool
+
+
+class FakeDriver:
+    def __init__(self, url="https://docs.google.com/forms/d/e/abc/viewform"):
+        self.current_url = url
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append(('script', script))
+        return 1
+
+    def get(self, url):
+        self.calls.append(('get', url))
+        self.current_url = url
+
+    def delete_all_cookies(self):
+        self.calls.append(('delete_all_cookies',))
+
+    def quit(self):
+        self.calls.append(('quit',))
+
+
+class FakeChromeDriver(FakeDriver):
+    def execute_cdp_cmd(self, command, params):
+        self.calls.append(('cdp', command, params))
+        return {}
+
+
+def test_reset_clears_every_origin_through_cdp():
+    driver = FakeChromeDriver()
+    assert DriverPool().reset(driver)
+    assert driver.calls == [
+        ('cdp', 'Network.clearBrowserCookies', {}),
+        ('cdp', 'Storage.clearDataForOrigin', {'origin': "https://docs.google.com", 'storageTypes': 'all'}),
+        ('get', 'about:blank'),
+    ]
+
+
+def test_reset_on_a_blank_page_skips_the_origin_clear():
+    driver = FakeChromeDriver(url="about:blank")
+    assert DriverPool().reset(driver)
+    assert [call[1] for call in driver.calls if call[0] == 'cdp'] == ['Network.clearBrowserCookies']
+
+
+def test_reset_without_cdp_falls_back_to_webdriver_calls():
+    driver = FakeDriver()
+    assert DriverPool().reset(driver)
+    assert [call[0] for call in driver.calls] == ['delete_all_cookies', 'script', 'get']
+
+
+def test_reused_driver_is_reset_between_jobs():
+    drivers = []
+
+    def factory():
+        drivers.append(FakeChromeDriver())
+        return drivers[-1]
+
+    pool = DriverPool(size=1, max_jobs=5, factory=factory)
+    for _ in range(2):
+        with pool.session() as driver:
+            driver.get("https://docs.google.com/forms/d/e/abc/viewform")
+    pool.close()
+
+    assert len(drivers) == 1
+    commands = [call[1] for call in drivers[0].calls if call[0] == 'cdp']
+    assert commands == ['Network.clearBrowserCookies', 'Storage.clearDataForOrigin'] * 2
@@ -0,0 +1,98 @@
+import os
+from email.utils import getaddresses
+from string import Template
+
+import pytest
+
+from email_templates import CompiledTemplate, EmailTemplate, MessageSkeleton
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+
+@pytest.mark.parametrize('text', [
+    "Hello $name, your id is ${id}.",
+    "$name",
+    "costs $$5 for ${name}$$",
+    "no placeholders",
+    "",
+])
+def test_renders_like_string_template(text):
+    values = {'name': "Asha", 'id': 42}
+    assert CompiledTemplate(text).render(values) == Template(text).substitute(values)
+
+
+def test_placeholder_names():
+    assert CompiledTemplate("$a ${b} $$c $a").names == {'a', 'b'}
+
+
+def test_missing_value_raises_key_error():
+    with pytest.raises(KeyError):
+        CompiledTemplate("Hi $name").render({})
+
+
+def test_invalid_placeholder_is_rejected_up_front():
+    with pytest.raises(ValueError):
+        CompiledTemplate("Total: $5")
+
+
+def test_template_file_headers_are_templates_too():
+    template = EmailTemplate.from_file(os.path.join(TEMPLATES_DIR, 'submission_confirmation.txt'))
+    values = {'full_name': "Asha Rao", 'email_id': "asha@example.com", 'contact_number': "9876543210",
+              'full_address': "1 Test Street", 'pin_code': "110001"}
+    headers, subject, body = template.render(values)
+    assert headers == [('To', "Asha Rao <asha@example.com>")]
+    assert subject == "Your form submission has been received, Asha Rao"
+    assert body.startswith("Hello Asha Rao,")
+    assert template.placeholders == set(values)
+
+
+def test_skeleton_skips_rows_missing_a_value():
+    skeleton = MessageSkeleton(EmailTemplate("Hi $name", "Body", {'To': "$email"}), sender="me@example.com")
+    errors = []
+    messages = list(skeleton.render_rows([{'name': "A", 'email': "a@example.com"}, {'name': "B"}],
+                                         on_error=lambda i, row, e: errors.append(i)))
+    assert errors == [1]
+    assert len(messages) == 1
+    assert messages[0]['From'] == "me@example.com"
+    assert messages[0]['To'] == "a@example.com"
+    assert messages[0]['Subject'] == "Hi A"
+
+
+def test_display_name_with_a_comma_stays_one_recipient():
+    template = EmailTemplate.from_file(os.path.join(TEMPLATES_DIR, 'submission_confirmation.txt'))
+    values = {'full_name': "Doe, John", 'email_id': "john@example.com", 'contact_number': "9876543210",
+              'full_address': "1 Test Street", 'pin_code': "110001"}
+    headers, _, _ = template.render(values)
+    assert headers == [('To', '"Doe, John" <john@example.com>')]
+    assert getaddresses([headers[0][1]]) == [("Doe, John", "john@example.com")]
+
+
+def test_plain_address_header_is_unchanged():
+    headers, _, _ = EmailTemplate("Hi", "Body", {'To': "$email", 'X-Tag': "$name"}).render(
+        {'email': "a@example.com", 'name': "Doe, John"})
+    assert headers == [('To', "a@example.com"), ('X-Tag', "Doe, John")]
+
+
+@pytest.mark.parametrize('values', [
+    {'name': "Eve\r\nBcc: victim@example.com", 'email': "eve@example.com"},
+    {'name': "Eve", 'email': "eve@example.com\nBcc: victim@example.com"},
+])
+def test_line_breaks_in_header_values_are_rejected(values):
+    template = EmailTemplate("Hello $name", "Body", {'To': "$name <$email>"})
+    with pytest.raises(ValueError, match="line break"):
+        template.render(values)
+
+
+def test_skeleton_skips_rows_that_would_inject_headers():
+    skeleton = MessageSkeleton(EmailTemplate("Hi", "Body", {'To': "$name <$email>"}))
+    errors = []
+    rows = [{'name': "Eve\r\nBcc: victim@example.com", 'email': "eve@example.com"},
+            {'name': "Ann", 'email': "ann@example.com"}]
+    messages = list(skeleton.render_rows(rows, on_error=lambda i, row, e: errors.append(i)))
+    assert errors == [0]
+    assert [msg['To'] for msg in messages] == ["Ann <ann@example.com>"]
+
+
+def test_line_break_in_the_subject_is_rejected():
+    with pytest.raises(ValueError, match="Subject"):
+        EmailTemplate("Hello $name", "Body", {'To': "a@example.com"}).render({'name': "Eve\nBcc: b@example.com"})
@@ -0,0 +1,21 @@
+import pytest
+
+from form_automation import RunConfig, fill_form
+
+
+@pytest.mark.parametrize('fill_mode', ['keys', 'fast'])
+def test_browser_fill_modes_are_accepted(record, fill_mode):
+    assert RunConfig(record=dict(record), fill_mode=fill_mode).validate() == []
+
+
+def test_http_fill_mode_is_rejected_not_run_as_keystrokes(record, monkeypatch):
+    monkeypatch.setenv('FILL_MODE', 'HTTP')
+    config = RunConfig.from_env(record=dict(record))
+    errors = config.validate()
+    assert len(errors) == 1
+    assert "FILL_MODE" in errors[0] and "batch_runner.py --fill-mode http" in errors[0]
+
+
+def test_fill_form_refuses_an_unknown_mode():
+    with pytest.raises(ValueError, match="unknown fill mode 'turbo'"):
+        fill_form(None, None, {}, {}, fill_mode='turbo')
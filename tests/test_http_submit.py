@@ -0,0 +1,167 @@
+import json
+
+import pytest
+
+import batch_runner
+from http_submit import NeedsBrowser, answer_fields, parse_form, submit_record
+
+RECORD = {
+    'full_name': "Test User",
+    'contact_number': "9876543210",
+    'email_id': "test.user@example.com",
+    'full_address': "1 Test Street",
+    'pin_code': "110001",
+    'date_of_birth': "1995-06-05",
+    'gender': "Female",
+}
+
+
+def google_item(item_id, title, kind, entry_id=None, options=()):
+    answers = [[entry_id, [[option] for option in options] or None, 1]] if entry_id else None
+    return [item_id, title, None, kind, answers]
+
+
+GOOGLE_ITEMS = [
+    google_item(1, "Full Name", 0, 101),
+    google_item(2, "Contact Number", 0, 102),
+    google_item(3, "Email ID", 0, 103),
+    google_item(4, "Full Address", 1, 104),
+    google_item(5, "Pin Code", 0, 105),
+    google_item(6, "Date of Birth", 9, 106),
+    google_item(7, "Gender", 2, 107, ["M", "F", "Other"]),
+    google_item(8, "Verification Code", 0, 108),
+    [9, "Thanks for applying", None, 6],  # a text block, not a question
+]
+
+
+def google_page(items=GOOGLE_ITEMS, action="https://docs.google.com/forms/d/e/abc/formResponse"):
+    load_data = [None, ["Form description", items, None]]
+    return f"""<html><body>
+<form action="{action}" method="POST">
+<input type="hidden" name="fbzx" value="-123">
+<input type="hidden" name="fvv" value="1">
+<input type="hidden" name="entry.107" value="">
+</form>
+<script type="text/javascript" nonce="x">var FB_PUBLIC_LOAD_DATA_ = {json.dumps(load_data)};
+</script></body></html>"""
+
+
+FORM_URL = "https://docs.google.com/forms/d/e/abc/viewform"
+
+
+def test_parse_google_layout():
+    form = parse_form(google_page(), FORM_URL)
+    assert form['action'] == "https://docs.google.com/forms/d/e/abc/formResponse"
+    assert form['hidden'] == {'fbzx': "-123", 'fvv': "1"}
+    assert [(q['entry_id'], q['field'], q['type']) for q in form['questions']] == [
+        (101, 'full_name', 'text'), (102, 'contact_number', 'text'), (103, 'email_id', 'text'),
+        (104, 'full_address', 'textarea'), (105, 'pin_code', 'text'), (106, 'date_of_birth', 'date'),
+        (107, 'gender', 'radio'), (108, 'verification_code', 'text'),
+    ]
+    assert form['questions'][6]['options'] == ["M", "F", "Other"]
+
+
+def test_relative_action_is_resolved():
+    assert parse_form(google_page(action="/formResponse"), "http://127.0.0.1:8765/viewform")['action'] == \
+        "http://127.0.0.1:8765/formResponse"
+
+
+def test_answer_fields_for_google_layout():
+    fields = answer_fields(parse_form(google_page(), FORM_URL), RECORD)
+    assert fields['fbzx'] == "-123"
+    assert fields['entry.101'] == "Test User"
+    # Choice answers are posted as the option's own label
+    assert fields['entry.107'] == "F"
+    assert (fields['entry.106_year'], fields['entry.106_month'], fields['entry.106_day']) == ("1995", "6", "5")
+    assert 'entry.106' not in fields
+    assert fields['entry.108'] == "GNFPYC"
+
+
+def test_unmatched_option_is_an_error_not_a_guess():
+    form = parse_form(google_page(), FORM_URL)
+    with pytest.raises(ValueError):
+        answer_fields(form, dict(RECORD, gender="Robot"))
+
+
+@pytest.mark.parametrize('gender', ["Femal", "Other person"])
+def test_near_miss_option_is_not_posted(gender):
+    items = GOOGLE_ITEMS[:6] + [google_item(7, "Gender", 2, 107, ["Male", "Female", "Other person's choice"])]
+    form = parse_form(google_page(items + GOOGLE_ITEMS[7:]), FORM_URL)
+    with pytest.raises(ValueError):
+        answer_fields(form, dict(RECORD, gender=gender))
+
+
+@pytest.mark.parametrize('html, reason', [
+    ("<html><form action='/formResponse'></form></html>", "no FB_PUBLIC_LOAD_DATA_"),
+    (google_page(GOOGLE_ITEMS[:3] + [[50, "Page 2", None, 8]]), "multi-page"),
+    (google_page(GOOGLE_ITEMS[:3] + [google_item(60, "Upload CV", 13, 160)]), "unsupported question type"),
+    (google_page().replace('<form', '<div').replace('</form>', '</div>'), "no <form>"),
+    ("<script>var FB_PUBLIC_LOAD_DATA_ = {oops};</script>", "not plain JSON"),
+])
+def test_forms_the_engine_cannot_handle(html, reason):
+    with pytest.raises(NeedsBrowser, match=reason):
+        parse_form(html, FORM_URL)
+
+
+def test_unknown_question_needs_the_browser():
+    form = parse_form(google_page(GOOGLE_ITEMS + [google_item(70, "Favourite colour", 0, 170)]), FORM_URL)
+    with pytest.raises(NeedsBrowser, match="Favourite colour"):
+        answer_fields(form, RECORD)
+
+
+def test_nothing_is_posted_when_the_form_needs_the_browser(standin, record):
+    server, form_url = standin
+    record['form_url'] = form_url.replace('/viewform', '/missing')
+    stages = []
+    with pytest.raises(NeedsBrowser, match="HTTP 404"):
+        submit_record(record, on_stage=stages.append)
+    assert stages == []
+    assert server.state.submissions == [] and server.state.rejected == 0
+
+
+class FakeDriver:
+    def execute(self, command, params=None):
+        return {'value': None}
+
+
+class FakePool:
+    def __init__(self):
+        self.sessions = 0
+
+    def session(self):
+        pool = self
+
+        class Session:
+            def __enter__(self):
+                pool.sessions += 1
+                return FakeDriver()
+
+            def __exit__(self, *exc):
+                return False
+        return Session()
+
+
+def test_batch_falls_back_to_the_browser_and_remembers_it(standin, record, monkeypatch):
+    server, form_url = standin
+    pool = FakePool()
+    browser_runs = []
+    monkeypatch.setattr(batch_runner, '_browser_only', set())
+    monkeypatch.setattr(batch_runner, '_worker_pool', lambda *args: pool)
+
+    def fake_run_submission(driver, record, fill_mode, **kwargs):
+        browser_runs.append(fill_mode)
+        return {'email_id': record['email_id'], 'ok': True, 'error': None, 'seconds': 0.0}
+    monkeypatch.setattr(batch_runner, 'run_submission', fake_run_submission)
+
+    args = ('http', None, True, None, None, 'run')
+    ok = batch_runner._submit_record(0, record, *args)
+    assert ok['engine'] == 'http' and ok['ok']
+    assert browser_runs == []
+
+    needs_browser = dict(record, form_url=form_url.replace('/viewform', '/missing'))
+    for index in (1, 2):
+        result = batch_runner._submit_record(index, needs_browser, *args)
+        assert result['ok'] and result['index'] == index
+    assert browser_runs == ['fast', 'fast']
+    assert batch_runner._browser_only == {needs_browser['form_url']}
+    assert pool.sessions == 2
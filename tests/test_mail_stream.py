@@ -0,0 +1,67 @@
+import base64
+import email
+import os
+
+import pytest
+
+from mail_stream import AttachmentTooLarge, StreamingMessage, iter_base64_file
+
+HEADERS = [('From', "me@example.com"), ('To', "you@example.com"), ('Subject', "Files")]
+
+
+@pytest.fixture
+def attachment(tmp_path):
+    path = tmp_path / 'data.bin'
+    path.write_bytes(os.urandom(10_000))
+    return path
+
+
+def test_base64_lines_are_framed_for_smtp(attachment):
+    lines = b''.join(iter_base64_file(str(attachment), chunk_bytes=100)).split(b'\r\n')
+    assert lines[-1] == b''
+    assert all(len(line) == 76 for line in lines[:-2])
+    assert 0 < len(lines[-2]) <= 76
+    assert b'\n' not in b''.join(lines)
+    assert base64.b64decode(b''.join(lines)) == attachment.read_bytes()
+
+
+def test_chunk_size_is_rounded_to_whole_lines(attachment):
+    chunks = list(iter_base64_file(str(attachment), chunk_bytes=100))
+    # 100 bytes round down to 57, one full line per chunk
+    assert all(len(chunk) == 78 for chunk in chunks[:-1])
+
+
+def test_message_parses_back_with_the_attachment(attachment):
+    msg = StreamingMessage(HEADERS, "Hello", [str(attachment)], chunk_bytes=570)
+    parsed = email.message_from_bytes(msg.as_bytes())
+    assert parsed['Subject'] == "Files"
+    assert parsed.get_content_type() == 'multipart/mixed'
+    text, part = parsed.get_payload()
+    assert text.get_payload() == "Hello"
+    assert part.get_filename() == 'data.bin'
+    assert part.get_payload(decode=True) == attachment.read_bytes()
+    assert msg.stats['peak_buffer_bytes'] < 2000
+
+
+def test_data_phase_doubles_leading_dots():
+    msg = StreamingMessage(HEADERS, ".starts with a dot\nmiddle . dot\n..two dots")
+    data = b''.join(msg.iter_data())
+    assert b'\r\n..starts with a dot\r\n' in data
+    assert b'\r\nmiddle . dot\r\n' in data
+    assert b'\r\n...two dots' in data
+    assert b'\n.\r\n' not in data
+
+
+def test_bcc_is_not_written_into_the_message():
+    msg = StreamingMessage(HEADERS + [('Bcc', "hidden@example.com")], "x")
+    assert msg.get_all('Bcc') == ["hidden@example.com"]
+    assert b'hidden@example.com' not in msg.as_bytes()
+
+
+def test_boundaries_are_unique():
+    assert StreamingMessage(HEADERS, "a").boundary != StreamingMessage(HEADERS, "a").boundary
+
+
+def test_oversized_attachment_is_refused(attachment):
+    with pytest.raises(AttachmentTooLarge):
+        StreamingMessage(HEADERS, "x", [str(attachment)], max_attachment_bytes=1000)
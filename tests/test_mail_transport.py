@@ -0,0 +1,261 @@
+import queue
+import smtplib
+import socketserver
+import threading
+import time
+from email.message import EmailMessage
+
+import pytest
+
+from mail_stream import StreamingMessage
+from mail_transport import DeliveryUncertain, SMTPPool, envelope
+
+
+class SMTPStandin(socketserver.ThreadingTCPServer):
+    """Just enough SMTP to test the pool: PIPELINING is optional, recipients
+    in ``refused`` get 550, ``drop_after`` hangs up after that many
+    messages on a connection and ``drop_before_reply`` hangs up after
+    reading a message's final '.' without replying."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, pipelining=True, refused=(), drop_after=None, drop_before_reply=False):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.pipelining = pipelining
+        self.refused = set(refused)
+        self.drop_after = drop_after
+        self.drop_before_reply = drop_before_reply
+        self.connections = 0
+        self.commands = []
+        self.messages = []  # (from, [to], data with dot-stuffing undone)
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        sent, sender, recipients = 0, None, []
+        self.reply("220 stand-in ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8').strip()
+            verb = command[:4].upper()
+            server.commands.append(verb)
+            if verb == 'EHLO':
+                extensions = ["PIPELINING"] if server.pipelining else []
+                for extension in ["stand-in"] + extensions:
+                    self.reply(f"250-{extension}")
+                self.reply("250 8BITMIME")
+            elif verb == 'MAIL':
+                sender, recipients = command.split(':', 1)[1].strip('<>'), []
+                self.reply("250 OK")
+            elif verb == 'RCPT':
+                address = command.split(':', 1)[1].strip('<>')
+                if address in server.refused:
+                    self.reply("550 no such user")
+                else:
+                    recipients.append(address)
+                    self.reply("250 OK")
+            elif verb == 'DATA':
+                self.reply("354 go ahead")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if data == b'.\r\n':
+                        break
+                    lines.append(data[1:] if data.startswith(b'.') else data)
+                server.messages.append((sender, recipients, b''.join(lines)))
+                if server.drop_before_reply:
+                    return
+                sent += 1
+                self.reply("250 queued")
+                if server.drop_after and sent >= server.drop_after:
+                    return
+            elif verb in ('NOOP', 'RSET'):
+                self.reply("250 OK")
+            elif verb == 'QUIT':
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 not implemented")
+
+
+@pytest.fixture
+def smtp_standin(request):
+    options = getattr(request, 'param', {})
+    server = SMTPStandin(**options)
+    threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_pool(server, **kwargs):
+    host, port = server.server_address
+    kwargs.setdefault('size', 1)
+    return SMTPPool(host=host, port=port, username='', password='', use_tls=False, **kwargs)
+
+
+def streaming_message(tmp_path, body="Hello\n.hidden dot line\n"):
+    attachment = tmp_path / 'shot.png'
+    attachment.write_bytes(bytes(range(256)) * 40)
+    return StreamingMessage(
+        [('From', "Me <me@example.com>"), ('To', "you@example.com"), ('Cc', "cc@example.com"),
+         ('Bcc', "hidden@example.com"), ('Subject', "Report")],
+        body, [str(attachment)],
+    )
+
+
+def plain_message(to="you@example.com"):
+    msg = EmailMessage()
+    msg['From'] = "me@example.com"
+    msg['To'] = to
+    msg['Subject'] = "Plain"
+    msg.set_content("Line one\n.starts with a dot\n")
+    return msg
+
+
+def test_envelope_includes_cc_and_bcc(tmp_path):
+    assert envelope(streaming_message(tmp_path)) == (
+        "me@example.com", ["you@example.com", "cc@example.com", "hidden@example.com"])
+
+
+def test_streamed_message_arrives_intact(smtp_standin, tmp_path):
+    msg = streaming_message(tmp_path)
+    with make_pool(smtp_standin) as pool:
+        pool.send(msg)
+    sender, recipients, data = smtp_standin.messages[0]
+    assert sender == "me@example.com"
+    assert recipients == ["you@example.com", "cc@example.com", "hidden@example.com"]
+    assert data == msg.as_bytes()
+    assert b'hidden@example.com' not in data
+
+
+def test_plain_message_keeps_bcc_out_of_the_data(smtp_standin):
+    msg = plain_message()
+    msg['Bcc'] = "hidden@example.com"
+    with make_pool(smtp_standin) as pool:
+        pool.send(msg)
+    _, recipients, data = smtp_standin.messages[0]
+    assert recipients == ["you@example.com", "hidden@example.com"]
+    assert b'Bcc' not in data and b'\r\n.starts with a dot' in data
+    assert msg['Bcc'] == "hidden@example.com"
+
+
+def spy_on_writes(monkeypatch):
+    writes = []
+    original = smtplib.SMTP.send
+
+    def send(self, data):
+        writes.append(data if isinstance(data, bytes) else data.encode('ascii'))
+        return original(self, data)
+    monkeypatch.setattr(smtplib.SMTP, 'send', send)
+    return writes
+
+
+def test_envelope_is_pipelined_when_offered(smtp_standin, monkeypatch):
+    writes = spy_on_writes(monkeypatch)
+    with make_pool(smtp_standin) as pool:
+        pool.send(plain_message(to="a@example.com, b@example.com"))
+    envelope_writes = [w for w in writes if b'MAIL FROM' in w or b'RCPT TO' in w]
+    assert envelope_writes == [b"MAIL FROM:<me@example.com>\r\nRCPT TO:<a@example.com>\r\nRCPT TO:<b@example.com>\r\n"]
+
+
+@pytest.mark.parametrize('smtp_standin', [{'pipelining': False}], indirect=True)
+def test_envelope_is_sent_command_by_command_without_pipelining(smtp_standin, monkeypatch):
+    writes = spy_on_writes(monkeypatch)
+    with make_pool(smtp_standin) as pool:
+        pool.send(plain_message(to="a@example.com, b@example.com"))
+    assert sum(1 for w in writes if b'MAIL FROM' in w or b'RCPT TO' in w) == 3
+    assert len(smtp_standin.messages) == 1
+
+
+def test_session_is_reused_across_sends(smtp_standin):
+    with make_pool(smtp_standin) as pool:
+        for _ in range(3):
+            pool.send(plain_message())
+        assert pool.stats['connects'] == 1
+    assert smtp_standin.connections == 1
+    assert len(smtp_standin.messages) == 3
+
+
+def test_idle_session_is_probed_with_noop(smtp_standin):
+    with make_pool(smtp_standin, keepalive=0) as pool:
+        pool.send(plain_message())
+        pool.send(plain_message())
+        assert pool.stats['noops'] == 1
+    assert 'NOOP' in smtp_standin.commands
+
+
+@pytest.mark.parametrize('smtp_standin', [{'drop_after': 1}], indirect=True)
+def test_dropped_session_is_replaced(smtp_standin):
+    with make_pool(smtp_standin) as pool:
+        pool.send(plain_message())
+        pool.send(plain_message())
+        assert pool.stats['reconnects'] == 1
+    assert smtp_standin.connections == 2
+    assert len(smtp_standin.messages) == 2
+
+
+@pytest.mark.parametrize('smtp_standin', [{'drop_after': 2}], indirect=True)
+def test_send_many_reports_per_message_and_survives_a_drop(smtp_standin, tmp_path):
+    messages = [plain_message(), streaming_message(tmp_path), plain_message(), plain_message()]
+    with make_pool(smtp_standin) as pool:
+        assert pool.send_many(messages) == [None, None, None, None]
+    assert len(smtp_standin.messages) == 4
+    assert smtp_standin.connections == 2
+
+
+@pytest.mark.parametrize('smtp_standin', [{'refused': {"bad@example.com"}}], indirect=True)
+def test_refused_recipients(smtp_standin):
+    with make_pool(smtp_standin) as pool:
+        results = pool.send_many([plain_message(to="you@example.com, bad@example.com"),
+                                  plain_message(to="bad@example.com"),
+                                  plain_message()])
+    assert results[0] == {"bad@example.com": (550, b"no such user")}
+    assert results[2] is None
+    assert isinstance(results[1], smtplib.SMTPRecipientsRefused)
+    assert [recipients for _, recipients, _ in smtp_standin.messages] == [["you@example.com"], ["you@example.com"]]
+
+
+@pytest.mark.parametrize('smtp_standin', [{'refused': {"bad@example.com"}}], indirect=True)
+def test_send_returns_refused_recipients(smtp_standin):
+    with make_pool(smtp_standin) as pool:
+        assert pool.send(plain_message()) == {}
+        assert pool.send(plain_message(to="you@example.com, bad@example.com")) == {
+            "bad@example.com": (550, b"no such user")}
+        assert pool.stats['refused'] == 1
+
+
+@pytest.mark.parametrize('smtp_standin', [{'drop_before_reply': True}], indirect=True)
+def test_drop_after_the_final_dot_is_not_resent(smtp_standin, tmp_path):
+    with make_pool(smtp_standin) as pool:
+        with pytest.raises(DeliveryUncertain):
+            pool.send(plain_message())
+        results = pool.send_many([streaming_message(tmp_path)])
+        assert isinstance(results[0], DeliveryUncertain)
+        assert pool.stats['reconnects'] == 0
+    assert len(smtp_standin.messages) == 2
+    assert smtp_standin.connections == 2
+
+
+def test_waiter_gets_the_slot_of_a_dropped_session(smtp_standin):
+    pool = make_pool(smtp_standin)
+    server = pool.acquire()
+    with pytest.raises(queue.Empty):
+        pool.acquire(timeout=0.05)
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire(timeout=5)))
+    waiter.start()
+    time.sleep(0.1)
+    pool.release(server, broken=True)
+    waiter.join(5)
+    assert got and got[0] is not server
+    pool.release(got[0])
+    pool.close()
@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+import rate_control
+from rate_control import AIMDController, TokenBucket, bucket_for, destination_key
+
+
+def test_burst_is_available_at_once_then_paced():
+    bucket = TokenBucket(rate=50, burst=3)
+    start = time.monotonic()
+    for _ in range(3):
+        assert bucket.acquire()
+    assert time.monotonic() - start < 0.05
+    bucket.acquire()
+    assert time.monotonic() - start >= 0.015
+    assert bucket.stats['acquired'] == 4
+
+
+def test_acquire_gives_up_past_timeout():
+    bucket = TokenBucket(rate=1)
+    assert bucket.acquire()
+    assert bucket.acquire(timeout=0.01) is False
+
+
+def test_burst_below_one_token_is_rejected():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0.5, burst=0.25)
+
+
+def test_unlimited_destination_has_no_bucket():
+    assert bucket_for('form', "http://localhost/viewform") is None
+
+
+def test_buckets_are_per_host(monkeypatch):
+    monkeypatch.setenv('FORM_RATE', '5')
+    a = bucket_for('form', "http://a.example/viewform")
+    assert bucket_for('form', "http://a.example/formResponse") is a
+    assert bucket_for('form', "http://b.example/viewform") is not a
+    assert destination_key('smtp', "smtp.gmail.com") == "smtp:smtp.gmail.com"
+
+
+def test_process_share_keeps_at_least_one_token(monkeypatch):
+    monkeypatch.setenv('FORM_RATE', '0.5')
+    monkeypatch.setenv('FORM_BURST', '2')
+    rate_control.set_share(1 / 8)
+    bucket = bucket_for('form', "http://localhost/viewform")
+    assert bucket.rate == pytest.approx(0.0625)
+    assert bucket.burst == 1.0
+    assert bucket.acquire(timeout=0.1)
+
+
+def feed(controller, count, seconds=0.1, ok=True):
+    for _ in range(count):
+        controller.record(seconds, ok)
+    return controller.limit
+
+
+def test_aimd_grows_by_one_per_healthy_window():
+    controller = AIMDController(max_limit=4, window=4)
+    assert feed(controller, 4) == 2
+    assert feed(controller, 4) == 3
+    assert feed(controller, 20) == 4
+
+
+def test_aimd_halves_on_errors_and_ignores_results_from_before_the_cut():
+    controller = AIMDController(max_limit=8, initial=8, window=4)
+    assert feed(controller, 4, ok=False) == 4
+    # The 8 jobs started at the old limit are drained, not judged
+    assert feed(controller, 8, ok=False) == 4
+    assert feed(controller, 4) == 5
+
+
+def test_aimd_halves_when_latency_passes_the_target():
+    controller = AIMDController(max_limit=8, initial=4, window=4, latency_target=1.0)
+    assert feed(controller, 4, seconds=2.0) == 2
+
+
+def test_aimd_latency_target_defaults_to_best_median_times_tolerance():
+    controller = AIMDController(max_limit=8, initial=4, window=4, tolerance=2.0)
+    assert feed(controller, 4, seconds=0.1) == 5
+    assert feed(controller, 4, seconds=0.15) == 6
+    assert feed(controller, 4, seconds=0.5) == 3
+    assert [limit for _, limit in controller.history] == [4, 5, 6, 3]
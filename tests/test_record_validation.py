@@ -0,0 +1,80 @@
+from record_validation import (InvalidValue, normalize_dates, normalize_genders, normalize_phones,
+                               normalize_pins, validate_batch, validate_record, validate_stream)
+
+
+def row(**overrides):
+    values = {
+        'form_url': "http://localhost/viewform",
+        'full_name': "  Test   User ",
+        'contact_number': "+91 98765-43210",
+        'email_id': "Test.User@Example.COM",
+        'full_address': "1 Test Street,\n Test City",
+        'pin_code': "110 001",
+        'date_of_birth': "15/06/1995",
+        'gender': "m",
+    }
+    values.update(overrides)
+    return values
+
+
+def test_valid_record_is_normalized():
+    record, errors = validate_record(row())
+    assert errors == []
+    assert record['full_name'] == "Test User"
+    assert record['full_address'] == "1 Test Street, Test City"
+    assert record['contact_number'] == "9876543210"
+    assert record['email_id'] == "Test.User@example.com"
+    assert record['pin_code'] == "110001"
+    assert record['date_of_birth'] == "1995-06-15"
+    assert record['gender'] == "Male"
+
+
+def test_phone_prefixes():
+    assert normalize_phones(["09876543210", "919876543210", "98765 43210"]) == ["9876543210"] * 3
+    assert isinstance(normalize_phones(["12345"])[0], InvalidValue)
+
+
+def test_pins():
+    assert normalize_pins(["560 034"]) == ["560034"]
+    assert all(isinstance(v, InvalidValue) for v in normalize_pins(["012345", "1234567"]))
+
+
+def test_dates_day_first_unless_month_first():
+    assert normalize_dates(["03/04/1990"], month_first=False) == ["1990-04-03"]
+    assert normalize_dates(["03/04/1990"], month_first=True) == ["1990-03-04"]
+    assert normalize_dates(["15 Jun 1995", "1995-06-15"]) == ["1995-06-15", "1995-06-15"]
+
+
+def test_dates_out_of_range_or_unparseable():
+    too_old, future, garbage = normalize_dates(["01/01/1850", "01/01/2999", "yesterday"])
+    assert "out of range" in str(too_old)
+    assert "out of range" in str(future)
+    assert "unrecognised" in str(garbage)
+
+
+def test_genders():
+    assert normalize_genders(["F", " Woman ", "non-binary"]) == ["Female", "Female", "Other"]
+    assert isinstance(normalize_genders(["x"])[0], InvalidValue)
+
+
+def test_batch_reports_every_problem_per_row():
+    valid, rejected = validate_batch([row(), row(pin_code="12", gender="?"), row(full_name=" ")])
+    assert len(valid) == 1
+    assert [i for i, _, _ in rejected] == [1, 2]
+    assert len(rejected[0][2]) == 2
+    assert rejected[1][2] == ["full_name is required"]
+
+
+def test_numbers_from_jsonl_are_accepted():
+    record, errors = validate_record(row(pin_code=110001, contact_number=9876543210))
+    assert errors == []
+    assert record['pin_code'] == "110001"
+
+
+def test_stream_keeps_input_positions_across_batches():
+    rows = [row(), row(contact_number="x"), row(), row(pin_code="1"), row()]
+    rejects = []
+    valid = list(validate_stream(rows, on_reject=lambda i, r, e: rejects.append(i), batch_size=2, indexed=True))
+    assert rejects == [1, 3]
+    assert [index for index, _ in valid] == [0, 2, 4]
+    assert all(record['gender'] == "Male" for _, record in valid)
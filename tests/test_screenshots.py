@@ -0,0 +1,67 @@
+import base64
+import io
+
+from PIL import Image, ImageDraw
+
+from screenshots import ScreenshotStore, dhash, hamming
+
+
+def page(text, size=(320, 200)):
+    image = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((20, 20, 300, 60), fill='navy')
+    draw.text((30, 100), text, fill='black')
+    return image
+
+
+def png_base64(image):
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG')
+    return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+class FakeDriver:
+    def __init__(self, image):
+        self.image = image
+
+    def get_screenshot_as_base64(self):
+        return png_base64(self.image)
+
+
+def capture(store, image, name):
+    return store.capture(FakeDriver(image), name, selector='', dedupe=True).result()
+
+
+def test_same_page_is_written_once(tmp_path):
+    with ScreenshotStore(base_dir=str(tmp_path), run_id='run') as store:
+        first = capture(store, page("Your response has been recorded"), 'a')
+        second = capture(store, page("Your response has been recorded"), 'b')
+    assert first == second
+    assert store.stats['written'] == 1 and store.stats['deduplicated'] == 1
+
+
+def test_stores_sharing_a_directory_keep_each_others_entries(tmp_path):
+    # Two process workers start together, so neither sees the other's entries on load
+    one = ScreenshotStore(base_dir=str(tmp_path), run_id='run-1')
+    two = ScreenshotStore(base_dir=str(tmp_path), run_id='run-2')
+    blank = Image.new('RGB', (320, 200), 'white')
+    striped = page("")
+    with one, two:
+        capture(one, blank, 'confirmation')
+        capture(two, striped, 'confirmation')
+
+    with ScreenshotStore(base_dir=str(tmp_path), run_id='run-3') as later:
+        assert {path for _, path in later._index} == {one.path_for('confirmation'), two.path_for('confirmation')}
+
+
+def test_dedupe_distance_is_configurable(tmp_path, monkeypatch):
+    assert ScreenshotStore(base_dir=str(tmp_path), run_id='default').dedupe_distance == 2
+    monkeypatch.setenv('SCREENSHOT_DEDUPE_DISTANCE', '0')
+    assert ScreenshotStore(base_dir=str(tmp_path), run_id='env').dedupe_distance == 0
+    assert ScreenshotStore(base_dir=str(tmp_path), run_id='arg', dedupe_distance=5).dedupe_distance == 5
+
+
+def test_dhash_ignores_re_encoding():
+    image = page("Thanks")
+    reencoded = Image.open(io.BytesIO(base64.b64decode(png_base64(image.convert('P').convert('RGB')))))
+    assert hamming(dhash(image), dhash(reencoded)) <= 2
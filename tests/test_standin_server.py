@@ -0,0 +1,51 @@
+import json
+import urllib.request
+
+import http_submit
+from http_submit import submit_record
+
+
+def get_json(form_url, path):
+    with urllib.request.urlopen(form_url.replace('/viewform', path)) as response:
+        return json.loads(response.read())
+
+
+def test_submit_record_is_accepted(standin, record):
+    server, form_url = standin
+    stages = []
+    result = submit_record(record, on_stage=stages.append)
+    assert result['ok'], result['error']
+    assert stages == ['filled', 'submitting', 'submitted']
+    assert [event['stage'] for event in result['stages']] == ['http_fetch', 'http_submit']
+
+    submission, = get_json(form_url, '/submissions')
+    assert submission['entry.1001'] == "Test User"
+    assert submission['entry.1006'] == "1995-06-15"
+    assert submission['entry.1007'] == "Male"
+    assert submission['entry.1008'] == http_submit.VERIFICATION_CODE
+
+
+def test_every_submission_needs_a_fresh_token(standin, record):
+    server, form_url = standin
+    assert submit_record(record)['ok']
+    assert submit_record(record)['ok']
+    assert get_json(form_url, '/stats') == {'submissions': 2, 'rejected': 0}
+    assert not server.state.tokens
+
+
+def test_rejected_submission_is_not_ok(standin, record, monkeypatch):
+    server, form_url = standin
+    monkeypatch.setattr(http_submit, 'VERIFICATION_CODE', "WRONG")
+    stages = []
+    result = submit_record(record, on_stage=stages.append)
+    assert not result['ok']
+    assert "HTTP 400" in result['error'] and "wrong verification code" in result['error']
+    assert 'submitted' not in stages
+    assert get_json(form_url, '/stats') == {'submissions': 0, 'rejected': 1}
+
+
+def test_gender_widget_does_not_change_the_post(standin, record):
+    server, form_url = standin
+    record['form_url'] = form_url + '?gender=listbox'
+    assert submit_record(record)['ok']
+    assert get_json(form_url, '/submissions')[0]['entry.1007'] == "Male"
@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+
+import pytest
+
+from batch_runner import _unfinished
+from submission_journal import SubmissionJournal, journal_hook, reached, record_key
+
+
+def test_record_key_depends_on_values_only():
+    a = {'email_id': "a@example.com", 'full_name': "A", 'extra': 1}
+    assert record_key(a) == record_key({'full_name': "A", 'email_id': "a@example.com"})
+    assert record_key(a) != record_key(dict(a, full_name="B"))
+
+
+def test_reached():
+    assert reached('submitted', 'submitting')
+    assert not reached('validated', 'submitted')
+    assert not reached(None, 'filled')
+
+
+def test_replay_keeps_the_furthest_stage(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    with SubmissionJournal(path) as journal:
+        for stage in ('filled', 'validated', 'submitting', 'submitted'):
+            journal.record('a', stage)
+        journal.record('b', 'submitting', durable=True)
+        # A late 'filled' from a retry does not move 'a' backwards
+        journal.record('a', 'filled')
+
+    journal = SubmissionJournal(path)
+    try:
+        assert journal.is_done('a')
+        assert not journal.is_uncertain('a')
+        assert journal.is_uncertain('b')
+        assert not journal.is_done('b')
+        assert journal.stage('c') is None
+    finally:
+        journal.close()
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    path.write_text(json.dumps({'key': 'a', 'stage': 'submitted'}) + '\n{"key": "b", "sta')
+    journal = SubmissionJournal(str(path))
+    try:
+        assert journal.stages == {'a': 'submitted'}
+        journal.record('b', 'filled', durable=True)
+    finally:
+        journal.close()
+    with SubmissionJournal(str(path)) as journal:
+        assert journal.stages == {'a': 'submitted', 'b': 'filled'}
+
+
+def test_durable_entries_are_on_disk_before_record_returns(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = SubmissionJournal(str(path), flush_interval=60)
+    try:
+        journal.record('a', 'submitting', durable=True, index=3)
+        entry = json.loads(path.read_text().splitlines()[-1])
+        assert entry['key'] == 'a' and entry['stage'] == 'submitting' and entry['index'] == 3
+    finally:
+        journal.close()
+
+
+def test_write_failure_reaches_waiting_and_later_callers(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = SubmissionJournal(str(path), flush_interval=60)
+    # Swap in a descriptor the flusher cannot write to
+    writable, journal._fd = journal._fd, os.open(str(path), os.O_RDONLY)
+    os.close(writable)
+
+    errors = []
+
+    def durable_record():
+        try:
+            journal.record('a', 'submitting', durable=True)
+        except OSError as e:
+            errors.append(e)
+
+    waiter = threading.Thread(target=durable_record)
+    waiter.start()
+    waiter.join(timeout=5)
+    assert not waiter.is_alive(), "durable record() blocked after the flusher failed"
+    assert len(errors) == 1
+
+    with pytest.raises(OSError):
+        journal.record('b', 'filled')
+    with pytest.raises(OSError):
+        journal.close()
+
+
+def test_entries_are_group_committed(tmp_path):
+    journal = SubmissionJournal(str(tmp_path / 'journal.jsonl'), flush_interval=0.05, flush_batch=50)
+    for i in range(200):
+        journal.record(str(i), 'filled')
+    journal.close()
+    assert journal.stats['entries'] == 200
+    assert journal.stats['fsyncs'] <= 10
+
+
+def test_journal_hook_makes_guard_stages_durable(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = SubmissionJournal(str(path), flush_interval=60)
+    try:
+        on_stage = journal_hook(journal, 'k', run='r1')
+        on_stage('submitted')
+        assert json.loads(path.read_text())['run'] == 'r1'
+    finally:
+        journal.close()
+
+
+def test_resume_skips_submitted_and_uncertain_records(tmp_path):
+    records = [{'email_id': f"user{i}@example.com"} for i in range(4)]
+    path = str(tmp_path / 'journal.jsonl')
+    with SubmissionJournal(path) as journal:
+        journal.record(record_key(records[0]), 'emailed')
+        journal.record(record_key(records[1]), 'submitting')
+        journal.record(record_key(records[2]), 'validated')
+
+    with SubmissionJournal(path) as journal:
+        skipped, uncertain = [], []
+        left = list(_unfinished(enumerate(records), journal, False, skipped, uncertain))
+        assert [index for index, _ in left] == [2, 3]
+        assert skipped == [0]
+        assert uncertain == ["user1@example.com"]
+
+        retry = list(_unfinished(enumerate(records), journal, True, [], []))
+        assert [index for index, _ in retry] == [1, 2, 3]
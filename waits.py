@@ -0,0 +1,104 @@
+import os
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+# Ceiling (in seconds) for any single wait. Override with WAIT_TIMEOUT in .env
+DEFAULT_TIMEOUT = 15
+POLL_FREQUENCY = 0.1
+
+FORM_READY_SELECTOR = 'input[type="text"], textarea'
+
+# Text found on the page once a response is accepted
+CONFIRMATION_MARKERS = ['freebirdFormviewerViewResponseConfirmationMessage',
+                        'Your response has been recorded']
+
+
+class WaitEngine:
+    """Condition-driven waits that replace fixed time.sleep pacing.
+
+    Every wait is bounded by ``timeout`` and the time it actually took is
+    recorded in ``timings`` so a run can report where it spent its time.
+    """
+
+    def __init__(self, driver, timeout=None, poll_frequency=POLL_FREQUENCY):
+        self.driver = driver
+        if timeout is None:
+            timeout = float(os.getenv('WAIT_TIMEOUT', DEFAULT_TIMEOUT))
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.timings = []
+
+    def until(self, name, condition, timeout=None):
+        start = time.perf_counter()
+        ok = False
+        try:
+            wait = WebDriverWait(
+                self.driver,
+                self.timeout if timeout is None else timeout,
+                poll_frequency=self.poll_frequency
+            )
+            result = wait.until(condition)
+            ok = True
+            return result
+        except TimeoutException:
+            raise TimeoutException(f"Timed out after {self.timeout if timeout is None else timeout}s waiting for: {name}")
+        finally:
+            self.timings.append((name, time.perf_counter() - start, ok))
+
+    # ----------------------------
+    # CONDITIONS
+    # ----------------------------
+    def form_rendered(self):
+        # 'interactive' is enough: the form controls are checked for explicitly,
+        # and it lets the eager page-load strategy skip waiting on subresources
+        self.until("page load", lambda d: d.execute_script("return document.readyState") in ('interactive', 'complete'))
+        return self.until("form rendered", EC.presence_of_element_located((By.CSS_SELECTOR, FORM_READY_SELECTOR)))
+
+    def clickable(self, element, name="element"):
+        return self.until(f"{name} clickable", EC.element_to_be_clickable(element))
+
+    def visible(self, locator, name="element"):
+        return self.until(f"{name} visible", EC.visibility_of_element_located(locator))
+
+    def value_accepted(self, element, value, name="field"):
+        return self.until(f"{name} value accepted", lambda d: (element.get_attribute('value') or '') == value)
+
+    def checked(self, element, name="option"):
+        # div[role=radio] (Google Forms) or a native radio/checkbox input
+        return self.until(f"{name} checked", lambda d: element.get_attribute('aria-checked') == 'true'
+                          or element.get_attribute('checked') == 'true')
+
+    def selected(self, element, name="option"):
+        # div[role=option] in a listbox or a native <option>
+        return self.until(f"{name} selected", lambda d: element.get_attribute('aria-selected') == 'true'
+                          or element.get_attribute('selected') == 'true')
+
+    def confirmation_loaded(self, submit_button, old_url):
+        """Wait for the page after Submit; True if it is the confirmation page.
+
+        Leaving the form is not enough on its own: a rejected response
+        (e.g. HTTP 400 from /formResponse) navigates away too.
+        """
+        self.until("confirmation page", EC.any_of(
+            EC.url_changes(old_url),
+            EC.staleness_of(submit_button)
+        ))
+        self.until("confirmation rendered", lambda d: d.execute_script("return document.readyState") == 'complete')
+        page = self.driver.page_source
+        return any(marker in page for marker in CONFIRMATION_MARKERS)
+
+    # ----------------------------
+    # REPORTING
+    # ----------------------------
+    def total(self):
+        return sum(elapsed for _, elapsed, _ in self.timings)
+
+    def print_report(self):
+        print("\nWait timings:")
+        for name, elapsed, ok in self.timings:
+            status = "✓" if ok else "✗"
+            print(f"  {status} {name:<40} {elapsed:6.2f}s")
+        print(f"  Total waited: {self.total():.2f}s across {len(self.timings)} waits (ceiling {self.timeout}s)")